@@ -1,3 +1,9 @@
-from peekingduck_studio.app import PeekingDuckStudioApp
+if __name__ == "__main__":
+    # needed by pipeline child process in frozen (pyinstaller) app
+    from multiprocessing import freeze_support
 
-PeekingDuckStudioApp().run()
+    freeze_support()
+
+    from peekingduck_studio.app import PeekingDuckStudioApp
+
+    PeekingDuckStudioApp().run()
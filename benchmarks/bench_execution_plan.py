@@ -0,0 +1,76 @@
+#
+# PeekingDuck Studio Benchmark: per-iteration overhead of the pipeline loop,
+# legacy per-frame node inspection vs precompiled ExecutionPlan.
+#
+# Usage: python -m benchmarks.bench_execution_plan
+#
+
+from typing import Callable
+import copy
+import time
+import numpy as np
+from benchmarks.stub_nodes import StubPipeline, make_stub_pipeline
+from peekingduck_studio.pipeline_runner import ExecutionPlan
+
+NUM_FRAMES = 20000
+NUM_NODES = 10  # per type, i.e. 10 model stubs + 10 draw stubs
+
+
+def legacy_iteration(
+    pipeline: StubPipeline, screen_output: Callable[[np.ndarray], None]
+) -> None:
+    """The pipeline loop as it was before ExecutionPlan, kept for comparison"""
+    for node in pipeline.nodes:
+        if pipeline.data.get("pipeline_end", False):
+            pipeline.terminate = True
+            if "pipeline_end" not in node.inputs:
+                continue
+        if "all" in node.inputs:
+            inputs = copy.deepcopy(pipeline.data)
+        else:
+            inputs = {
+                key: pipeline.data[key] for key in node.inputs if key in pipeline.data
+            }
+        if hasattr(node, "optional_inputs"):
+            for key in node.optional_inputs:
+                if key in pipeline.data:
+                    inputs[key] = pipeline.data[key]
+        if node.name.endswith("output.screen"):
+            screen_output(pipeline.data["img"])
+        else:
+            outputs = node.run(inputs)
+            pipeline.data.update(outputs)
+
+
+def time_loop(run_iteration: Callable, pipeline: StubPipeline) -> float:
+    """Run pipeline to the end, return mean secs per iteration"""
+    num_iterations = 0
+    start = time.perf_counter()
+    while not pipeline.terminate:
+        run_iteration()
+        num_iterations += 1
+    return (time.perf_counter() - start) / num_iterations
+
+
+def main():
+    def new_pipeline() -> StubPipeline:
+        return make_stub_pipeline(
+            NUM_FRAMES, resolution=(64, 48), num_models=NUM_NODES, num_draws=NUM_NODES
+        )
+
+    frames = []
+    legacy_pipeline = new_pipeline()
+    legacy = time_loop(
+        lambda: legacy_iteration(legacy_pipeline, frames.append), legacy_pipeline
+    )
+    plan = ExecutionPlan(new_pipeline(), prefetch=0)  # loop overhead only
+    planned = time_loop(lambda: plan.run_iteration(frames.append), plan.pipeline)
+    num_nodes = len(plan.steps)
+    print(f"stub pipeline: {num_nodes} nodes, {NUM_FRAMES} frames")
+    print(f"legacy loop    : {legacy * 1e6:8.2f} us/iteration")
+    print(f"execution plan : {planned * 1e6:8.2f} us/iteration")
+    print(f"speedup        : {legacy / planned:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
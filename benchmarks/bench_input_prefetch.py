@@ -0,0 +1,52 @@
+#
+# PeekingDuck Studio Benchmark: pipeline FPS with and without input prefetch,
+# on a stub pipeline whose input decoding and model inference take time (both
+# release the GIL, like OpenCV decoding and model frameworks do).
+#
+# Usage: python -m benchmarks.bench_input_prefetch
+#
+
+import time
+from benchmarks.stub_nodes import make_stub_pipeline
+from peekingduck_studio.pipeline_runner import (
+    PREFETCH_FRAMES,
+    ExecutionPlan,
+    release_source_nodes,
+)
+
+NUM_FRAMES = 200
+INPUT_SLEEP = 0.005  # secs, stand-in for decoding a video frame
+MODEL_SLEEP = 0.010  # secs, stand-in for model inference
+
+
+def run_fps(prefetch: int) -> float:
+    """Run stub pipeline to the end, return iterations per second"""
+    pipeline = make_stub_pipeline(
+        NUM_FRAMES, (640, 480), model_sleep=MODEL_SLEEP, input_sleep=INPUT_SLEEP
+    )
+    plan = ExecutionPlan(pipeline, prefetch=prefetch)
+    frames = []
+    num_iterations = 0
+    start = time.perf_counter()
+    while not pipeline.terminate:
+        plan.run_iteration(frames.append)
+        num_iterations += 1
+    elapsed = time.perf_counter() - start
+    release_source_nodes(pipeline)
+    return num_iterations / elapsed
+
+
+def main():
+    serial = run_fps(0)
+    prefetched = run_fps(PREFETCH_FRAMES)
+    print(
+        f"stub pipeline: {INPUT_SLEEP * 1000} ms decode, {MODEL_SLEEP * 1000} ms model,"
+        f" {NUM_FRAMES} frames"
+    )
+    print(f"no prefetch    : {serial:8.2f} it/s")
+    print(f"prefetch {PREFETCH_FRAMES:<6}: {prefetched:8.2f} it/s")
+    print(f"speedup        : {prefetched / serial:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#
+# PeekingDuck Studio Benchmark: playback FPS with debug logging on and off, and
+# with the former per-module synchronous log handlers (which always wrote debug
+# records to file), on a stub pipeline whose screen output logs like the UI
+# display path does. Queued logging moves file writes off the logging thread:
+# it pays off with slow disks and spare CPU cores, not on a single core.
+#
+# Usage: python -m benchmarks.bench_logging
+#
+
+import logging
+import os
+import tempfile
+import time
+
+# keep benchmark log records out of the user's log file (set before importing)
+LOG_DIR = tempfile.mkdtemp(prefix="pkds_bench_log_")
+os.environ["PKDS_LOG_FILE"] = os.path.join(LOG_DIR, "queued_log.txt")
+
+from benchmarks.stub_nodes import make_stub_pipeline
+from peekingduck_studio.core_utils import (
+    LOG_FORMAT_FILE,
+    LOG_FORMAT_IO,
+    make_logger,
+    set_log_level,
+    shutdown_logging,
+)
+from peekingduck_studio.frame_store import FrameStore
+from peekingduck_studio.pipeline_runner import ExecutionPlan
+
+NUM_FRAMES = 2000
+DEBUG_CALLS = 5  # debug log calls per displayed frame
+REPEAT = 3  # runs per setting, best one counts
+
+logger = make_logger(__name__)
+
+
+def make_legacy_logger() -> logging.Logger:
+    """Logger set up as make_logger() used to: own console and file handlers,
+    writing synchronously"""
+    legacy = logging.getLogger("pkds_bench_legacy")
+    io_handler = logging.StreamHandler()
+    io_handler.setLevel(logging.INFO)
+    io_handler.setFormatter(logging.Formatter(LOG_FORMAT_IO))
+    legacy.addHandler(io_handler)
+    fi_handler = logging.FileHandler(os.path.join(LOG_DIR, "legacy_log.txt"))
+    fi_handler.setLevel(logging.DEBUG)
+    fi_handler.setFormatter(logging.Formatter(LOG_FORMAT_FILE))
+    legacy.addHandler(fi_handler)
+    legacy.setLevel(logging.DEBUG)
+    legacy.propagate = False
+    return legacy
+
+
+def run_fps(log: logging.Logger) -> float:
+    """Run stub pipeline to the end, saving and "displaying" every frame, return
+    iterations per second"""
+    pipeline = make_stub_pipeline(NUM_FRAMES, (640, 480))
+    plan = ExecutionPlan(pipeline, prefetch=0)
+    frames = FrameStore()
+
+    def screen_output(img) -> None:
+        frames.append(img)
+        frame_idx = len(frames) - 1
+        for i in range(DEBUG_CALLS):
+            log.debug("show frame %s size=%s call %s", frame_idx, img.shape, i)
+
+    num_iterations = 0
+    start = time.perf_counter()
+    while not pipeline.terminate:
+        plan.run_iteration(screen_output)
+        num_iterations += 1
+    elapsed = time.perf_counter() - start
+    frames.close()
+    return num_iterations / elapsed
+
+
+def best_fps(log: logging.Logger) -> float:
+    """Best iterations per second of repeated runs"""
+    return max(run_fps(log) for _ in range(REPEAT))
+
+
+def main():
+    set_log_level(logging.INFO)
+    off = best_fps(logger)
+    set_log_level(logging.DEBUG)
+    on = best_fps(logger)
+    set_log_level(logging.INFO)
+    legacy = best_fps(make_legacy_logger())
+    shutdown_logging()  # write out queued records before reporting
+    print(f"stub pipeline: {NUM_FRAMES} frames, {DEBUG_CALLS} debug calls/frame")
+    print(f"debug off (default)   : {off:10.2f} it/s")
+    print(f"debug on, queued      : {on:10.2f} it/s ({on / off - 1:+.1%})")
+    print(f"debug on, synchronous : {legacy:10.2f} it/s ({legacy / off - 1:+.1%})")
+    print(f"log files in {LOG_DIR}")
+
+
+if __name__ == "__main__":
+    main()
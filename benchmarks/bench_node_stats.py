@@ -0,0 +1,64 @@
+#
+# PeekingDuck Studio Benchmark: cost of per-node latency instrumentation,
+# relative to the pipeline loop time of a stub pipeline with realistic latency.
+#
+# Usage: python -m benchmarks.bench_node_stats
+#
+
+import time
+from benchmarks.stub_nodes import make_stub_pipeline
+from peekingduck_studio.node_stats import NOT_RUN, NodeLatencies
+from peekingduck_studio.pipeline_runner import ExecutionPlan
+
+NUM_ITERATIONS = 100000  # for timing the instrumentation alone
+NUM_FRAMES = 300
+NUM_NODES = 3  # per type
+MODEL_SLEEP = 0.002  # secs, stand-in for model inference
+
+
+def time_instrumentation(num_steps: int) -> float:
+    """Run only the timing code of ExecutionPlan.run_iteration, for empty steps,
+    return mean secs per iteration"""
+    latencies = NodeLatencies([f"node{i}" for i in range(num_steps)])
+    steps = [NOT_RUN] * num_steps
+    clock = time.perf_counter
+    start_all = clock()
+    for _ in range(NUM_ITERATIONS):
+        durations = []
+        iteration_start = clock()
+        for _ in steps:
+            start = clock()
+            durations.append(clock() - start)
+        durations.append(clock() - iteration_start)
+        latencies.record(durations)
+    return (clock() - start_all) / NUM_ITERATIONS
+
+
+def main():
+    pipeline = make_stub_pipeline(
+        NUM_FRAMES,
+        resolution=(64, 48),
+        num_models=NUM_NODES,
+        num_draws=NUM_NODES,
+        model_sleep=MODEL_SLEEP,
+    )
+    plan = ExecutionPlan(pipeline)
+    frames = []
+    start = time.perf_counter()
+    while not pipeline.terminate:
+        plan.run_iteration(frames.append)
+    loop = (time.perf_counter() - start) / plan.latencies.num_iterations
+    overhead = time_instrumentation(len(plan.steps))
+    plan.get_node_stats()  # warm up numpy
+    start = time.perf_counter()
+    plan.get_node_stats()
+    stats_time = time.perf_counter() - start
+    print(f"stub pipeline: {len(plan.steps)} nodes, {MODEL_SLEEP * 1000} ms/model")
+    print(f"loop time      : {loop * 1e6:10.2f} us/iteration")
+    print(f"instrumentation: {overhead * 1e6:10.2f} us/iteration")
+    print(f"overhead       : {overhead / loop * 100:10.3f} %")
+    print(f"stats          : {stats_time * 1e3:10.2f} ms per refresh")
+
+
+if __name__ == "__main__":
+    main()
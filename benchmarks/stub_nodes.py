@@ -0,0 +1,179 @@
+#
+# PeekingDuck Studio Benchmark Stub Nodes
+# Synthetic in-process stand-ins for PeekingDuck nodes and pipelines, so that
+# Studio's hot paths can be benchmarked offline without models or video files.
+#
+
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+import time
+import numpy as np
+import yaml
+
+NUM_DISTINCT_FRAMES = 4  # random frames are generated once, then cycled
+STUB_NODE_TYPES = ["augment", "dabble", "draw", "input", "model", "output"]
+# default config of every stub node: one value of each type Studio recognises
+STUB_NODE_CONFIG = {
+    "input": ["img"],
+    "output": ["img"],
+    "enabled": True,
+    "num_workers": 4,
+    "score_threshold": 0.5,
+    "scale": 1.5,
+    "resolution": {"height": 480, "width": 640},
+    "text_color": [255, 0, 255],
+    "labels": ["person", "car", "bicycle"],
+    "model_path": "weights/model.pb",
+    "name": "stub",
+    "optional": None,
+}
+
+
+class StubNode:
+    """Minimal stand-in for peekingduck.pipeline.nodes.abstract_node.AbstractNode"""
+
+    def __init__(
+        self,
+        name: str,
+        inputs: List[str],
+        outputs: List[str],
+        optional_inputs: Optional[List[str]] = None,
+    ) -> None:
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        if optional_inputs is not None:
+            self.optional_inputs = optional_inputs
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    def release_resources(self) -> None:
+        pass
+
+
+class StubVisualInput(StubNode):
+    """Fake input.visual producing random frames of given resolution, optionally
+    sleeping to mimic video decoding latency"""
+
+    def __init__(
+        self, num_frames: int, resolution: Tuple[int, int], sleep: float = 0.0
+    ) -> None:
+        super().__init__(
+            "input.visual", ["none"], ["img", "filename", "pipeline_end", "saved_video_fps"]
+        )
+        width, height = resolution
+        rng = np.random.default_rng(seed=42)
+        self._frames = [
+            rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            for _ in range(NUM_DISTINCT_FRAMES)
+        ]
+        self.total_frame_count = num_frames
+        self.fps = 30.0
+        self.sleep = sleep
+        self._idx = 0
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.sleep:
+            time.sleep(self.sleep)  # mimic decoding
+        self._idx += 1
+        img = self._frames[self._idx % NUM_DISTINCT_FRAMES]
+        return {
+            "img": img,
+            "filename": "stub.mp4",
+            "pipeline_end": self._idx > self.total_frame_count,
+            "saved_video_fps": self.fps,
+        }
+
+
+class StubModel(StubNode):
+    """Fake model node: no-op, or sleep to mimic inference latency"""
+
+    def __init__(self, name: str = "model.stub", sleep: float = 0.0) -> None:
+        super().__init__(name, ["img"], ["bboxes", "bbox_labels", "bbox_scores"])
+        self.sleep = sleep
+        self._outputs = {
+            "bboxes": np.array([[0.1, 0.1, 0.5, 0.5]], dtype=np.float32),
+            "bbox_labels": np.array(["person"]),
+            "bbox_scores": np.array([0.9], dtype=np.float32),
+        }
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.sleep:
+            time.sleep(self.sleep)
+        return self._outputs
+
+
+class StubDraw(StubNode):
+    """Fake draw node with optional inputs, does not touch the image"""
+
+    def __init__(self, name: str = "draw.stub") -> None:
+        super().__init__(name, ["img", "bboxes"], ["none"], optional_inputs=["obj_attrs"])
+
+
+class StubScreen(StubNode):
+    """Fake output.screen, intercepted by Studio and never run"""
+
+    def __init__(self) -> None:
+        super().__init__("output.screen", ["img"], ["none"])
+
+
+class StubPipeline:
+    """Minimal stand-in for peekingduck.pipeline.pipeline.Pipeline"""
+
+    def __init__(self, nodes: List[StubNode]) -> None:
+        self.nodes = nodes
+        self.data: Dict[str, Any] = {}
+        self.terminate = False
+
+
+def make_stub_pipeline(
+    num_frames: int,
+    resolution: Tuple[int, int] = (640, 480),
+    num_models: int = 1,
+    num_draws: int = 1,
+    model_sleep: float = 0.0,
+    input_sleep: float = 0.0,
+) -> StubPipeline:
+    """Make input.visual -> model.* -> draw.* -> output.screen stub pipeline
+
+    Args:
+        num_frames (int): number of frames produced by input node
+        resolution (Tuple[int, int], optional): (width, height). Defaults to 640x480.
+        num_models (int, optional): number of model nodes. Defaults to 1.
+        num_draws (int, optional): number of draw nodes. Defaults to 1.
+        model_sleep (float, optional): secs per model node run. Defaults to 0.0.
+        input_sleep (float, optional): secs per input node run. Defaults to 0.0.
+
+    Returns:
+        StubPipeline: the stub pipeline
+    """
+    nodes: List[StubNode] = [StubVisualInput(num_frames, resolution, input_sleep)]
+    nodes.extend(
+        StubModel(f"model.stub{i}", sleep=model_sleep) for i in range(num_models)
+    )
+    nodes.extend(StubDraw(f"draw.stub{i}") for i in range(num_draws))
+    nodes.append(StubScreen())
+    return StubPipeline(nodes)
+
+
+def make_stub_configs(
+    config_path: Path, num_types: int = 6, nodes_per_type: int = 10
+) -> Path:
+    """Write stub PeekingDuck configs folder: <node type>/<node name>.yml
+
+    Args:
+        config_path (Path): folder to create configs in
+        num_types (int, optional): number of node types, max 6. Defaults to 6.
+        nodes_per_type (int, optional): node configs per type. Defaults to 10.
+
+    Returns:
+        Path: the configs folder
+    """
+    for node_type in STUB_NODE_TYPES[:num_types]:
+        type_path = config_path / node_type
+        type_path.mkdir(parents=True, exist_ok=True)
+        for i in range(nodes_per_type):
+            with open(type_path / f"stub{i}.yml", "w") as file:
+                yaml.dump(STUB_NODE_CONFIG, file)
+    return config_path
@@ -0,0 +1,411 @@
+#
+# PeekingDuck Studio Benchmark Suite: Studio's hot paths, measured offline with
+# stub nodes/configs and compared against a stored baseline.
+#
+# Technote: each benchmark returns secs per operation, the best of REPEAT runs
+# (least disturbed by other processes). A benchmark regresses if it is slower
+# than its baseline by more than the threshold fraction, also when re-run once
+# (to rule out noise). Logging is pinned to its default level, as debug logging
+# skews results.
+#
+# Baselines are machine specific: the committed baseline.json only documents
+# the order of magnitude on its recording machine. Against a baseline from
+# another machine the suite only reports the changes, it never fails: re-save
+# the baseline locally (--save-baseline) first, then benchmark your changes.
+#
+# Usage: python -m benchmarks.suite [--save-baseline] [--threshold 0.25]
+#                                   [--baseline FILE] [--only NAME ...]
+#
+
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+from benchmarks.stub_nodes import make_stub_configs, make_stub_pipeline
+from peekingduck_studio.config_parser import NodeConfigParser
+from peekingduck_studio.core_utils import LOG_LEVEL, get_log_level, set_log_level
+from peekingduck_studio.frame_store import (
+    FRAME_STORE_JPEG,
+    CompressedFrameStore,
+    FrameStore,
+    blit_view,
+    zoom_frame,
+)
+from peekingduck_studio.model_pipeline import ModelPipeline
+from peekingduck_studio.pipeline_runner import ExecutionPlan
+from peekingduck_studio.session import SESSION_SUFFIX, SessionSaver, open_session
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+REGRESSION_THRESHOLD = 0.25  # fraction slower than baseline
+REPEAT = 7  # runs per benchmark, best one counts
+RESOLUTION = (640, 480)  # frame (width, height)
+NUM_FRAMES = 200  # frames per frame store/zoom/blit run
+NUM_ITERATIONS = 2000  # pipeline iterations per loop run
+NUM_PIPELINE_NODES = 20  # nodes in pipeline edited by pipeline_edit
+
+BENCHMARKS: Dict[str, Callable[[], float]] = {}
+
+
+def benchmark(func: Callable[[], float]) -> Callable[[], float]:
+    """Register benchmark function, it returns secs per operation"""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def make_frames(count: int = NUM_FRAMES) -> List[np.ndarray]:
+    """Random BGR frames of benchmark resolution"""
+    width, height = RESOLUTION
+    rng = np.random.default_rng(seed=42)
+    # smooth-ish random frames, so JPEG encodes them at a realistic size
+    small = rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8)
+    frame = cv2.resize(small, RESOLUTION)
+    return [np.roll(frame, i, axis=1) for i in range(count)]
+
+
+def best_of(run: Callable[[], float], repeat: int = REPEAT) -> float:
+    """Best (lowest) secs per operation of repeated runs"""
+    return min(run() for _ in range(repeat))
+
+
+@benchmark
+def iteration_loop() -> float:
+    """ExecutionPlan.run_iteration on no-op stub pipeline, secs per iteration"""
+
+    def run() -> float:
+        pipeline = make_stub_pipeline(NUM_ITERATIONS, (64, 48), 10, 10)
+        plan = ExecutionPlan(pipeline, prefetch=0)  # loop overhead only
+        frames = []
+        start = time.perf_counter()
+        for _ in range(NUM_ITERATIONS):
+            plan.run_iteration(frames.append)
+        return (time.perf_counter() - start) / NUM_ITERATIONS
+
+    return best_of(run)
+
+
+@benchmark
+def frame_capture_raw() -> float:
+    """Append frames to raw FrameStore (screen output capture), secs per frame"""
+    frames = make_frames()
+
+    def run() -> float:
+        store = FrameStore()
+        start = time.perf_counter()
+        for frame in frames:
+            store.append(frame)
+        elapsed = time.perf_counter() - start
+        store.close()
+        return elapsed / len(frames)
+
+    return best_of(run)
+
+
+@benchmark
+def frame_capture_jpeg() -> float:
+    """Append frames to JPEG CompressedFrameStore until all are encoded, secs per
+    frame"""
+    frames = make_frames()
+
+    def run() -> float:
+        store = CompressedFrameStore(FRAME_STORE_JPEG)
+        start = time.perf_counter()
+        for frame in frames:
+            store.append(frame)
+        store.get_encoded(len(frames) - 1)  # encoder is done with all before it
+        elapsed = time.perf_counter() - start
+        store.close()
+        return elapsed / len(frames)
+
+    return best_of(run)
+
+
+@benchmark
+def frame_flip() -> float:
+    """Vertical flip on CPU (Studio flips texture coords instead), secs per frame"""
+    frames = make_frames()
+
+    def run() -> float:
+        start = time.perf_counter()
+        for frame in frames:
+            cv2.flip(frame, 0)
+        return (time.perf_counter() - start) / len(frames)
+
+    return best_of(run)
+
+
+def _frame_access(store) -> float:
+    """Sequential then random access of all frames in store, secs per frame"""
+    rng = np.random.default_rng(seed=7)
+    order = [*range(len(store)), *rng.permutation(len(store))]
+
+    def run() -> float:
+        start = time.perf_counter()
+        for idx in order:
+            store[idx]
+        return (time.perf_counter() - start) / len(order)
+
+    try:
+        return best_of(run)
+    finally:
+        store.close()
+
+
+@benchmark
+def frame_access_raw() -> float:
+    """Access frames of raw FrameStore, half of them spilled to disk"""
+    frames = make_frames()
+    store = FrameStore(ram_budget=frames[0].nbytes * len(frames) // 2)
+    for frame in frames:
+        store.append(frame)
+    return _frame_access(store)
+
+
+@benchmark
+def frame_access_jpeg() -> float:
+    """Access frames of JPEG CompressedFrameStore (decode on cache miss)"""
+    store = CompressedFrameStore(FRAME_STORE_JPEG)
+    for frame in make_frames():
+        store.append(frame)
+    return _frame_access(store)
+
+
+@benchmark
+def zoom_cpu() -> float:
+    """CPU zoom (used when GPU zoom is off), secs per frame"""
+    frames = make_frames()
+
+    def run() -> float:
+        start = time.perf_counter()
+        for frame in frames:
+            zoom_frame(frame, 1.5)
+        return (time.perf_counter() - start) / len(frames)
+
+    return best_of(run)
+
+
+@benchmark
+def blit_prepare() -> float:
+    """Texture blit buffer preparation of contiguous and sliced frames, secs per
+    frame"""
+    frames = make_frames()
+    crops = [frame[:, 8:-8] for frame in frames]  # not contiguous: needs a copy
+
+    def run() -> float:
+        start = time.perf_counter()
+        for frame, crop in zip(frames, crops):
+            blit_view(frame)
+            blit_view(crop)
+        return (time.perf_counter() - start) / (2 * len(frames))
+
+    return best_of(run)
+
+
+@benchmark
+def session_replay() -> float:
+    """Open raw session archive and prepare every frame for display as replay
+    does, checking blit buffers are writable (Texture.blit_buffer rejects
+    read-only ones), secs per frame"""
+    frames = make_frames()
+    store = FrameStore()
+    for frame in frames:
+        store.append(frame)
+    with tempfile.TemporaryDirectory(prefix="pkds_bench_") as tmp_dir:
+        path = str(Path(tmp_dir) / f"session{SESSION_SUFFIX}")
+        saver = SessionSaver(path, store, "nodes: []", {})
+        saver.run()  # in this thread
+        if saver.error:
+            raise RuntimeError(saver.error)
+
+        def run() -> float:
+            start = time.perf_counter()
+            session_frames, _ = open_session(path)
+            for idx in range(len(session_frames)):
+                if memoryview(blit_view(session_frames[idx])).readonly:
+                    raise ValueError(f"session frame {idx} blit buffer is read-only")
+            elapsed = time.perf_counter() - start
+            if not np.array_equal(session_frames[len(frames) - 1], frames[-1]):
+                raise ValueError("session frames differ from saved frames")
+            return elapsed / len(frames)
+
+        return best_of(run)
+
+
+@benchmark
+def pipeline_edit() -> float:
+    """ModelPipeline insert/move/config/delete edits plus YAML string for a run,
+    secs per edit cycle"""
+    nodes = [{"model.stub": {"score_threshold": 0.5}}] * (NUM_PIPELINE_NODES - 2)
+    pipeline_dict = {"nodes": ["input.visual", *nodes, "output.screen"]}
+    num_cycles = 50
+
+    def run() -> float:
+        pipeline = ModelPipeline()
+        pipeline.parse_pipeline(pipeline_dict)
+        start = time.perf_counter()
+        for _ in range(num_cycles):
+            pipeline.node_insert(1)
+            uid = pipeline.get_node_by_index(1).uid
+            pipeline.node_move_down(uid)
+            pipeline.node_move_up(uid)
+            pipeline.set_user_config(uid, "brightness", 10)
+            pipeline.get_string_representation()
+            pipeline.node_delete(1)
+        return (time.perf_counter() - start) / num_cycles
+
+    return best_of(run)
+
+
+@benchmark
+def config_parser_startup() -> float:
+    """NodeConfigParser construction over stub configs without config cache, i.e.
+    indexing node titles only, secs per startup"""
+    with tempfile.TemporaryDirectory(prefix="pkds_bench_") as tmp_dir:
+        config_path = make_stub_configs(Path(tmp_dir))
+
+        def run() -> float:
+            start = time.perf_counter()
+            NodeConfigParser(config_path, cache_path=None)
+            return time.perf_counter() - start
+
+        return best_of(run)
+
+
+@benchmark
+def config_parser_warm_up() -> float:
+    """NodeConfigParser construction and warm-up over stub configs without config
+    cache, i.e. parsing all of them, secs per startup"""
+    with tempfile.TemporaryDirectory(prefix="pkds_bench_") as tmp_dir:
+        config_path = make_stub_configs(Path(tmp_dir))
+
+        def run() -> float:
+            start = time.perf_counter()
+            NodeConfigParser(config_path, cache_path=None).warm_up()
+            return time.perf_counter() - start
+
+        return best_of(run)
+
+
+@benchmark
+def config_parser_cached() -> float:
+    """NodeConfigParser construction over stub configs, from valid config cache,
+    secs per startup"""
+    with tempfile.TemporaryDirectory(prefix="pkds_bench_") as tmp_dir:
+        config_path = make_stub_configs(Path(tmp_dir) / "configs")
+        cache_path = Path(tmp_dir) / "config_cache.pkl"
+        NodeConfigParser(config_path, cache_path).warm_up()  # creates cache
+
+        def run() -> float:
+            start = time.perf_counter()
+            NodeConfigParser(config_path, cache_path)
+            return time.perf_counter() - start
+
+        return best_of(run)
+
+
+def run_benchmarks(names: List[str]) -> Dict[str, float]:
+    """Run given benchmarks, printing progress
+
+    Args:
+        names (List[str]): benchmark names
+
+    Returns:
+        Dict[str, float]: benchmark name -> secs per operation
+    """
+    results = {}
+    for name in names:
+        results[name] = BENCHMARKS[name]()
+        print(f"{name:<24}: {results[name] * 1e6:12.2f} us")
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Compare results against baseline and print report
+
+    Args:
+        results (Dict[str, float]): benchmark name -> secs per operation
+        baseline (Dict[str, float]): baseline secs per operation
+        threshold (float): max fraction slower than baseline
+
+    Returns:
+        List[str]: names of regressed benchmarks
+    """
+    regressions = []
+    print(f"\nvs baseline (threshold {threshold:+.0%}):")
+    for name, secs in results.items():
+        if name not in baseline:
+            print(f"{name:<24}: no baseline")
+            continue
+        change = secs / baseline[name] - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<24}: {change:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="PeekingDuck Studio benchmarks")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="JSON file")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="save results as baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help=f"regression threshold fraction (default {REGRESSION_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run"
+    )
+    args = parser.parse_args(argv)
+
+    set_log_level(LOG_LEVEL)  # not PKDS_LOG_LEVEL, debug logging skews results
+    machine = f"{platform.node()} {platform.machine()}"
+    results = run_benchmarks(args.only or list(BENCHMARKS))
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline = {
+            "machine": machine,
+            "python": platform.python_version(),
+            "log_level": logging.getLevelName(get_log_level()),
+            "results": results,
+        }
+        with open(baseline_path, "w") as file:
+            json.dump(baseline, file, indent=2)
+        print(f"baseline saved to {baseline_path}")
+        return 0
+    if not baseline_path.is_file():
+        print(f"no baseline {baseline_path}, save one with --save-baseline")
+        return 0
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print("\nre-running regressed benchmarks to rule out noise:")
+        rerun = run_benchmarks(regressions)
+        regressions = compare(
+            {name: min(results[name], rerun[name]) for name in regressions},
+            baseline["results"],
+            args.threshold,
+        )
+    if baseline["machine"] != machine:
+        print(
+            f"\nbaseline is from {baseline['machine']}, not {machine}: report only,"
+            " re-save it with --save-baseline to check for regressions"
+        )
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
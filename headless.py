@@ -0,0 +1,10 @@
+if __name__ == "__main__":
+    # Run a pipeline without GUI, e.g. on CI/benchmark machines (see --help)
+    import sys
+    from multiprocessing import freeze_support
+
+    freeze_support()
+
+    from peekingduck_studio.headless import main
+
+    sys.exit(main())
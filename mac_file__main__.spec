@@ -1,7 +1,16 @@
 # -*- mode: python ; coding: utf-8 -*-
 # for M1 macOS
+import os
 
 block_cipher = None
+# prebuilt node config cache, bundled if built first with:
+#   python -m peekingduck_studio.config_cache
+config_cache = 'peekingduck_studio/pkds_config_cache.pkl'
+config_cache_datas = (
+    [(config_cache, 'peekingduck_studio')]
+    if os.path.isfile(os.path.join(SPECPATH, config_cache))
+    else []
+)
 
 
 a = Analysis(
@@ -39,7 +48,7 @@ a = Analysis(
 #        ('/opt/homebrew/Caskroom/miniforge/base/envs/temp/lib/python3.9/site-packages/tqdm', 'tqdm'),
         ('/opt/homebrew/Caskroom/miniforge/base/envs/temp/lib/python3.9/unittest', 'unittest'),
 #        ('/opt/homebrew/Caskroom/miniforge/base/envs/temp/lib/python3.9/site-packages/urllib3', 'urllib3'),
-    ],
+    ] + config_cache_datas,
     hiddenimports=[
         "absl",
         "click",
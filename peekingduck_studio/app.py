@@ -32,8 +32,6 @@
 # - edit config error check: value range
 # - edit config error check: value type
 # - edit config: present type-based options when setting values
-# - output: playback speed?
-# - export output as video file
 # - confirmation before any operation that destroys unsaved pipeline
 # - file save: confirm before overwriting existing file
 # - user preferences/app config: default folder, etc.
@@ -82,6 +80,7 @@ print(f"Kivy import done: {datetime.now().strftime('%H:%M:%S')}")
 
 from typing import List
 import json
+import logging
 import os
 from pathlib import Path
 import yaml
@@ -93,7 +92,9 @@ from peekingduck_studio.gui_utils import (
     CONFIG_COLOR_SELECTED,
     CONFIG_COLOR_CLEAR,
     shake_widget,
+    get_log_level,
     make_logger,
+    set_log_level,
 )
 from peekingduck_studio.gui_widgets import (
     FileLoadDialog,
@@ -102,12 +103,21 @@ from peekingduck_studio.gui_widgets import (
     Node,
     ScreenPipeline,
     ScreenPlayback,
+    VideoExportDialog,
 )
 from peekingduck_studio.config_controller import ConfigController
 from peekingduck_studio.config_parser import NodeConfigParser
 from peekingduck_studio.output_controller import OutputController
 from peekingduck_studio.pipeline_controller import PipelineController
 from peekingduck_studio.model_pipeline import ModelPipeline
+from peekingduck_studio.session import SESSION_SUFFIX, read_session_index
+from peekingduck_studio.node_stats import STATS_FILE_FILTERS, STATS_SUFFIXES
+from peekingduck_studio.video_export import (
+    EXPORT_CODEC_AUTO,
+    EXPORT_CODEC_CHOICES,
+    EXPORT_FILE_FILTERS,
+    parse_export_options,
+)
 
 print(f"PeekingDuck import end: {datetime.now().strftime('%H:%M:%S')}")
 
@@ -117,9 +127,10 @@ print(f"PeekingDuck import end: {datetime.now().strftime('%H:%M:%S')}")
 ROOT_PATH = "/"
 CURR_PATH = str(Path.home())
 DIR_FILTERS = [""]
-FILE_FILTERS = ["*yml"]
+FILE_FILTERS = ["*yml", f"*{SESSION_SUFFIX}"]
 BUTTON_DELAY: float = 0.25
 PLAYBACK_DELAY: float = 0.01
+CONFIG_WARM_UP_DELAY: float = 1.0  # secs after window is shown
 
 logger = make_logger(__name__)
 logger.info(f"root_path={ROOT_PATH}, curr_path={CURR_PATH}")
@@ -154,6 +165,9 @@ class PeekingDuckStudioApp(App):
         )
         self.output_controller = OutputController(self.pkd_view)
         self.pipeline_controller = PipelineController(self.pipeline_view)
+        self.output_controller.node_stats_callback = (
+            self.pipeline_controller.show_node_stats
+        )
         self.pipeline_model = None
 
         Window.bind(on_resize=self.on_window_resize)
@@ -163,6 +177,16 @@ class PeekingDuckStudioApp(App):
 
         return sm
 
+    def on_start(self):
+        """Kivy application started, parse remaining node configs once window shows"""
+        Clock.schedule_once(
+            lambda dt: self.config_parser.start_warm_up(), CONFIG_WARM_UP_DELAY
+        )
+
+    def on_stop(self):
+        """Kivy application exit point, stop any pipeline still running"""
+        self.output_controller.shutdown()
+
     # Window events (experimental)
     def on_window_resize(self, win, width, height):
         """Callback on Window resize event,
@@ -227,13 +251,19 @@ class PeekingDuckStudioApp(App):
         Returns:
             bool: True if accept, False will percolate key down event
         """
-        logger.debug(f"keycode={keycode}, text={text}, modifiers={modifiers}")
+        logger.debug("keycode=%s, text=%s, modifiers=%s", keycode, text, modifiers)
         # if keycode[1] == "escape":
         #     keyboard.release()  # stop accepting key inputs
         if keycode[1] == "escape":
             self.clear_selected_configs()
             self.clear_selected_nodes()
             return True  # to accept key, else will be used by system
+        if keycode[1] == "f12":
+            # toggle debug logging at runtime
+            level = logging.INFO if get_log_level() == logging.DEBUG else logging.DEBUG
+            set_log_level(level)
+            logger.info(f"log level {logging.getLevelName(level)}")
+            return True
         return False
 
     # App GUI Widget Access
@@ -666,6 +696,76 @@ A multiple-nights/weekends project using Python and Kivy"""
     def btn_zoom_out(self, *args) -> None:
         self.output_controller.zoom_out()
 
+    def btn_export(self, *args) -> None:
+        controller = self.output_controller
+        if controller.exporting:
+            msg = "Export in progress. Please wait for it to finish."
+        elif controller.frames or controller.pipeline_running:
+            file_dialog = VideoExportDialog(
+                save=self.export_file, cancel=self.cancel_file_dialog
+            )
+            size = controller.export_size
+            file_dialog.setup(
+                root_path=ROOT_PATH,
+                path=CURR_PATH,
+                filters=EXPORT_FILE_FILTERS,
+                filename=f"{Path(self.filename).stem}.mp4",
+                codecs=EXPORT_CODEC_CHOICES,
+                codec=controller.export_codec or EXPORT_CODEC_AUTO,
+                fps=f"{controller.export_fps:g}" if controller.export_fps else "",
+                size=f"{size[0]}x{size[1]}" if size else "",
+            )
+            self._file_dialog = Popup(
+                title="Export Video", content=file_dialog, size_hint=(0.75, 0.75)
+            )
+            self._file_dialog.open()
+            return
+        else:
+            msg = "No output to export. Please run pipeline first."
+        msgbox = MsgBox("Video Export Alert", msg, "Ok", font_size=self.font_size)
+        msgbox.show()
+
+    def btn_save_session(self, *args) -> None:
+        controller = self.output_controller
+        if controller.exporting:
+            msg = "Export in progress. Please wait for it to finish."
+        elif controller.pipeline_running:
+            msg = "Please wait for pipeline to finish before saving session."
+        elif controller.frames:
+            file_dialog = FileSaveDialog(
+                save=self.save_session_file, cancel=self.cancel_file_dialog
+            )
+            file_dialog.setup(
+                root_path=ROOT_PATH,
+                path=CURR_PATH,
+                filters=[f"*{SESSION_SUFFIX}"],
+                filename=f"{Path(self.filename).stem}{SESSION_SUFFIX}",
+            )
+            self._file_dialog = Popup(
+                title="Save Session", content=file_dialog, size_hint=(0.75, 0.75)
+            )
+            self._file_dialog.open()
+            return
+        else:
+            msg = "No output to save. Please run pipeline first."
+        msgbox = MsgBox("Session Save Alert", msg, "Ok", font_size=self.font_size)
+        msgbox.show()
+
+    def btn_export_stats(self, *args) -> None:
+        file_dialog = FileSaveDialog(
+            save=self.export_stats_file, cancel=self.cancel_file_dialog
+        )
+        file_dialog.setup(
+            root_path=ROOT_PATH,
+            path=CURR_PATH,
+            filters=STATS_FILE_FILTERS,
+            filename=f"{Path(self.filename).stem}_stats{STATS_SUFFIXES[0]}",
+        )
+        self._file_dialog = Popup(
+            title="Export Node Stats", content=file_dialog, size_hint=(0.75, 0.75)
+        )
+        self._file_dialog.open()
+
     # Touch events
     # def on_touch_down(self, touch):
     """This method is passed as a callback to widgets to get them to reroute
@@ -685,7 +785,8 @@ A multiple-nights/weekends project using Python and Kivy"""
     # File operations
     #####################
     def load_file(self, instance: Widget, file_paths: List[str], *args) -> None:
-        """Load selected PeekingDuck pipeline configuration yaml file.
+        """Load selected PeekingDuck pipeline configuration yaml file or session.
+        (session archive saves a finished run, see session.py)
         Called when user selects a file and clicks Select button in FileLoadDialog.
 
         Technote: there are spurious callbacks when selection is a folder and not a
@@ -703,6 +804,11 @@ A multiple-nights/weekends project using Python and Kivy"""
             logger.debug(f"empty file_paths={file_paths}")
             return
         the_path = file_paths[0]  # only want first file
+        if the_path.endswith(SESSION_SUFFIX):
+            self._file_dialog.dismiss()
+            CURR_PATH = os.path.dirname(the_path)  # set as last visited path
+            self.open_session(the_path)
+            return
         if not the_path.endswith(".yml"):
             logger.debug(f"bogus submit: file={the_path}")
             return
@@ -749,6 +855,119 @@ A multiple-nights/weekends project using Python and Kivy"""
         )
         msgbox.show()
 
+    def export_file(self, path: str, file_path: str) -> None:
+        """Called by Export Video callback.
+        Export output frames to video file in the background, streaming them if
+        pipeline is still running. Video codec, frame rate and size are taken from
+        the dialog's options.
+
+        Args:
+            path (str): path to folder to save video file
+            file_path (str): the video file name/path
+        """
+        options = self._file_dialog.content
+        try:
+            export_codec, export_fps, export_size = parse_export_options(
+                options.codec_spinner.text,
+                options.fps_input.text,
+                options.size_input.text,
+            )
+        except ValueError as e:
+            msgbox = MsgBox(
+                "Video Export Alert", str(e), "Ok", font_size=self.font_size
+            )
+            msgbox.show()
+            return  # keep dialog open to fix option
+        self._file_dialog.dismiss()
+        full_path = file_path if file_path.startswith(path) else f"{path}/{file_path}"
+        logger.debug(f"full_path: {full_path}")
+        controller = self.output_controller
+        controller.export_codec = export_codec
+        controller.export_fps = export_fps
+        controller.export_size = export_size
+        controller.export_video(full_path)
+
+    def save_session_file(self, path: str, file_path: str) -> None:
+        """Called by Save Session callback.
+        Save finished run as session archive in the background, SESSION_SUFFIX is
+        appended to file name if missing.
+
+        Args:
+            path (str): path to folder to save session file
+            file_path (str): the session file name/path
+        """
+        self._file_dialog.dismiss()
+        full_path = file_path if file_path.startswith(path) else f"{path}/{file_path}"
+        if not full_path.endswith(SESSION_SUFFIX):
+            full_path += SESSION_SUFFIX
+        logger.debug(f"full_path: {full_path}")
+        if not self.output_controller.save_session(full_path):
+            msgbox = MsgBox(
+                "Session Save Alert",
+                "Please wait for pipeline to finish before saving session.",
+                "Ok",
+                font_size=self.font_size,
+            )
+            msgbox.show()
+
+    def export_stats_file(self, path: str, file_path: str) -> None:
+        """Called by Export Node Stats callback.
+        Save node latency stats of current/last run as CSV or JSON by file
+        extension, CSV if it is neither.
+
+        Args:
+            path (str): path to folder to save stats file
+            file_path (str): the stats file name/path
+        """
+        self._file_dialog.dismiss()
+        full_path = file_path if file_path.startswith(path) else f"{path}/{file_path}"
+        if Path(full_path).suffix.lower() not in STATS_SUFFIXES:
+            full_path += STATS_SUFFIXES[0]
+        logger.debug(f"full_path: {full_path}")
+        if not self.output_controller.export_node_stats(full_path):
+            msgbox = MsgBox(
+                "Node Stats Alert",
+                "No node stats to export. Please run pipeline first.",
+                "Ok",
+                font_size=self.font_size,
+            )
+            msgbox.show()
+
+    def open_session(self, the_path: str) -> None:
+        """Open saved session archive: load its pipeline and replay its frames
+        without re-running the pipeline
+
+        Args:
+            the_path (str): session archive path
+        """
+        if self.output_controller.pipeline_running:
+            msgbox = MsgBox(
+                "Session Open Alert",
+                "Please stop running pipeline before opening session.",
+                "Ok",
+                font_size=self.font_size,
+            )
+            msgbox.show()
+            return
+        try:
+            index = read_session_index(the_path)
+        except (OSError, ValueError) as e:
+            msgbox = MsgBox(
+                "Session Open Error", str(e), "Ok", font_size=self.font_size
+            )
+            msgbox.show()
+            return
+        pipeline_path = index["pipeline_path"]
+        self.filename = os.path.basename(pipeline_path)
+        self.project_info.directory = os.path.dirname(pipeline_path)
+        self.project_info.filename = self.filename
+        self.pipeline_model = ModelPipeline(pipeline_path, index["pipeline"])
+        self.config_parser.set_pipeline_model(self.pipeline_model)
+        self._do_begin_pipeline()
+        self.output_controller.open_session(the_path)
+        self.sm.transition.direction = "left"
+        self.sm.current = "screen_playback"
+
     #####################
     # Pipeline processing
     #####################
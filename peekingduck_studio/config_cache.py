@@ -0,0 +1,163 @@
+#
+# PeekingDuck Studio Node Config Catalogue Cache
+#
+# Technote: NodeConfigParser needs the catalogue of PeekingDuck nodes: node
+# titles by type, default configs and their guessed value types. Building it
+# parses every node config YAML file, so it is pickled into a cache file in the
+# user's home folder and loaded from there on later launches. The cache is keyed
+# by cache format, PeekingDuck version, config folder and the mtimes of it and
+# its node type folders (i.e. adding, removing or renaming a config file), and
+# rebuilt when the key no longer matches: NodeConfigParser then parses configs
+# on demand, and saves the cache once its background warm-up has parsed them all.
+#
+# A frozen (PyInstaller) app may ship a prebuilt cache next to this module, made
+# with `python -m peekingduck_studio.config_cache` before bundling. Its folder
+# mtimes are those of the build machine (or of the unpacked bundle), so it is
+# only matched by cache format and PeekingDuck version.
+#
+
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import os
+import pickle
+import sys
+import tempfile
+import peekingduck
+from peekingduck_studio.core_utils import (
+    USER_HOME,
+    find_config_dirs,
+    get_peekingduck_path,
+    guess_config_value_types,
+    make_logger,
+    parse_configs,
+)
+
+CONFIG_CACHE_FORMAT = 1  # bump when catalogue contents change
+CONFIG_CACHE_PATH = USER_HOME / ".peekingduckstudio_config_cache.pkl"
+BUNDLED_CONFIG_CACHE_PATH = Path(__file__).parent / "pkds_config_cache.pkl"
+
+logger = make_logger(__name__)
+
+
+def config_cache_key(config_path: Path, config_dirs: List[Path]) -> Dict[str, Any]:
+    """Make cache key of node config catalogue
+
+    Args:
+        config_path (Path): node configs folder
+        config_dirs (List[Path]): node type folders within it
+
+    Returns:
+        Dict[str, Any]: the cache key
+    """
+    return {
+        "format": CONFIG_CACHE_FORMAT,
+        "peekingduck": peekingduck.__version__,
+        "config_path": str(config_path),
+        "mtimes": [
+            (path.name, path.stat().st_mtime_ns) for path in [config_path, *config_dirs]
+        ],
+    }
+
+
+def build_catalogue(config_dirs: List[Path]) -> Dict[str, Any]:
+    """Parse node configs into catalogue
+
+    Args:
+        config_dirs (List[Path]): node type folders
+
+    Returns:
+        Dict[str, Any]: nodes_by_type, default_config_map, default_config_types
+    """
+    nodes_by_type, default_config_map = parse_configs(config_dirs)
+    return {
+        "nodes_by_type": nodes_by_type,
+        "default_config_map": default_config_map,
+        "default_config_types": guess_config_value_types(default_config_map),
+    }
+
+
+def read_cache(cache_path: Path) -> Optional[Dict[str, Any]]:
+    """Read cache file
+
+    Args:
+        cache_path (Path): cache file
+
+    Returns:
+        Optional[Dict[str, Any]]: cache key and catalogue, None if unreadable
+    """
+    try:
+        with open(cache_path, "rb") as file:
+            return pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # e.g. truncated file, written by newer Python
+        logger.warning(f"ignore config cache {cache_path}: {e}")
+        return None
+
+
+def write_cache(cache_path: Path, key: Dict[str, Any], catalogue: Dict) -> None:
+    """Write cache file atomically, so a crash never leaves a partial cache
+
+    Args:
+        cache_path (Path): cache file
+        key (Dict[str, Any]): cache key
+        catalogue (Dict): node config catalogue
+    """
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            prefix="pkds_config_cache_", dir=cache_path.parent
+        )
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(
+                {"key": key, "catalogue": catalogue},
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, cache_path)
+        logger.debug(f"config cache saved to {cache_path}")
+    except OSError as e:  # e.g. read-only home, cache is only an optimisation
+        logger.warning(f"cannot save config cache {cache_path}: {e}")
+
+
+def read_catalogue(
+    config_path: Path, key: Dict[str, Any], cache_path: Path = CONFIG_CACHE_PATH
+) -> Optional[Dict[str, Any]]:
+    """Read node config catalogue from cache, or from bundled cache if frozen
+
+    Args:
+        config_path (Path): node configs folder
+        key (Dict[str, Any]): current cache key, from config_cache_key()
+        cache_path (Path, optional): cache file. Defaults to CONFIG_CACHE_PATH.
+
+    Returns:
+        Optional[Dict[str, Any]]: nodes_by_type, default_config_map,
+                                  default_config_types; None if out of date
+    """
+    cache = read_cache(cache_path)
+    if cache and cache["key"] == key:
+        logger.debug(f"config catalogue from {cache_path}")
+        return cache["catalogue"]
+    pkd_configs = config_path == get_peekingduck_path() / "configs"
+    if getattr(sys, "frozen", False) and pkd_configs:
+        cache = read_cache(BUNDLED_CONFIG_CACHE_PATH)
+        if cache and all(
+            cache["key"][field] == key[field] for field in ("format", "peekingduck")
+        ):
+            logger.debug("config catalogue from bundled cache")
+            return cache["catalogue"]
+    logger.info(f"config cache out of date, configs in {config_path} parsed lazily")
+    return None
+
+
+def main() -> None:
+    """Build cache of PeekingDuck's node configs to ship in PyInstaller bundle"""
+    config_path = get_peekingduck_path() / "configs"
+    config_dirs = find_config_dirs(config_path)
+    key = config_cache_key(config_path, config_dirs)
+    write_cache(BUNDLED_CONFIG_CACHE_PATH, key, build_catalogue(config_dirs))
+    print(f"config cache for PeekingDuck {key['peekingduck']}:")
+    print(BUNDLED_CONFIG_CACHE_PATH)
+
+
+if __name__ == "__main__":
+    main()
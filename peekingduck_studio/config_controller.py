@@ -215,7 +215,7 @@ class ConfigController:
         Args:
             node_title (str): new node title for config header
         """
-        logger.debug(f"node_title: {node_title}")
+        logger.debug("node_title: %s", node_title)
         node_type = get_node_type(node_title)
         node_name = get_node_name(node_title)
         # NB: set new list of node names _before_ setting node type and name
@@ -332,7 +332,7 @@ class ConfigController:
         if uid:
             node = self.pipeline_model.get_node_by_uid(uid)
             user_config = node.user_config
-            logger.debug(f"user_config={user_config}")
+            logger.debug("user_config=%s", user_config)
             node_title = node.node_title
             self.set_node_config_header(node_title)
         else:
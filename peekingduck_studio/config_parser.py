@@ -1,14 +1,29 @@
 #
 # PeekingDuck Studio Parser for Node Configuration
 #
-from typing import Any, Dict, List
-from peekingduck_studio.gui_utils import (
+# Technote: unless the node config catalogue cache is valid, only the node titles
+# are indexed at startup, from the config file names. A node's config YAML is
+# parsed (and its value types guessed) the first time it is asked for, then kept.
+# warm_up() parses the remaining configs in a background thread once the window
+# is shown, and saves the catalogue cache for the next launch.
+#
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import threading
+from peekingduck_studio.config_cache import (
+    CONFIG_CACHE_PATH,
+    config_cache_key,
+    read_catalogue,
+    write_cache,
+)
+from peekingduck_studio.core_utils import (
     CUSTOM_NODES,
     get_peekingduck_path,
     find_config_dirs,
-    parse_configs,
     guess_config_value_types,
+    index_configs,
     make_logger,
+    parse_config_file,
 )
 from peekingduck_studio.model_node import ModelNode
 from peekingduck_studio.model_pipeline import ModelPipeline
@@ -17,15 +32,110 @@ logger = make_logger(__name__)
 
 
 class NodeConfigParser:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        cache_path: Optional[Path] = CONFIG_CACHE_PATH,
+    ) -> None:
+        """
+        Args:
+            config_path (Optional[Path], optional): node configs folder, e.g. stub
+                configs for benchmarks. Defaults to None (PeekingDuck's configs).
+            cache_path (Optional[Path], optional): node config catalogue cache
+                file, None to always parse configs. Defaults to CONFIG_CACHE_PATH.
+        """
         self.pkd_path = get_peekingduck_path()
-        self.config_path = self.pkd_path / "configs"
+        self.config_path = config_path or self.pkd_path / "configs"
         self.config_dirs = find_config_dirs(self.config_path)
         logger.debug(f"config_dirs: {self.config_dirs}")
-        self.nodes_by_type, self.default_config_map = parse_configs(self.config_dirs)
-        self.default_config_types = guess_config_value_types(self.default_config_map)
+        self.cache_path = cache_path
+        self._cache_key = (
+            config_cache_key(self.config_path, self.config_dirs) if cache_path else None
+        )
+        catalogue = (
+            read_catalogue(self.config_path, self._cache_key, cache_path)
+            if cache_path
+            else None
+        )
+        # map node title -> config file, of configs not parsed yet
+        self._config_files: Dict[str, Path] = {}
+        if catalogue:
+            self.nodes_by_type = catalogue["nodes_by_type"]
+            self.default_config_map = catalogue["default_config_map"]
+            self.default_config_types = catalogue["default_config_types"]
+        else:
+            self.nodes_by_type, self._config_files = index_configs(self.config_dirs)
+            self.default_config_map: Dict[str, Dict[str, Any]] = {}
+            self.default_config_types: Dict[str, Dict[str, str]] = {}
+        self._parse_lock = threading.Lock()  # UI thread vs warm-up thread
         self.pipeline_model: ModelPipeline = None
 
+    def _get_node_config(self, node_title: str) -> Dict[str, Any]:
+        """Return default config of PeekingDuck node, parsing it on first use
+
+        Args:
+            node_title (str): PeekingDuck node title
+
+        Returns:
+            Dict[str, Any]: the node's default configurations
+        """
+        node_config = self.default_config_map.get(node_title)
+        if node_config is None:
+            with self._parse_lock:
+                node_config = self.default_config_map.get(node_title)
+                if node_config is None:
+                    node_config = parse_config_file(self._config_files[node_title])
+                    self.default_config_types.update(
+                        guess_config_value_types({node_title: node_config})
+                    )
+                    # set last, marks node as parsed to unlocked readers
+                    self.default_config_map[node_title] = node_config
+        return node_config
+
+    def _get_node_config_types(self, node_title: str) -> Dict[str, str]:
+        """Return config value types of PeekingDuck node, parsing it on first use
+
+        Args:
+            node_title (str): PeekingDuck node title
+
+        Returns:
+            Dict[str, str]: the node's config value types
+        """
+        self._get_node_config(node_title)
+        return self.default_config_types[node_title]
+
+    def warm_up(self) -> None:
+        """Parse all node configs not parsed yet, then save the catalogue cache"""
+        if not self._config_files:
+            return  # catalogue came from cache
+        for node_list in self.nodes_by_type.values():
+            for node_title in node_list:
+                self._get_node_config(node_title)
+        logger.debug(f"{len(self.default_config_map)} node configs parsed")
+        if self.cache_path:
+            write_cache(
+                self.cache_path,
+                self._cache_key,
+                {
+                    "nodes_by_type": self.nodes_by_type,
+                    "default_config_map": self.default_config_map,
+                    "default_config_types": self.default_config_types,
+                },
+            )
+        self._config_files = {}
+
+    def start_warm_up(self) -> threading.Thread:
+        """Run warm_up() in background thread
+
+        Returns:
+            threading.Thread: the warm-up thread
+        """
+        thread = threading.Thread(
+            target=self.warm_up, name="pkds_config_warm_up", daemon=True
+        )
+        thread.start()
+        return thread
+
     def get_default_configs(self, node_title: str) -> Dict:
         """Return the default set of configuration for given node
 
@@ -41,7 +151,7 @@ class NodeConfigParser:
                 node_title[1 + len(CUSTOM_NODES) :]
             ]
             if node_title.startswith(CUSTOM_NODES)
-            else self.default_config_map[node_title]
+            else self._get_node_config(node_title)
         )
 
     def get_default_config_type(self, node_title: str, config_key: str) -> str:
@@ -60,7 +170,7 @@ class NodeConfigParser:
                 node_title[1 + len(CUSTOM_NODES) :]
             ]
             if node_title.startswith(CUSTOM_NODES)
-            else self.default_config_types[node_title]
+            else self._get_node_config_types(node_title)
         )
         config_type = default_types[config_key]
         return config_type
@@ -81,7 +191,7 @@ class NodeConfigParser:
                 node_title[1 + len(CUSTOM_NODES) :]
             ]
             if node_title.startswith(CUSTOM_NODES)
-            else self.default_config_map[node_title]
+            else self._get_node_config(node_title)
         )
         default_val = default_config[config_key]
         logger.debug(f"default_val: {default_val}")
@@ -102,7 +212,7 @@ class NodeConfigParser:
                 node_title[1 + len(CUSTOM_NODES) :]
             ]
             if node_title.startswith(CUSTOM_NODES)
-            else self.default_config_map[node_title]
+            else self._get_node_config(node_title)
         )
         keys = list(default_config.keys())
         logger.debug(f"keys: {keys}")
@@ -182,7 +292,7 @@ class NodeConfigParser:
                     logger.debug("skipping custom node")
                     continue  # ignore custom nodes for now...
                 # todo: support custom nodes
-                node_config = self.default_config_map[node_title]
+                node_config = self._get_node_config(node_title)
                 node_input = node_config["input"]
                 node_output = node_config["output"]
                 # check input
@@ -208,7 +318,7 @@ class NodeConfigParser:
 
             for node_title in node_list:
                 node_name = node_title.split(".")[1]
-                node_config = self.default_config_map[node_title]
+                node_config = self._get_node_config(node_title)
                 logger.debug(f"node_title={node_title}, node_name={node_name}")
                 logger.debug(node_config)
 
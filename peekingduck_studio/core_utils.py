@@ -0,0 +1,394 @@
+#
+# PeekingDuck Studio Core Utilities
+# NB: no Kivy imports here, so usable by headless/child processes
+#
+from typing import Any, Dict, List, Optional, Tuple, Union
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+import atexit
+import logging
+import multiprocessing as mp
+import os
+import platform
+import queue
+import time
+import yaml
+import peekingduck
+
+NODE_CONFIG_READONLY_KEYS = {"input", "output"}
+NODE_CONFIG_RESERVED_KEYS = {
+    "MODEL_NODES",
+    "model_size",
+    "weights",
+    "weights_parent_dir",
+}
+CUSTOM_NODES = "custom_nodes"
+
+
+def _get_path(filename: str):
+    name = os.path.splitext(filename)[0]
+    ext = os.path.splitext(filename)[1]
+
+    if platform.system() == "Darwin":
+        from AppKit import NSBundle
+
+        file = NSBundle.mainBundle().pathForResource_ofType_(name, ext)
+        return file or os.path.realpath(filename)
+    return os.path.realpath(filename)
+
+
+USER_HOME = Path.home()
+
+#
+# Logging: all Studio loggers are children of the LOGGER_ROOT package logger,
+# which has a single QueueHandler. A QueueListener thread writes the queued
+# records to console (INFO and up) and to a size-rotated log file, so logging
+# callers never wait for file I/O. The log level is set on LOGGER_ROOT only, at
+# runtime via set_log_level(), so disabled debug calls return right away (use
+# logger.debug("x=%s", x) on hot paths, f-strings are formatted even then).
+#
+LOG_FILE_ENV = "PKDS_LOG_FILE"  # environment variable overriding log file path
+LOG_FILE = os.environ.get(LOG_FILE_ENV) or _get_path(
+    f"{USER_HOME}/peekingduckstudio_log.txt"
+)
+# print(f"LOG_FILE={LOG_FILE}")
+LOG_FORMAT_FILE = "%(filename)s:%(lineno)s - %(funcName)s() - %(message)s"
+LOG_FORMAT_IO = "%(name)s - %(levelname)s - %(message)s"
+LOG_MAX_BYTES = 5 * 1024 ** 2  # log file is rotated when it reaches this size
+LOG_BACKUP_COUNT = 3  # rotated log files kept
+LOG_LEVEL = logging.INFO  # default log level
+LOG_LEVEL_ENV = "PKDS_LOG_LEVEL"  # environment variable overriding LOG_LEVEL
+LOGGER_ROOT = "peekingduck_studio"
+LOG_BATCH_INTERVAL = 0.1  # secs, max delay before queued records are written
+
+_log_listener: Optional[QueueListener] = None
+
+
+class _LocalQueueHandler(QueueHandler):
+    """QueueHandler for a queue read in this process: only merges message args
+    (they may change after the call), no record copy nor formatting, those are
+    left to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _RotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler checking file size only, the base class formats every
+    record twice to check whether it still fits"""
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return self.stream is not None and self.stream.tell() >= self.maxBytes
+
+
+class _BatchingQueueListener(QueueListener):
+    """QueueListener that lets records pile up for LOG_BATCH_INTERVAL when its
+    queue runs empty, instead of waking up (and taking the GIL from the logging
+    thread) for every single record"""
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        if block and self.queue.empty():
+            time.sleep(LOG_BATCH_INTERVAL)
+        return self.queue.get(block)
+
+
+def _setup_logging() -> None:
+    """Set up queue handler of LOGGER_ROOT and its listener thread, once"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    io_handler = logging.StreamHandler()
+    io_handler.setLevel(logging.INFO)
+    io_handler.setFormatter(logging.Formatter(LOG_FORMAT_IO))
+    # not mp.parent_process(), which needs Python 3.8+
+    if mp.current_process().name == "MainProcess":
+        fi_handler = _RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
+        )
+    else:  # child process appends only, main process rotates the shared file
+        fi_handler = logging.FileHandler(LOG_FILE, delay=True)
+    fi_handler.setFormatter(logging.Formatter(LOG_FORMAT_FILE))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = _BatchingQueueListener(
+        log_queue, io_handler, fi_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+    atexit.register(shutdown_logging)
+    root_logger = logging.getLogger(LOGGER_ROOT)
+    root_logger.addHandler(_LocalQueueHandler(log_queue))
+    level = logging.getLevelName(os.environ.get(LOG_LEVEL_ENV, "").upper())
+    root_logger.setLevel(level if isinstance(level, int) else LOG_LEVEL)
+
+
+def shutdown_logging() -> None:
+    """Write out queued log records and stop listener thread, called at exit
+    (child processes must call it themselves, they skip atexit handlers)"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+def set_log_level(level: Union[int, str]) -> None:
+    """Set level of all Studio loggers
+
+    Args:
+        level (Union[int, str]): log level, e.g. logging.DEBUG or "DEBUG"
+    """
+    _setup_logging()
+    logging.getLogger(LOGGER_ROOT).setLevel(level)
+
+
+def get_log_level() -> int:
+    """Get level of all Studio loggers
+
+    Returns:
+        int: log level
+    """
+    _setup_logging()
+    return logging.getLogger(LOGGER_ROOT).level
+
+
+def make_logger(name: str) -> logging.Logger:
+    """Get logger with given name, as a child of the LOGGER_ROOT logger
+
+    Args:
+        name (str): name of logger required, i.e. module __name__
+
+    Returns:
+        logging.Logger: the named logger
+    """
+    _setup_logging()
+    if name != LOGGER_ROOT and not name.startswith(f"{LOGGER_ROOT}."):
+        name = f"{LOGGER_ROOT}.{name}"  # e.g. __main__
+    return logging.getLogger(name)
+
+
+# Make logger for this module
+logger = make_logger(__name__)
+
+
+#
+# Helper methods for node configuration
+#
+def find_config_dirs(config_path: Path) -> List[Path]:
+    """Get directories containing PeekingDuck configs"""
+    files = config_path.glob("*")
+    config_dirs = sorted([file for file in files if file.is_dir()])
+    return config_dirs
+
+
+def get_peekingduck_path() -> Path:
+    """Return PeekingDuck full path"""
+    pkd_path = peekingduck.__path__[0]
+    return Path(pkd_path)
+
+
+def guess_config_type(key: str, val: Any) -> str:
+    """Guesstimate the type for given config key based on given value
+
+    Args:
+        key (str): given config key
+        val (Any): given value
+
+    Returns:
+        str: the type
+    """
+    the_type: str = "str"
+    if key in NODE_CONFIG_READONLY_KEYS:
+        the_type = "readonly"
+    elif isinstance(val, bool):
+        the_type = "bool"
+    elif isinstance(val, int):
+        the_type = "int"
+    elif isinstance(val, float):
+        if 0 <= val <= 1.0 and key.endswith(("_factor", "_threshold")):
+            the_type = "float_01"
+        else:
+            the_type = "float"
+    elif isinstance(val, dict):
+        if len(val) == 2 and key.endswith("resolution"):
+            the_type = "dict_wh"
+        else:
+            the_type = "dict"
+    elif isinstance(val, list):
+        if len(val) == 2 and key.endswith("resolution"):
+            the_type = "list_wh"
+        elif len(val) == 3 and key.endswith("_color"):
+            the_type = "list_bgr"
+        else:
+            the_type = "list"
+    elif isinstance(val, str):
+        the_type = "str_path" if key.endswith("_path") else "str"
+    else:
+        the_type = "nonetype"
+    return the_type
+
+
+def guess_config_value_types(
+    config_map: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, str]]:
+    """Guesstimate and store all config value types
+
+    Args:
+        config_map (Dict[str, Dict[str, Any]]): the config map to parse
+
+    Returns:
+        Dict[str, Dict[str, str]]: map of node_title -> { config_key -> config_type }
+    """
+    # map node_title -> { config_key -> config_type }
+    default_config_types: Dict[str, Dict[str, str]] = {}
+    for node_title, default_config in config_map.items():
+        logger.debug(f"{node_title}")
+        config_type_map = {}  # map config_key -> config_type
+        for k, v in default_config.items():
+            if k in NODE_CONFIG_RESERVED_KEYS:
+                continue  # skip reserved keys
+            config_type = guess_config_type(k, v)
+            logger.debug(f"  {k}: {config_type} = {v}")
+            config_type_map[k] = config_type
+        default_config_types[node_title] = config_type_map
+    return default_config_types
+
+
+def has_custom_nodes(cust_node_config_path: Path) -> bool:
+    """Check if given path contains custom nodes config files
+
+    Args:
+        cust_node_config_path (Path): the path to check
+
+    Returns:
+        bool: True if has custom nodes config files, otherwise False
+    """
+    return cust_node_config_path.is_dir() and any(cust_node_config_path.iterdir())
+
+
+def index_configs(
+    config_dirs: List[Path],
+) -> Tuple[Dict[str, List[str]], Dict[str, Path]]:
+    """Index node configurations by file name only, without parsing them.
+
+    Args:
+        config_dirs (List[Path]): List of node config directory paths
+
+    Returns:
+        Tuple[Dict, Dict]: map of node type -> list of node titles,
+                            map of node title -> node config file
+    """
+    # map node type -> list of node titles
+    nodes_by_type: Dict[str, List[str]] = dict()
+    # map node title -> node config file
+    config_files: Dict[str, Path] = dict()
+    for config in config_dirs:
+        node_type = config.name
+        node_title_list = []
+        for config_file in sorted(config.glob("*.yml")):
+            node_title = f"{node_type}.{config_file.name[:-4]}"
+            config_files[node_title] = config_file
+            node_title_list.append(node_title)
+        nodes_by_type[node_type] = node_title_list
+    return nodes_by_type, config_files
+
+
+def parse_config_file(config_file: Path) -> Dict[str, Any]:
+    """Parse node configuration file
+
+    Args:
+        config_file (Path): node config YAML file
+
+    Returns:
+        Dict[str, Any]: the node config
+    """
+    with open(config_file) as file:
+        node_config = yaml.safe_load(file)
+    logger.debug("%s: %s", config_file.name, node_config)
+    return node_config
+
+
+def parse_configs(
+    config_dirs: List[Path],
+) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, Any]]]:
+    """Parse PeekingDuck default node configurations.
+
+    Args:
+        config_dirs (List[Path]): List of node config directory paths
+
+    Returns:
+        Tuple[Dict, Dict]: map of node type -> list of node titles,
+                            map of node title -> default node configs
+    """
+    nodes_by_type, config_files = index_configs(config_dirs)
+    # map node title -> node config
+    default_config_map: Dict[str, Dict[str, Any]] = {
+        node_title: parse_config_file(config_file)
+        for node_title, config_file in config_files.items()
+    }
+    return nodes_by_type, default_config_map
+
+
+#
+# Helper methods for pipeline node management
+#
+def get_node_type(node_title: str) -> str:
+    """Get node type from node title = *.node_type.node_name where * = 'CUSTOM_NODES'
+
+    Args:
+        node_title (str): the node title to parse
+
+    Returns:
+        str: the node type
+    """
+    tokens = node_title.split(".")
+    node_type = tokens[1] if tokens[0] == CUSTOM_NODES else tokens[0]
+    return node_type
+
+
+def get_node_name(node_title: str) -> str:
+    """Get node name from node title = *.node_type.node_name where * = 'CUSTOM_NODES'
+
+    Args:
+        node_title (str): the node title to parse
+
+    Returns:
+        str: the node name
+    """
+    tokens = node_title.split(".")
+    return tokens[-1]
+
+
+#
+# Helper class for performance measurement
+#
+class RateMeter:
+    """Measure rate of events per second (e.g. iterations, frames), averaged
+    over a reporting interval so that it can be shown without flickering"""
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        self.reset()
+
+    def reset(self) -> None:
+        """Restart measurement"""
+        self.rate: float = 0.0
+        self._start_time = time.perf_counter()
+        self._start_count = 0
+
+    def update(self, count: int) -> bool:
+        """Update rate with running total count of events
+
+        Args:
+            count (int): total number of events so far
+
+        Returns:
+            bool: True if rate has been recalculated (once per interval)
+        """
+        now = time.perf_counter()
+        elapsed = now - self._start_time
+        if elapsed < self.interval:
+            return False
+        self.rate = (count - self._start_count) / elapsed
+        self._start_time = now
+        self._start_count = count
+        return True
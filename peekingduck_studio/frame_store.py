@@ -0,0 +1,491 @@
+#
+# PeekingDuck Studio Frame Store for Output Playback
+#
+# Technote: frames are numbered 0..n-1. The most recent frames are kept in RAM
+# within a byte budget, older frames spill into a memory-mapped file in the temp
+# directory, at slot == frame index, so random access stays O(1) either way:
+#
+#   0 ................ num_spilled-1 | num_spilled ............... n-1
+#   [        np.memmap file         ] [  RAM: dict frame index -> frame  ]
+#
+# Alternatively, CompressedFrameStore keeps every frame JPEG/PNG encoded in RAM.
+# Encoding runs on a background thread, frames are decoded on demand into a small
+# LRU cache, which playback can fill ahead of time via prefetch().
+#
+
+from typing import Dict, List, Optional, Set, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+import threading
+import time
+import weakref
+import cv2
+import numpy as np
+from peekingduck_studio.core_utils import make_logger
+
+FRAME_STORE_RAM_BUDGET = 1024 ** 3  # bytes of most recent frames kept in RAM
+SPILL_MIN_CAPACITY = 256  # frames, initial size of memory-mapped spill file
+# frame store modes
+FRAME_STORE_RAW = "raw"  # uncompressed, spill to memory-mapped file
+FRAME_STORE_JPEG = "jpeg"  # compressed (lossy), smallest
+FRAME_STORE_PNG = "png"  # compressed (lossless)
+FRAME_STORE_MODES = [FRAME_STORE_RAW, FRAME_STORE_JPEG, FRAME_STORE_PNG]
+JPEG_QUALITY = 90
+PNG_COMPRESSION = 1  # 0-9, higher is smaller but slower
+DECODE_CACHE_SIZE = 16  # decoded frames kept by CompressedFrameStore
+MAX_PENDING_ENCODES = 32  # raw frames waiting to be encoded before append() blocks
+
+logger = make_logger(__name__)
+
+
+def _remove_file(path: str) -> None:
+    """Delete given file if it exists (used as finalizer, so no logging)"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class FrameStore:
+    """List-like store of output frames (append, len, index) with bounded RAM use.
+    Safe for one writer thread (pipeline worker) and one reader thread (UI).
+    """
+
+    def __init__(self, ram_budget: int = FRAME_STORE_RAM_BUDGET) -> None:
+        self.ram_budget = ram_budget
+        self._lock = threading.Lock()
+        self._num_frames: int = 0
+        self._ram: Dict[int, np.ndarray] = {}  # frame index -> frame
+        self._ram_bytes: int = 0
+        self._odd: Dict[int, np.ndarray] = {}  # spilled frames of a different shape
+        self._num_spilled: int = 0
+        self._spill: np.memmap = None
+        self._spill_path: str = None
+        self._spill_capacity: int = 0
+        self._spill_shape: Tuple[int, ...] = None
+        self._spill_dtype: np.dtype = None
+        self._reserved: int = 0
+        self._finalizer = None
+        self._timestamps: List[float] = []  # capture time of each frame
+
+    @classmethod
+    def from_array(
+        cls, frames: np.ndarray, timestamps: Optional[np.ndarray] = None
+    ) -> "FrameStore":
+        """Make read-only frame store of existing frames array, e.g. memory-mapped
+        frames of a saved session. Frames are read lazily from the array.
+
+        Args:
+            frames (np.ndarray): frames array, shape (num_frames, *frame_shape)
+            timestamps (Optional[np.ndarray], optional): frame capture times.
+                                                         Defaults to None.
+
+        Returns:
+            FrameStore: the frame store
+        """
+        store = cls()
+        store._spill = frames  # frame index == slot, same as own spill file
+        store._spill_shape = frames.shape[1:]
+        store._spill_dtype = frames.dtype
+        store._spill_capacity = len(frames)
+        store._num_spilled = store._num_frames = len(frames)
+        if timestamps is not None:
+            store._timestamps = list(timestamps)
+        return store
+
+    def __len__(self) -> int:
+        return self._num_frames
+
+    def __bool__(self) -> bool:
+        return self._num_frames > 0
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        """Get frame at given index, negative index counts from the end
+
+        Args:
+            idx (int): frame index
+
+        Returns:
+            np.ndarray: the frame
+        """
+        with self._lock:
+            if idx < 0:
+                idx += self._num_frames
+            if not 0 <= idx < self._num_frames:
+                raise IndexError(f"frame index {idx} out of range")
+            if idx >= self._num_spilled:
+                return self._ram[idx]
+            if idx in self._odd:
+                return self._odd[idx]
+            return self._spill[idx]
+
+    @property
+    def num_spilled(self) -> int:
+        return self._num_spilled
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Capture time of each frame, in secs since first frame"""
+        timestamps = np.array(self._timestamps[: self._num_frames])
+        return timestamps - timestamps[0] if len(timestamps) else timestamps
+
+    @property
+    def ram_bytes(self) -> int:
+        return self._ram_bytes
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        return self._spill_path
+
+    def append(self, frame: np.ndarray) -> None:
+        """Add new frame to end of store, spilling oldest RAM frames if over budget
+
+        Args:
+            frame (np.ndarray): the frame to add
+        """
+        with self._lock:
+            self._timestamps.append(time.perf_counter())
+            self._ram[self._num_frames] = frame
+            self._ram_bytes += frame.nbytes
+            self._num_frames += 1
+            while self._ram_bytes > self.ram_budget and len(self._ram) > 1:
+                self._spill_oldest()
+
+    def reserve(self, num_frames: int) -> None:
+        """Hint at total number of frames expected, so that spill file can be
+        preallocated once instead of grown repeatedly
+
+        Args:
+            num_frames (int): expected total number of frames
+        """
+        self._reserved = max(0, num_frames)
+
+    def prefetch(self, start: int, count: int) -> None:
+        """Frames are always directly accessible, nothing to prefetch"""
+
+    def close(self) -> None:
+        """Release all frames and delete spill file"""
+        with self._lock:
+            self._ram.clear()
+            self._odd.clear()
+            self._timestamps.clear()
+            self._ram_bytes = 0
+            self._num_frames = 0
+            self._num_spilled = 0
+            self._spill = None  # unmap before deleting file
+            if self._finalizer:
+                self._finalizer()  # removes spill file
+                self._finalizer = None
+            self._spill_path = None
+            self._spill_capacity = 0
+
+    def _spill_oldest(self) -> None:
+        """Move oldest RAM frame into spill file, caller must hold lock"""
+        idx = self._num_spilled
+        frame = self._ram[idx]
+        if self._spill is None:
+            self._create_spill(frame.shape, frame.dtype)
+        if frame.shape != self._spill_shape or frame.dtype != self._spill_dtype:
+            self._odd[idx] = frame  # rare: frame size changed mid-run, keep it
+        else:
+            if idx >= self._spill_capacity:
+                self._grow_spill(max(idx + 1, 2 * self._spill_capacity))
+            self._spill[idx] = frame
+        self._num_spilled += 1  # frame is readable from spill before leaving RAM
+        del self._ram[idx]
+        self._ram_bytes -= frame.nbytes
+
+    def _create_spill(self, shape: Tuple[int, ...], dtype: np.dtype) -> None:
+        """Create memory-mapped spill file for frames of given shape and type
+
+        Args:
+            shape (Tuple[int, ...]): frame shape
+            dtype (np.dtype): frame data type
+        """
+        fd, self._spill_path = tempfile.mkstemp(prefix="pkds_frames_", suffix=".dat")
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove_file, self._spill_path)
+        self._spill_shape = shape
+        self._spill_dtype = dtype
+        capacity = max(SPILL_MIN_CAPACITY, self._reserved)
+        logger.debug(f"spill file {self._spill_path}: {capacity} x {shape}")
+        self._grow_spill(capacity)
+
+    def _grow_spill(self, capacity: int) -> None:
+        """(Re)map spill file with given capacity in frames
+
+        Args:
+            capacity (int): new capacity in frames
+        """
+        if self._spill is not None:
+            self._spill.flush()
+        frame_bytes = int(np.prod(self._spill_shape)) * self._spill_dtype.itemsize
+        with open(self._spill_path, "r+b") as file:
+            file.truncate(capacity * frame_bytes)  # sparse where supported
+        self._spill = np.memmap(
+            self._spill_path,
+            dtype=self._spill_dtype,
+            mode="r+",
+            shape=(capacity, *self._spill_shape),
+        )
+        self._spill_capacity = capacity
+
+
+class CompressedFrameStore:
+    """List-like store of output frames kept JPEG/PNG encoded in RAM.
+    Same interface as FrameStore, safe for one writer and one reader thread.
+    """
+
+    def __init__(
+        self, mode: str = FRAME_STORE_JPEG, cache_size: int = DECODE_CACHE_SIZE
+    ) -> None:
+        assert mode in [FRAME_STORE_JPEG, FRAME_STORE_PNG]
+        self.mode = mode
+        if mode == FRAME_STORE_JPEG:
+            self._ext = ".jpg"
+            self._params = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+        else:
+            self._ext = ".png"
+            self._params = [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._encode_done = threading.Condition(self._lock)
+        self._encoded: List[Optional[np.ndarray]] = []  # frame index -> encoded
+        self._encoded_bytes: int = 0
+        self._pending: Dict[int, np.ndarray] = {}  # raw frames not yet encoded
+        self._cache: OrderedDict = OrderedDict()  # LRU: frame index -> decoded
+        self._decoding: Set[int] = set()  # frame indices being prefetched
+        self._encoder = ThreadPoolExecutor(1, thread_name_prefix="pkds_encoder")
+        self._decoder = ThreadPoolExecutor(1, thread_name_prefix="pkds_decoder")
+        self._closed: bool = False
+        self._timestamps: List[float] = []  # capture time of each frame
+
+    @classmethod
+    def from_encoded(
+        cls,
+        mode: str,
+        buffers: List[np.ndarray],
+        timestamps: Optional[np.ndarray] = None,
+    ) -> "CompressedFrameStore":
+        """Make frame store of already encoded frames, e.g. memory-mapped frames of
+        a saved session. Frames are decoded on demand as usual.
+
+        Args:
+            mode (str): FRAME_STORE_JPEG or FRAME_STORE_PNG
+            buffers (List[np.ndarray]): encoded frames
+            timestamps (Optional[np.ndarray], optional): frame capture times.
+                                                         Defaults to None.
+
+        Returns:
+            CompressedFrameStore: the frame store
+        """
+        store = cls(mode)
+        store._encoded = list(buffers)
+        store._encoded_bytes = sum(buffer.nbytes for buffer in buffers)
+        if timestamps is not None:
+            store._timestamps = list(timestamps)
+        return store
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    def __bool__(self) -> bool:
+        return len(self._encoded) > 0
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        """Get frame at given index, decoding it if not in cache
+
+        Args:
+            idx (int): frame index, negative index counts from the end
+
+        Returns:
+            np.ndarray: the frame
+        """
+        with self._lock:
+            if idx < 0:
+                idx += len(self._encoded)
+            if not 0 <= idx < len(self._encoded):
+                raise IndexError(f"frame index {idx} out of range")
+            if idx in self._pending:
+                return self._pending[idx]
+            if idx in self._cache:
+                self._cache.move_to_end(idx)
+                return self._cache[idx]
+            buffer = self._encoded[idx]
+        frame = cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)  # outside lock
+        self._cache_frame(idx, frame)
+        return frame
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Capture time of each frame, in secs since first frame"""
+        timestamps = np.array(self._timestamps[: len(self._encoded)])
+        return timestamps - timestamps[0] if len(timestamps) else timestamps
+
+    def get_encoded(self, idx: int) -> np.ndarray:
+        """Get encoded frame at given index, encoding it now if still pending
+
+        Args:
+            idx (int): frame index
+
+        Returns:
+            np.ndarray: the encoded frame
+        """
+        with self._lock:
+            buffer = self._encoded[idx]
+            frame = self._pending.get(idx)
+        if buffer is None:
+            ok, buffer = cv2.imencode(self._ext, frame, self._params)
+            if not ok:
+                raise ValueError(f"cannot encode frame {idx}")
+        return buffer
+
+    @property
+    def ram_bytes(self) -> int:
+        """Bytes used by encoded frames and frames not yet encoded"""
+        pending_bytes = sum(frame.nbytes for frame in list(self._pending.values()))
+        return self._encoded_bytes + pending_bytes
+
+    def append(self, frame: np.ndarray) -> None:
+        """Add new frame to end of store, it is encoded in the background.
+        Blocks if encoder falls too far behind, to bound RAM use.
+
+        Args:
+            frame (np.ndarray): the frame to add
+        """
+        with self._lock:
+            while len(self._pending) >= MAX_PENDING_ENCODES and not self._closed:
+                self._encode_done.wait()
+            idx = len(self._encoded)
+            self._timestamps.append(time.perf_counter())
+            self._encoded.append(None)
+            self._pending[idx] = frame
+        self._encoder.submit(self._encode, idx, frame)
+
+    def reserve(self, num_frames: int) -> None:
+        """Nothing to preallocate for compressed frames"""
+
+    def prefetch(self, start: int, count: int) -> None:
+        """Decode frames [start, start + count) in the background, into cache
+
+        Args:
+            start (int): index of first frame to prefetch
+            count (int): number of frames to prefetch
+        """
+        count = min(count, self.cache_size // 2)  # don't evict current frames
+        with self._lock:
+            end = min(start + count, len(self._encoded))
+            todo = [
+                idx
+                for idx in range(max(0, start), end)
+                if idx not in self._cache
+                and idx not in self._pending
+                and idx not in self._decoding
+            ]
+            self._decoding.update(todo)
+        for idx in todo:
+            self._decoder.submit(self._decode, idx)
+
+    def close(self) -> None:
+        """Release all frames and stop background threads"""
+        with self._lock:
+            self._closed = True
+            self._encoded.clear()
+            self._pending.clear()
+            self._cache.clear()
+            self._timestamps.clear()
+            self._encoded_bytes = 0
+            self._encode_done.notify_all()
+        self._encoder.shutdown(wait=False)
+        self._decoder.shutdown(wait=False)
+
+    def _encode(self, idx: int, frame: np.ndarray) -> None:
+        """Encoder thread: compress frame and replace raw frame with it"""
+        ok, buffer = cv2.imencode(self._ext, frame, self._params)
+        if not ok:
+            logger.error(f"cannot encode frame {idx}, keeping it uncompressed")
+            return  # frame stays in self._pending
+        with self._lock:
+            if self._closed:
+                return
+            self._encoded[idx] = buffer
+            self._encoded_bytes += buffer.nbytes
+            del self._pending[idx]
+            self._encode_done.notify_all()
+
+    def _decode(self, idx: int) -> None:
+        """Decoder thread: decompress frame into cache"""
+        with self._lock:
+            buffer = None if self._closed else self._encoded[idx]
+        if buffer is not None:
+            self._cache_frame(idx, cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED))
+        with self._lock:
+            self._decoding.discard(idx)
+
+    def _cache_frame(self, idx: int, frame: np.ndarray) -> None:
+        """Add decoded frame to LRU cache, evicting least recently used frames"""
+        with self._lock:
+            if self._closed:
+                return
+            self._cache[idx] = frame
+            self._cache.move_to_end(idx)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def make_frame_store(
+    mode: str, ram_budget: int = FRAME_STORE_RAM_BUDGET
+) -> Union[FrameStore, CompressedFrameStore]:
+    """Make frame store for given mode
+
+    Args:
+        mode (str): one of FRAME_STORE_MODES
+        ram_budget (int, optional): RAM budget of raw frame store.
+                                    Defaults to FRAME_STORE_RAM_BUDGET.
+
+    Returns:
+        Union[FrameStore, CompressedFrameStore]: the frame store
+    """
+    assert mode in FRAME_STORE_MODES
+    if mode == FRAME_STORE_RAW:
+        return FrameStore(ram_budget)
+    return CompressedFrameStore(mode)
+
+
+#
+# Frame helpers for display, Kivy-free so they can be benchmarked headless
+#
+def zoom_frame(frame: np.ndarray, zoom: float) -> np.ndarray:
+    """Zoom frame on CPU
+
+    Args:
+        frame (np.ndarray): image frame data to be zoomed
+        zoom (float): zoom factor
+
+    Returns:
+        np.ndarray: the zoomed image, or given frame if zoom is 1
+    """
+    if zoom == 1.0:
+        return frame
+    new_size = (int(frame.shape[1] * zoom), int(frame.shape[0] * zoom))
+    # note: opencv is faster than scikit-image!
+    return cv2.resize(frame, new_size)
+
+
+def blit_view(frame: np.ndarray) -> np.ndarray:
+    """Flat view of frame memory for Texture.blit_buffer, copies only if frame
+    is not contiguous (e.g. a slice) or read-only, which blit_buffer rejects
+
+    Args:
+        frame (np.ndarray): image frame data to be blitz'd
+
+    Returns:
+        np.ndarray: 1-D uint8 array
+    """
+    if not frame.flags["C_CONTIGUOUS"]:
+        frame = np.ascontiguousarray(frame)
+    elif not frame.flags.writeable:
+        frame = frame.copy()
+    return frame.reshape(-1)
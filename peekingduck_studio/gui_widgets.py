@@ -78,6 +78,38 @@ class FileSaveDialog(FloatLayout):
         file_chooser.filters = filters
 
 
+class VideoExportDialog(FloatLayout):
+    """FileSaveDialog with video export options: codec, frame rate and size"""
+
+    save = ObjectProperty(None)
+    cancel = ObjectProperty(None)
+    text_input = ObjectProperty(None)
+    codec_spinner = ObjectProperty(None)
+    fps_input = ObjectProperty(None)
+    size_input = ObjectProperty(None)
+
+    def setup(
+        self,
+        root_path: str,
+        path: str,
+        filters: List[str],
+        filename: str,
+        codecs: List[str],
+        codec: str,
+        fps: str,
+        size: str,
+    ):
+        self.text_input.text = filename
+        file_chooser = self.ids["id_file_chooser"]
+        file_chooser.rootpath = root_path
+        file_chooser.path = path
+        file_chooser.filters = filters
+        self.codec_spinner.values = codecs
+        self.codec_spinner.text = codec
+        self.fps_input.text = fps
+        self.size_input.text = size
+
+
 class MsgBox:
     """Custom dialog box class for messages
     MsgBoxPopup defined in peekingduckstudio.kv file
@@ -113,6 +145,7 @@ class Node(GridLayout):
     select_color = ListProperty([0, 0, 0, 0])
     node_number = ObjectProperty("0")  # shown as index in GUI
     node_text = ObjectProperty("")
+    node_stats = StringProperty("")  # latency stats of last run, shown below text
     node_height = NumericProperty(NODE_HEIGHT * Metrics.dp)
     # don't use 'uid' as Kivy seems to use it internally, so will conflict!
     node_id = StringProperty("")
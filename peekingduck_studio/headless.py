@@ -0,0 +1,232 @@
+#
+# PeekingDuck Studio Headless Runner
+#
+# Technote: runs a pipeline file without a display, for CI and benchmarking.
+# The pipeline is loaded via ModelPipeline (so input.live/input.recorded are
+# migrated as in the GUI) and driven by the same ExecutionPlan loop used by
+# OutputController. output.screen frames are counted, not shown or kept.
+# Nothing here may import Kivy.
+#
+# Usage: python headless.py pipeline_config.yml [--warmup N] [--max-frames N]
+#                                              [--json results.json]
+#                                              [--log-level LEVEL]
+#
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pathlib import Path
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+from peekingduck_studio.core_utils import LOG_LEVEL_ENV, make_logger, set_log_level
+from peekingduck_studio.model_pipeline import ModelPipeline
+from peekingduck_studio.node_stats import LATENCY_RING_SIZE, format_node_stats
+from peekingduck_studio.pipeline_runner import (
+    PREFETCH_FRAMES,
+    ExecutionPlan,
+    load_pipeline,
+    release_source_nodes,
+)
+
+DEFAULT_WARMUP = 10  # iterations run before timing starts, e.g. model warm-up
+
+logger = make_logger(__name__)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process
+
+    Returns:
+        Optional[float]: peak RSS in MiB, None if not supported (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return rss / 2**20 if platform.system() == "Darwin" else rss / 2**10
+
+
+class HeadlessRunner:
+    """Run pipeline file to the end (or max frames) and collect performance stats"""
+
+    def __init__(
+        self,
+        pipeline_path: str,
+        warmup: int = DEFAULT_WARMUP,
+        max_frames: int = 0,
+        custom_nodes_parent_subdir: str = "src",
+        prefetch: int = PREFETCH_FRAMES,
+    ) -> None:
+        """
+        Args:
+            pipeline_path (str): pipeline YAML file
+            warmup (int, optional): untimed iterations. Defaults to DEFAULT_WARMUP.
+            max_frames (int, optional): max timed iterations. Defaults to 0 (all).
+            custom_nodes_parent_subdir (str, optional): custom nodes folder.
+                                                        Defaults to "src".
+            prefetch (int, optional): input frames decoded ahead.
+                                      Defaults to PREFETCH_FRAMES.
+        """
+        self.pipeline_path = str(Path(pipeline_path).resolve())
+        self.warmup = warmup
+        self.max_frames = max_frames
+        self.custom_nodes_parent_subdir = custom_nodes_parent_subdir
+        self.prefetch = prefetch
+        self.num_frames: int = 0  # output.screen frames
+        self.num_iterations: int = 0  # timed iterations
+        self.elapsed: float = 0.0  # secs of timed iterations
+        self.load_time: float = 0.0  # secs to load pipeline
+        self.node_stats: List[Dict[str, Any]] = []
+
+    def _count_frame(self, img: np.ndarray) -> None:
+        """Screen output interceptor: count frames only"""
+        self.num_frames += 1
+
+    def run(self) -> None:
+        """Load pipeline and run it, timing all iterations after warm-up"""
+        start = time.perf_counter()
+        pipeline_model = ModelPipeline(self.pipeline_path)
+        _, pipeline = load_pipeline(
+            pipeline_model.get_string_representation(),
+            pipeline_model.fileparent,
+            self.custom_nodes_parent_subdir,
+        )
+        plan = ExecutionPlan(pipeline, prefetch=self.prefetch)
+        self.load_time = time.perf_counter() - start
+        logger.info(f"pipeline loaded in {self.load_time:.2f} secs")
+        try:
+            for _ in range(self.warmup):
+                if pipeline.terminate:
+                    break
+                plan.run_iteration(self._count_frame)
+            # keep every timed iteration if their number is known
+            plan.latencies.reset(max(self.max_frames, LATENCY_RING_SIZE))
+            self.num_frames = 0
+            start = time.perf_counter()
+            while not pipeline.terminate:
+                plan.run_iteration(self._count_frame)
+                self.num_iterations += 1
+                if self.num_iterations == self.max_frames:
+                    break
+            self.elapsed = time.perf_counter() - start
+        finally:
+            release_source_nodes(pipeline)
+        self.node_stats = plan.get_node_stats()
+
+    @property
+    def fps(self) -> float:
+        """Timed iterations per second"""
+        return self.num_iterations / self.elapsed if self.elapsed > 0 else 0.0
+
+    def results(self) -> Dict[str, Any]:
+        """Results of last run, for printing or saving as JSON"""
+        return {
+            "pipeline": self.pipeline_path,
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "warmup": self.warmup,
+            "prefetch": self.prefetch,
+            "iterations": self.num_iterations,
+            "frames": self.num_frames,
+            "load_secs": self.load_time,
+            "elapsed_secs": self.elapsed,
+            "fps": self.fps,
+            "peak_rss_mb": peak_rss_mb(),
+            "nodes": self.node_stats,
+        }
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print run results as plain text report
+
+    Args:
+        results (Dict[str, Any]): from HeadlessRunner.results()
+    """
+    print(f"pipeline   : {results['pipeline']}")
+    print(f"load time  : {results['load_secs']:.2f} secs")
+    print(
+        f"throughput : {results['fps']:.2f} it/s ({results['iterations']} iterations,"
+        f" {results['frames']} frames in {results['elapsed_secs']:.2f} secs,"
+        f" {results['warmup']} warm-up)"
+    )
+    rss = results["peak_rss_mb"]
+    print(f"peak RSS   : {f'{rss:.1f} MiB' if rss is not None else 'n/a'}")
+    width = max((len(stat["node"]) for stat in results["nodes"]), default=0)
+    for stat in results["nodes"]:
+        print(f"  {stat['node']:<{width}} : {format_node_stats(stat)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point
+
+    Args:
+        argv (Optional[List[str]], optional): arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: exit code, 0 if pipeline ran without error
+    """
+    parser = argparse.ArgumentParser(
+        description="Run a PeekingDuck pipeline headless and report its performance"
+    )
+    parser.add_argument("pipeline", help="pipeline YAML file")
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=DEFAULT_WARMUP,
+        help=f"untimed iterations before measuring (default {DEFAULT_WARMUP})",
+    )
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=0,
+        help="stop after this many timed iterations (default 0: run to the end)",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=PREFETCH_FRAMES,
+        help=f"input frames decoded ahead, 0 to disable (default {PREFETCH_FRAMES})",
+    )
+    parser.add_argument("--json", help="also save results to this JSON file")
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help=f"log level (default INFO, or as set by {LOG_LEVEL_ENV})",
+    )
+    parser.add_argument(
+        "--custom-nodes-dir",
+        default="src",
+        help="folder containing custom nodes, relative to pipeline (default src)",
+    )
+    args = parser.parse_args(argv)
+    if args.log_level:
+        set_log_level(args.log_level)
+
+    runner = HeadlessRunner(
+        args.pipeline,
+        args.warmup,
+        args.max_frames,
+        args.custom_nodes_dir,
+        args.prefetch,
+    )
+    json_path = Path(args.json).resolve() if args.json else None  # before chdir
+    try:
+        runner.run()
+    except BaseException:
+        logger.exception("PeekingDuck Error!")
+        return 1
+    results = runner.results()
+    print_results(results)
+    if json_path:
+        with open(json_path, "w") as file:
+            json.dump(results, file, indent=2)
+        logger.info(f"results saved to {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
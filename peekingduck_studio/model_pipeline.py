@@ -3,10 +3,10 @@
 #
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 import yaml
 from peekingduck_studio.model_node import NO_USER_CONFIG, ModelNode
-from peekingduck_studio.gui_utils import (
+from peekingduck_studio.core_utils import (
     find_config_dirs,
     guess_config_value_types,
     has_custom_nodes,
@@ -22,14 +22,21 @@ logger = make_logger(__name__)
 
 
 class ModelPipeline:
-    def __init__(self, the_path: Optional[str] = None) -> None:
+    def __init__(
+        self, the_path: Optional[str] = None, pipeline_str: Optional[str] = None
+    ) -> None:
         # todo: take in a working_dir parameter
         # declare internal working vars
         self._idx_to_node: List[ModelNode] = None  # indexed lookup
         self._uid_to_idx: Dict[str, int] = None  # reverse lookup
+        # called whenever pipeline is modified, e.g. to preload its nodes
+        self.change_callback: Optional[Callable[[], None]] = None
         if the_path:
             self._filepath: Path = Path(the_path)
-            self.load_pipeline(the_path)
+            if pipeline_str is None:
+                self.load_pipeline(the_path)
+            else:  # e.g. pipeline saved in session archive
+                self._pipeline = yaml.safe_load(pipeline_str)
             self.parse_pipeline()
             self.load_custom_nodes()
         else:
@@ -117,6 +124,17 @@ class ModelPipeline:
 
     def set_dirty_bit(self) -> None:
         self._dirty_bit = True
+        if self.change_callback:
+            self.change_callback()
+
+    def node_signatures(self) -> List[str]:
+        """Return signature (title and user config) of every node, in pipeline
+        order. Comparing signatures of two runs tells which nodes were changed.
+
+        Returns:
+            List[str]: node signatures
+        """
+        return [f"{node.node_title} {node.user_config}" for node in self.node_list]
 
     def get_node_by_index(self, i: int) -> ModelNode:
         """Get the i-th node in pipeline
@@ -161,21 +179,21 @@ class ModelPipeline:
         for node in node_list:
             node_title = node.node_title
             user_config = node.user_config
-            logger.debug(f"{node_title} -> {user_config}")
+            logger.debug("%s -> %s", node_title, user_config)
 
             if "None" in user_config[0]:
-                logger.debug(f"append {node_title}")
+                logger.debug("append %s", node_title)
                 pipeline_nodes.append(node_title)
             else:
                 configs = {k: v for dd in user_config for k, v in dd.items()}
                 node_dict = {node_title: configs}
-                logger.debug(f"append {node_dict}")
+                logger.debug("append %s", node_dict)
                 pipeline_nodes.append(node_dict)
 
         pipeline = {"nodes": pipeline_nodes}
         yaml_str = f"{pipeline}"
         json_str = self.clean_yaml(yaml_str)
-        logger.debug(f"run pipeline: {json_str}")
+        logger.debug("run pipeline: %s", json_str)
         return json_str
 
     def load_pipeline(self, pipeline_path: str) -> None:
@@ -0,0 +1,68 @@
+#
+# PeekingDuck Studio In-Memory Pipeline Loader
+#
+# Technote: PeekingDuck's DeclarativeLoader reads its node list from a pipeline
+# file. Studio used to write the pipeline into a temp YAML file in the working
+# directory just for that, and delete it after loading (leaving stray files
+# behind if loading crashed). InMemoryDeclarativeLoader takes the YAML string
+# instead and parses it in memory, everything else is DeclarativeLoader's own.
+#
+
+from typing import Any, Dict
+import yaml
+from peekingduck.declarative_loader import DeclarativeLoader, NodeList
+from peekingduck_studio.core_utils import make_logger
+
+logger = make_logger(__name__)
+
+
+def parse_pipeline_str(pipeline_str: str) -> Dict[str, Any]:
+    """Parse YAML pipeline, checking it has a node list like PeekingDuck does
+
+    Args:
+        pipeline_str (str): YAML representation of pipeline
+
+    Raises:
+        ValueError: pipeline has no `nodes` list
+
+    Returns:
+        Dict[str, Any]: the pipeline
+    """
+    data = yaml.safe_load(pipeline_str)
+    if not isinstance(data, dict) or "nodes" not in data:
+        raise ValueError(
+            "Pipeline has an invalid structure. Missing top-level 'nodes' key."
+        )
+    if data["nodes"] is None:
+        raise ValueError("Pipeline does not contain any nodes!")
+    return data
+
+
+class InMemoryDeclarativeLoader(DeclarativeLoader):
+    """DeclarativeLoader that loads its node list from a YAML string, not a file"""
+
+    def __init__(
+        self,
+        pipeline_str: str,
+        config_updates_cli: str,
+        custom_nodes_parent_subdir: str,
+    ) -> None:
+        """
+        Args:
+            pipeline_str (str): YAML representation of pipeline
+            config_updates_cli (str): config updates, "None" from Studio
+            custom_nodes_parent_subdir (str): folder containing custom nodes
+        """
+        # DeclarativeLoader hands its first argument to _load_node_list()
+        super().__init__(pipeline_str, config_updates_cli, custom_nodes_parent_subdir)
+
+    def _load_node_list(self, pipeline_str: str) -> NodeList:
+        """Load node list from YAML pipeline
+
+        Args:
+            pipeline_str (str): YAML representation of pipeline
+
+        Returns:
+            NodeList: the pipeline nodes
+        """
+        return NodeList(parse_pipeline_str(pipeline_str)["nodes"])
@@ -0,0 +1,306 @@
+#
+# PeekingDuck Studio Warm Node Instance Pool
+#
+# Technote: PeekingDuck builds every node from scratch on each pipeline load, so
+# a rerun reloads model weights and re-initialises networks even if only a draw
+# node's config was changed. NodePool keeps the node instances of the last load,
+# keyed by node title plus its config updates (the effective config is fully
+# determined by these, as default configs and the "None" CLI updates do not
+# change between loads). PooledDeclarativeLoader takes unchanged nodes from the
+# pool instead of building them, and only builds new or changed nodes.
+#
+# Stateful nodes (input.visual, trackers, accumulators, file writers) are never
+# reused: they are always built anew, which resets their state. Custom nodes are
+# not reused either, as their code may have been edited since the last load. A
+# node counts as custom if it is loaded from a custom nodes folder, i.e. its node
+# module path contains the folder of a custom node title in the pipeline (e.g.
+# custom_nodes for custom_nodes.dabble.my_node); every other node is built-in,
+# whatever module path the installed PeekingDuck version keeps its nodes in.
+#
+# After a load the pool holds exactly the nodes of the loaded pipeline, so nodes
+# removed from the pipeline are released on the next load.
+#
+# NodePreloader fills the pool in a background thread as soon as a pipeline is
+# opened or edited, building only its reusable nodes, so that the load of the
+# next run finds them ready. It is not started if the pipeline has no reusable
+# node, as it would have nothing to build. The pool is not locked: the UI must
+# not load a pipeline (nor clear the pool) while a preloader runs, but wait for it
+# to end or cancel it.
+#
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+import json
+import threading
+import traceback
+from peekingduck.pipeline.pipeline import Pipeline
+from peekingduck_studio.core_utils import make_logger
+from peekingduck_studio.node_loader import InMemoryDeclarativeLoader, parse_pipeline_str
+
+# nodes that keep state across iterations, rebuilt on every load to reset them
+STATEFUL_NODES = {
+    "input.visual",
+    "dabble.fps",
+    "dabble.statistics",
+    "dabble.tracking",
+    "model.fairmot",
+    "model.jde",
+    "output.csv_writer",
+    "output.media_writer",
+}
+
+logger = make_logger(__name__)
+
+
+def node_key(node_title: str, config_updates: Optional[Dict[str, Any]]) -> str:
+    """Make pool key of node from its title and config updates
+
+    Args:
+        node_title (str): node title, e.g. model.yolo
+        config_updates (Optional[Dict[str, Any]]): pipeline config of node
+
+    Returns:
+        str: pool key
+    """
+    config = json.dumps(config_updates or {}, sort_keys=True, default=str)
+    return f"{node_title} {config}"
+
+
+def pipeline_node_titles(pipeline_str: str) -> List[str]:
+    """Get node titles of YAML pipeline, in pipeline order
+
+    Args:
+        pipeline_str (str): YAML representation of pipeline
+
+    Returns:
+        List[str]: node titles, e.g. model.yolo or custom_nodes.dabble.my_node
+    """
+    nodes = parse_pipeline_str(pipeline_str)["nodes"]
+    return [node if isinstance(node, str) else next(iter(node)) for node in nodes]
+
+
+def custom_nodes_folders(node_titles: List[str]) -> Set[str]:
+    """Get custom nodes folders used by node titles, e.g. custom_nodes for
+    custom_nodes.dabble.my_node (built-in node titles are type.name)
+
+    Args:
+        node_titles (List[str]): node titles
+
+    Returns:
+        Set[str]: custom nodes folder names
+    """
+    return {title.split(".")[0] for title in node_titles if title.count(".") >= 2}
+
+
+def is_reusable_node(
+    path_to_node: str, node_name: str, custom_folders: Set[str]
+) -> bool:
+    """Check if node can be taken from and put into the pool
+
+    Args:
+        path_to_node (str): module path prefix of node, as passed by
+                            DeclarativeLoader to _init_node()
+        node_name (str): node type.name, e.g. model.yolo
+        custom_folders (Set[str]): custom nodes folders of pipeline
+
+    Returns:
+        bool: True if node is built-in and stateless
+    """
+    custom = not custom_folders.isdisjoint(path_to_node.split("."))
+    return not custom and node_name not in STATEFUL_NODES
+
+
+def has_reusable_nodes(pipeline_str: str) -> bool:
+    """Check if a load of YAML pipeline could reuse any node
+
+    Args:
+        pipeline_str (str): YAML representation of pipeline
+
+    Returns:
+        bool: True if pipeline has a built-in stateless node
+    """
+    return any(
+        title.count(".") == 1 and title not in STATEFUL_NODES
+        for title in pipeline_node_titles(pipeline_str)
+    )
+
+
+class NodePool:
+    """Node instances of the last pipeline load, by node key"""
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, List[Any]] = {}
+        self.num_reused: int = 0  # of last load
+        self.num_built: int = 0  # of last load
+
+    def __len__(self) -> int:
+        return sum(len(nodes) for nodes in self._nodes.values())
+
+    def take(self, key: str) -> Optional[Any]:
+        """Remove and return pooled node with given key
+
+        Args:
+            key (str): node key
+
+        Returns:
+            Optional[Any]: node instance, None if there is none
+        """
+        nodes = self._nodes.get(key)
+        if not nodes:
+            return None
+        node = nodes.pop()
+        if not nodes:
+            del self._nodes[key]
+        return node
+
+    def restock(self, nodes: Dict[str, List[Any]], keep_unused: bool) -> None:
+        """Replace pooled nodes with those of a pipeline load
+
+        Args:
+            nodes (Dict[str, List[Any]]): reusable nodes of the load, by key
+            keep_unused (bool): also keep nodes not taken by the load, e.g. if it
+                                failed part way
+        """
+        if keep_unused:
+            for key, unused in self._nodes.items():
+                nodes.setdefault(key, []).extend(unused)
+        self._nodes = nodes
+
+    def clear(self) -> None:
+        """Release all pooled nodes, next load builds every node"""
+        self._nodes = {}
+
+
+class PooledDeclarativeLoader(InMemoryDeclarativeLoader):
+    """DeclarativeLoader that takes unchanged nodes from a NodePool instead of
+    building them again"""
+
+    def __init__(
+        self,
+        pipeline_str: str,
+        config_updates_cli: str,
+        custom_nodes_parent_subdir: str,
+        node_pool: NodePool,
+    ) -> None:
+        """
+        Args:
+            pipeline_str (str): YAML representation of pipeline
+            config_updates_cli (str): config updates, "None" from Studio
+            custom_nodes_parent_subdir (str): folder containing custom nodes
+            node_pool (NodePool): pool to take nodes from and restock
+        """
+        super().__init__(pipeline_str, config_updates_cli, custom_nodes_parent_subdir)
+        self.node_pool = node_pool
+        self.custom_nodes_folders = custom_nodes_folders(
+            pipeline_node_titles(pipeline_str)
+        )
+        self._loaded: Dict[str, List[Any]] = {}
+        self._preloader: Optional["NodePreloader"] = None  # set while preloading
+
+    def get_pipeline(self) -> Pipeline:
+        """Build pipeline from pooled and new nodes, then restock the pool with the
+        reusable ones
+
+        Returns:
+            Pipeline: the pipeline
+        """
+        self._loaded = {}
+        self.node_pool.num_reused = self.node_pool.num_built = 0
+        loaded = False
+        try:
+            pipeline = super().get_pipeline()
+            loaded = True
+        finally:
+            self.node_pool.restock(self._loaded, keep_unused=not loaded)
+            self._loaded = {}
+        self._log_nothing_reusable()
+        logger.info(
+            f"nodes reused {self.node_pool.num_reused}, "
+            f"built {self.node_pool.num_built}"
+        )
+        return pipeline
+
+    def preload(self, preloader: "NodePreloader") -> None:
+        """Build only the reusable nodes that are not pooled yet and restock the pool
+        with them, unless cancelled
+
+        Args:
+            preloader (NodePreloader): preloader thread, for progress and cancel
+        """
+        self._loaded = {}
+        self._preloader = preloader
+        self.node_pool.num_reused = self.node_pool.num_built = 0
+        try:
+            self._instantiate_nodes()
+        finally:
+            if not preloader.cancelled.is_set():
+                self.node_pool.restock(self._loaded, keep_unused=False)
+            self._loaded = {}
+            self._preloader = None
+        self._log_nothing_reusable()
+        logger.info(
+            f"nodes preloaded {self.node_pool.num_built}, "
+            f"already loaded {self.node_pool.num_reused}"
+        )
+
+    def _log_nothing_reusable(self) -> None:
+        """Log if last load or preload found no node to pool"""
+        if self.node_pool.num_reused == 0 and len(self.node_pool) == 0:
+            logger.debug("no reusable nodes: all are custom or stateful")
+
+    def _init_node(
+        self,
+        path_to_node: str,
+        node_name: str,
+        config_loader: Any,
+        config_updates_yml: Optional[Dict[str, Any]],
+    ) -> Any:
+        """Take node from pool if reusable and unchanged, else build it"""
+        reusable = is_reusable_node(
+            path_to_node, node_name, self.custom_nodes_folders
+        )
+        key = node_key(node_name, config_updates_yml)
+        preloader = self._preloader
+        if preloader:
+            preloader.progress = (preloader.progress[0] + 1, node_name)
+            if not reusable or preloader.cancelled.is_set():
+                return None  # built by the run itself, or not at all
+        node = self.node_pool.take(key) if reusable else None
+        if node is None:
+            node = super()._init_node(
+                path_to_node, node_name, config_loader, config_updates_yml
+            )
+            self.node_pool.num_built += 1
+        else:
+            logger.debug(f"reuse {node_name}")
+            self.node_pool.num_reused += 1
+        if reusable:
+            self._loaded.setdefault(key, []).append(node)
+        return node
+
+
+class NodePreloader(threading.Thread):
+    """Background thread to build the reusable nodes of a pipeline into its node
+    loader's pool, ahead of the pipeline run"""
+
+    def __init__(self, node_loader: PooledDeclarativeLoader) -> None:
+        """
+        Args:
+            node_loader (PooledDeclarativeLoader): loader of pipeline to preload
+        """
+        super().__init__(name="pkds_node_preloader", daemon=True)
+        self.node_loader = node_loader
+        self.cancelled = threading.Event()
+        self.progress: Tuple[int, str] = (0, "")  # nodes done, current node
+        self.exc_msg: str = ""
+
+    def run(self) -> None:
+        """Thread main: preload nodes, errors are left for the run to report"""
+        try:
+            self.node_loader.preload(self)
+        except BaseException:
+            self.exc_msg = traceback.format_exc()
+            logger.warning(f"node preload failed: {self.exc_msg}")
+
+    def cancel(self) -> None:
+        """Stop after node being built, and discard the preloaded nodes"""
+        self.cancelled.set()
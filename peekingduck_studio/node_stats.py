@@ -0,0 +1,143 @@
+#
+# PeekingDuck Studio Node Latency Statistics
+#
+# Technote: every node.run() is timed with time.perf_counter() (monotonic) and
+# kept in a fixed-size ring of the most recent LATENCY_RING_SIZE iterations. The
+# pipeline loop only stores its list of run times into the next ring slot (no
+# numpy conversion per iteration, as that costs more than the timing itself),
+# stats are only computed when asked for (about once per second by the UI).
+#
+
+from typing import Any, Dict, List, Optional, Sequence
+from pathlib import Path
+import csv
+import json
+import numpy as np
+from peekingduck_studio.core_utils import make_logger
+
+LATENCY_RING_SIZE = 1024  # most recent iterations kept
+ITERATION_NAME = "pipeline"  # pseudo node name for whole iteration times
+NOT_RUN = float("nan")  # run time of node skipped in an iteration
+STATS_FIELDS = ["node", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"]
+STATS_SUFFIXES = [".csv", ".json"]  # node stats export file formats
+STATS_FILE_FILTERS = [f"*{ext}" for ext in STATS_SUFFIXES]
+
+logger = make_logger(__name__)
+
+
+class NodeLatencies:
+    """Ring buffer of node run times per iteration, plus whole iteration time"""
+
+    def __init__(self, node_names: Sequence[str], size: int = LATENCY_RING_SIZE):
+        """
+        Args:
+            node_names (Sequence[str]): pipeline node names, in pipeline order
+            size (int, optional): iterations kept. Defaults to LATENCY_RING_SIZE.
+        """
+        self.names: List[str] = [*node_names, ITERATION_NAME]
+        self.size = size
+        self.ring: List[Optional[List[float]]] = [None] * size
+        self.num_iterations: int = 0
+
+    def reset(self, size: Optional[int] = None) -> None:
+        """Discard all recorded run times, e.g. those of warm-up iterations
+
+        Args:
+            size (Optional[int], optional): new number of iterations kept.
+                                            Defaults to None (unchanged).
+        """
+        self.size = size or self.size
+        self.ring = [None] * self.size
+        self.num_iterations = 0
+
+    def record(self, durations: List[float]) -> None:
+        """Store run times of one iteration into next ring buffer slot
+
+        Args:
+            durations (List[float]): secs per node in pipeline order (NOT_RUN if
+                                     node was skipped), then whole iteration
+        """
+        self.ring[self.num_iterations % self.size] = durations
+        self.num_iterations += 1
+
+    def samples(self) -> np.ndarray:
+        """Return recorded run times as array, one row per name, in secs"""
+        rows = [durations for durations in self.ring if durations is not None]
+        if not rows:
+            return np.empty((len(self.names), 0))
+        return np.array(rows).T
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Compute latency statistics over the samples in ring buffers
+
+        Returns:
+            List[Dict[str, Any]]: per node stats (STATS_FIELDS), pipeline order,
+                                  last entry is for whole iteration
+        """
+        window = self.samples() * 1000  # ms
+        result = []
+        for name, row in zip(self.names, window):
+            row = row[~np.isnan(row)]  # skipped runs, e.g. after pipeline_end
+            if len(row):
+                p50, p95, p99 = np.percentile(row, [50, 95, 99])
+                mean = float(row.mean())
+            else:
+                mean = p50 = p95 = p99 = 0.0
+            result.append(
+                {
+                    "node": name,
+                    "count": len(row),
+                    "mean_ms": mean,
+                    "p50_ms": float(p50),
+                    "p95_ms": float(p95),
+                    "p99_ms": float(p99),
+                }
+            )
+        return result
+
+
+def stats_fps(stats: List[Dict[str, Any]]) -> float:
+    """Pipeline iterations per second implied by mean iteration time
+
+    Args:
+        stats (List[Dict[str, Any]]): stats from NodeLatencies.stats()
+
+    Returns:
+        float: iterations per second, 0 if no stats
+    """
+    if not stats or stats[-1]["mean_ms"] <= 0:
+        return 0.0
+    return 1000 / stats[-1]["mean_ms"]
+
+
+def format_node_stats(stat: Dict[str, Any]) -> str:
+    """Short one line text of node stats for display
+
+    Args:
+        stat (Dict[str, Any]): stats of one node
+
+    Returns:
+        str: formatted stats
+    """
+    return (
+        f"{stat['mean_ms']:.1f} ms avg | p50 {stat['p50_ms']:.1f} "
+        f"p95 {stat['p95_ms']:.1f} p99 {stat['p99_ms']:.1f}"
+    )
+
+
+def write_node_stats(stats: List[Dict[str, Any]], path: str) -> None:
+    """Save stats to CSV or JSON file, by file extension
+
+    Args:
+        stats (List[Dict[str, Any]]): stats from NodeLatencies.stats()
+        path (str): .csv or .json file path
+    """
+    if Path(path).suffix.lower() == ".json":
+        with open(path, "w") as file:
+            json.dump({"fps": stats_fps(stats), "nodes": stats}, file, indent=2)
+    else:
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=STATS_FIELDS)
+            writer.writeheader()
+            writer.writerows(stats)
+    logger.debug(f"node stats saved to {path}")
@@ -0,0 +1,274 @@
+#
+# PeekingDuck Studio Node Output Cache for Incremental Re-execution
+#
+# Technote: while the pipeline runs, the outputs of its leading nodes are
+# snapshot per frame right after each node runs (i.e. before downstream draw
+# nodes draw on `img` in place). When the pipeline is rerun after an edit, the
+# nodes before the first changed node are not run again: their outputs for every
+# frame are read back from this cache instead, e.g. changing a draw.bbox colour
+# reruns only the draw nodes, not input.visual decoding nor the model.
+#
+# Only nodes up to the first one that may draw on `img` in place (or the first
+# output.screen) are cached, as the in-place changes are not part of any node's
+# outputs. Nodes are matched by signature (title + user config), so any edit,
+# insert, delete or move invalidates the cache from that node on.
+#
+# Recording is opt-in (OutputController.incremental), as it costs every run for
+# the sake of a later rerun. The pipeline thread only copies outputs: pickling
+# and spilling happen on a writer thread. If the writer falls behind by more
+# than RECORD_QUEUE_SIZE frames, recording stops rather than slow down the run.
+# A cached `img` that reaches output.screen undrawn is not copied at all: the
+# cache refers to the frame in the recording run's (raw) frame store instead.
+#
+# The most recent frames are kept in RAM within a byte budget, later frames are
+# appended to a spill file in the temp directory. If the spill file would exceed
+# its budget, recording stops and the cache is not used.
+#
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+import copy
+import os
+import pickle
+import queue
+import tempfile
+import threading
+import weakref
+import numpy as np
+from peekingduck_studio.core_utils import make_logger
+from peekingduck_studio.frame_store import FrameStore, _remove_file
+
+OUTPUT_CACHE_RAM_BUDGET = 512 * 1024 ** 2  # bytes of pickled outputs kept in RAM
+OUTPUT_CACHE_DISK_BUDGET = 8 * 1024 ** 3  # bytes of pickled outputs spilled to disk
+RECORD_QUEUE_SIZE = 32  # frames of snapshots waiting for writer thread
+WRITER_POLL_TIMEOUT = 0.1  # secs, writer thread checks for close this often
+
+logger = make_logger(__name__)
+
+
+class FrameRef(NamedTuple):
+    """Cached `img` held by recording run's frame store, at given frame index"""
+
+    idx: int
+
+
+def snapshot_outputs(outputs: Dict[str, Any], skip: str = "") -> Dict[str, Any]:
+    """Copy node outputs (e.g. `img`) before later nodes modify them in place
+
+    Args:
+        outputs (Dict[str, Any]): node outputs
+        skip (str, optional): key not to copy. Defaults to "" (copy all).
+
+    Returns:
+        Dict[str, Any]: the copy
+    """
+    return copy.deepcopy({k: v for k, v in outputs.items() if k != skip})
+
+
+def pickle_outputs(outputs: Dict[str, Any]) -> bytes:
+    """Pickle snapshot of node outputs"""
+    return pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class OutputCache:
+    """Per-frame pickled outputs of the leading nodes of a pipeline run.
+    Written by one run, read by later runs of the same pipeline prefix.
+    """
+
+    def __init__(
+        self,
+        signatures: Sequence[str],
+        ram_budget: int = OUTPUT_CACHE_RAM_BUDGET,
+        disk_budget: int = OUTPUT_CACHE_DISK_BUDGET,
+    ) -> None:
+        """
+        Args:
+            signatures (Sequence[str]): signatures of cached nodes, in pipeline order
+            ram_budget (int, optional): bytes kept in RAM.
+                                        Defaults to OUTPUT_CACHE_RAM_BUDGET.
+            disk_budget (int, optional): bytes spilled to disk.
+                                         Defaults to OUTPUT_CACHE_DISK_BUDGET.
+        """
+        self.signatures: List[str] = list(signatures)
+        self.ram_budget = ram_budget
+        self.disk_budget = disk_budget
+        self.complete: bool = False  # set when all frames to end of source stored
+        self.overflowed: bool = False  # out of budget or behind, cache unusable
+        # frame store of recording run, if it holds cached `img`s (see FrameRef)
+        self.frames: Optional[FrameStore] = None
+        self.ram_bytes: int = 0
+        self.disk_bytes: int = 0
+        # frame index -> pickled outputs per node, or (spill offset, sizes)
+        self._frames: List[Union[List[bytes], Tuple[int, List[int]]]] = []
+        self._lock = threading.Lock()
+        self._spill = None
+        self._spill_path: Optional[str] = None
+        self._finalizer = None
+        self._queue: queue.Queue = queue.Queue(maxsize=RECORD_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._finishing: bool = False
+        self._closed = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def num_nodes(self) -> int:
+        """Number of (leading) pipeline nodes cached"""
+        return len(self.signatures)
+
+    @property
+    def usable(self) -> bool:
+        """True if cache holds every frame of a finished run"""
+        return self.complete and not self.overflowed
+
+    def num_unchanged(self, signatures: Sequence[str]) -> int:
+        """Count leading cached nodes unchanged in given pipeline
+
+        Args:
+            signatures (Sequence[str]): current node signatures, in pipeline order
+
+        Returns:
+            int: number of leading nodes whose cached outputs are still valid
+        """
+        count = 0
+        for cached, current in zip(self.signatures, signatures):
+            if cached != current:
+                break
+            count += 1
+        return count
+
+    def record(self, snapshots: List[Dict[str, Any]]) -> None:
+        """Queue snapshots of outputs of cached nodes for next frame, to be pickled
+        and stored by writer thread. Called by pipeline thread, never blocks.
+
+        Args:
+            snapshots (List[Dict[str, Any]]): outputs of each cached node
+        """
+        if self.overflowed or self._closed.is_set():
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_loop, name="pkds_output_cache_writer", daemon=True
+            )
+            self._writer.start()
+        try:
+            self._queue.put_nowait(snapshots)
+        except queue.Full:
+            logger.warning("output cache fell behind, next rerun will run all nodes")
+            self.overflowed = True
+            self.close()
+
+    def finish(self) -> None:
+        """Mark end of input source reached, cache is complete once writer thread
+        has stored all queued frames. Called by pipeline thread."""
+        if self._finishing or self.overflowed:
+            return
+        self._finishing = True
+        while not self._closed.is_set():
+            try:
+                self._queue.put(None, timeout=WRITER_POLL_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def wait(self) -> None:
+        """Wait for writer thread to store all queued frames, if run has finished"""
+        if self._finishing and self._writer is not None:
+            self._writer.join()
+
+    def _write_loop(self) -> None:
+        """Writer thread main: pickle and store queued snapshots until finished
+        (None) or closed"""
+        while not self._closed.is_set():
+            try:
+                snapshots = self._queue.get(timeout=WRITER_POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+            if snapshots is None:
+                self.complete = not self.overflowed
+                return
+            try:
+                self._store([pickle_outputs(outputs) for outputs in snapshots])
+            except BaseException:
+                logger.exception("output cache error, next rerun will run all nodes")
+                self.overflowed = True
+                self.close()
+
+    def _store(self, blobs: List[bytes]) -> None:
+        """Add pickled outputs of cached nodes for next frame
+
+        Args:
+            blobs (List[bytes]): pickled outputs of each cached node
+        """
+        size = sum(len(blob) for blob in blobs)
+        with self._lock:
+            if self.overflowed or self._closed.is_set():
+                return
+            if self.ram_bytes + size <= self.ram_budget:
+                self._frames.append(blobs)
+                self.ram_bytes += size
+                return
+            if self.disk_bytes + size <= self.disk_budget:
+                if self._spill is None:
+                    self._create_spill()
+                offset = self._spill.seek(0, os.SEEK_END)
+                self._spill.write(b"".join(blobs))
+                self._frames.append((offset, [len(blob) for blob in blobs]))
+                self.disk_bytes += size
+                return
+        logger.warning("output cache is full, next rerun will run all nodes")
+        self.overflowed = True
+        self.close()
+
+    def load(self, frame_idx: int, num_nodes: int) -> List[Dict[str, Any]]:
+        """Get cached outputs of leading nodes for given frame
+
+        Args:
+            frame_idx (int): frame index
+            num_nodes (int): number of leading nodes to get outputs of
+
+        Returns:
+            List[Dict[str, Any]]: outputs of each node, fresh copies
+        """
+        entry = self._frames[frame_idx]
+        if isinstance(entry, list):
+            outputs = [pickle.loads(blob) for blob in entry[:num_nodes]]
+        else:
+            offset, sizes = entry
+            sizes = sizes[:num_nodes]
+            with self._lock:
+                self._spill.seek(offset)
+                data = self._spill.read(sum(sizes))
+            outputs = []
+            start = 0
+            for size in sizes:
+                outputs.append(pickle.loads(data[start : start + size]))
+                start += size
+        for node_outputs in outputs:
+            img = node_outputs.get("img")
+            if isinstance(img, FrameRef):
+                node_outputs["img"] = np.array(self.frames[img.idx])  # fresh copy
+        return outputs
+
+    def close(self) -> None:
+        """Stop writer thread, release cached outputs and delete spill file.
+        The frame store of the recording run is left to its owner to close."""
+        self._closed.set()
+        with self._lock:
+            self._frames.clear()
+            self.ram_bytes = 0
+            self.disk_bytes = 0
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            if self._finalizer:
+                self._finalizer()  # removes spill file
+                self._finalizer = None
+        self.complete = False
+
+    def _create_spill(self) -> None:
+        """Create spill file, caller must hold lock"""
+        fd, self._spill_path = tempfile.mkstemp(prefix="pkds_cache_", suffix=".dat")
+        self._spill = os.fdopen(fd, "w+b")
+        self._finalizer = weakref.finalize(self, _remove_file, self._spill_path)
+        logger.debug(f"output cache spill file {self._spill_path}")
@@ -2,28 +2,78 @@
 # PeekingDuck Studio Controller for Output Playback
 #
 
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from collections import OrderedDict
 from contextlib import redirect_stderr
-from datetime import datetime
-from pathlib import Path
-import copy
-import cv2
 from io import StringIO
+from pathlib import Path
 import numpy as np
-import os
+import time
 import traceback
-import yaml
 from kivy.clock import Clock
 from kivy.graphics.texture import Texture
 from peekingduck.declarative_loader import DeclarativeLoader
 from peekingduck.pipeline.pipeline import Pipeline
 from peekingduck_studio.colors import RED, GREEN, WHITE
+from peekingduck_studio.frame_store import (
+    FRAME_STORE_RAM_BUDGET,
+    FRAME_STORE_RAW,
+    CompressedFrameStore,
+    FrameStore,
+    blit_view,
+    make_frame_store,
+    zoom_frame,
+)
 from peekingduck_studio.model_pipeline import ModelPipeline
 from peekingduck_studio.gui_widgets import Output, MsgBox, NODE_HEIGHT
-from peekingduck_studio.gui_utils import make_logger
+from peekingduck_studio.gui_utils import RateMeter, make_logger
+from peekingduck_studio.node_pool import (
+    NodePool,
+    NodePreloader,
+    has_reusable_nodes,
+)
+from peekingduck_studio.node_stats import write_node_stats
+from peekingduck_studio.output_cache import OutputCache
+from peekingduck_studio.pipeline_process import (
+    PROCESS_MODE_SUPPORTED,
+    TERMINATE_TIMEOUT,
+    PipelineProcess,
+)
+from peekingduck_studio.pipeline_runner import (
+    PREFETCH_FRAMES,
+    ExecutionPlan,
+    PipelineWorker,
+    load_pipeline,
+    make_node_loader,
+    parse_streams,
+    release_source_nodes,
+)
+from peekingduck_studio.session import SessionSaver, open_session
+from peekingduck_studio.video_export import VideoExporter
 
-PLAYBACK_INTERVAL = 1 / 60
-ZOOMS = [0.5, 0.75, 1.0, 1.25, 1.50, 2.00, 2.50, 3.00]  # > 3x is slow!
+PLAYBACK_INTERVAL = 1 / 60  # secs between playback clock ticks (display refresh)
+DEFAULT_SOURCE_FPS = 30.0  # playback frame rate if input.visual does not report it
+PLAYBACK_SPEEDS = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0]
+SPEED_TEXT = ["0.25x", "0.5x", "1x", "2x", "4x", "8x"]
+PLAYBACK_PREFETCH = 8  # frames to decode ahead during playback of compressed frames
+ITERATION_BUDGET = 0.75 * PLAYBACK_INTERVAL  # secs of pipeline work per clock tick
+RATE_REPORT_INTERVAL = 1.0  # secs between iterations per second updates
+PRELOAD_DELAY = 0.5  # secs after last pipeline edit before its nodes are preloaded
+PRELOAD_POLL_INTERVAL = 0.1  # secs between node preload progress updates
+# Pipeline execution modes:
+#   clock  = run as many pipeline iterations as fit in ITERATION_BUDGET per Kivy
+#            clock callback on UI thread
+#   thread = run pipeline loop in background worker thread, UI shows newest frame
+#   process = run pipeline in child process, frames returned via shared memory
+EXEC_MODE_CLOCK = "clock"
+EXEC_MODE_THREAD = "thread"
+EXEC_MODE_PROCESS = "process"
+EXEC_MODES = [EXEC_MODE_CLOCK, EXEC_MODE_THREAD, EXEC_MODE_PROCESS]
+ZOOMS = [0.5, 0.75, 1.0, 1.25, 1.50, 2.00, 2.50, 3.00]
+# Zoom at render time by scaling image widget (GPU scales texture), else resize
+# frames on CPU and keep ZOOM_CACHE_SIZE most recently zoomed frames
+GPU_ZOOM = True
+ZOOM_CACHE_SIZE = 32
 # Test unicode glyphs for zoom factors
 # ZOOM_TEXT = ["\u00BD", "\u00BE", "1.0", "1\u00BC", "1\u00BD", "2.0"]
 ZOOM_TEXT = ["0.5x", "0.75x", "1x", "1.25x", "1.5x", "2x", "2.5x", "3x"]
@@ -31,21 +81,6 @@ ZOOM_TEXT = ["0.5x", "0.75x", "1x", "1.25x", "1.5x", "2x", "2.5x", "3x"]
 logger = make_logger(__name__)
 
 
-def parse_streams(strio: StringIO) -> str:
-    """Helper method to parse I/O streams.
-    Used to capture errors/exceptions from PeekingDuck.
-
-    Args:
-        strio (StringIO): the I/O stream to parse
-
-    Returns:
-        str: parsed stream
-    """
-    msg = strio.getvalue()
-    msg = os.linesep.join([s for s in msg.splitlines() if s])
-    return msg
-
-
 class OutputController:
     def __init__(self, pkd_view) -> None:
         self._pipeline_model: ModelPipeline = None
@@ -57,18 +92,71 @@ class OutputController:
         self.output_image = self.output_layout.ids["image"]
         self.progress = None
         self.slider = self.output_layout.ids["slider"]
+        # slider scrubbing: render only latest position, at most once per frame
+        self._scrub_idx: int = 0
+        self._scrub_trigger = Clock.create_trigger(self._scrub_to_frame)
         self.frame_counter = self.output_layout.ids["frame_counter"]
         self.zoom = self.output_layout.ids["zoom"]
         self.zoom_idx = 2  # default 100% zoom
+        self.playback_speed = self.output_layout.ids["playback_speed"]
+        self.playback_speed.bind(on_touch_down=self._playback_speed_touched)
+        self.speed_idx = 2  # default 1x playback speed
+        self.gpu_zoom: bool = GPU_ZOOM
+        self._zoom_cache: OrderedDict = OrderedDict()  # (frame_idx, zoom_idx) -> frame
+        self.image_box = self.output_layout.ids["image_box"]
+        self.image_box.bind(size=self._update_image_size)
+        # output display texture, reused until frame size changes
+        self._texture: Texture = None
+        self._num_frames_shown: int = 0
+        self._display_meter = RateMeter(RATE_REPORT_INTERVAL)
         # make output display black (else it will be white by default)
-        self._black_frame = np.empty((768, 1024, 3))
+        self._black_frame = np.zeros((768, 1024, 3), dtype=np.uint8)
         self._blitz_texture(self._black_frame)
         # pipeline control vars
-        self.frames: List = None
+        self.frames: Union[FrameStore, CompressedFrameStore] = None
+        self.frame_store_mode: str = FRAME_STORE_RAW
+        self.frame_ram_budget: int = FRAME_STORE_RAM_BUDGET
+        self.node_loader: DeclarativeLoader = None
+        self.pipeline: Pipeline = None
+        self.execution_plan: ExecutionPlan = None
         self._pipeline_model: ModelPipeline = None
         self._pipeline_running: bool = False
         self._output_playback: bool = False
+        self._playback_event = None
+        self._playback_start_idx: int = 0
+        self._playback_start_time: float = 0.0
+        self.source_fps: float = DEFAULT_SOURCE_FPS
         self._node_height: int = NODE_HEIGHT
+        self._pipeline_worker: Union[PipelineWorker, PipelineProcess] = None
+        self.exec_mode: str = EXEC_MODE_THREAD
+        self.iteration_budget: float = ITERATION_BUDGET
+        self.prefetch: int = PREFETCH_FRAMES  # input.visual frames decoded ahead
+        # incremental re-execution: rerun only nodes from first changed one on,
+        # taking outputs of earlier nodes from last run (clock/thread modes only).
+        # Opt-in, as recording node outputs costs every run.
+        self.incremental: bool = False
+        self._output_cache: Optional[OutputCache] = None
+        # warm node instances of last run, unchanged ones are reused by next run
+        # (clock/thread modes only)
+        self.node_pool: NodePool = NodePool()
+        # build reusable nodes into node pool in background once pipeline is
+        # opened or edited, a run started meanwhile waits for it to finish
+        self.preload: bool = True
+        self._preloader: Optional[NodePreloader] = None
+        self._preload_pending: bool = False  # pipeline edited during preload
+        self._start_after_preload: bool = False  # run waiting for preload
+        self._preload_trigger = Clock.create_trigger(self._preload_nodes, PRELOAD_DELAY)
+        self._iteration_meter = RateMeter(RATE_REPORT_INTERVAL)
+        # per node latency stats of current/last run, refreshed with iteration rate
+        self.node_stats: List[Dict[str, Any]] = []
+        self.node_stats_callback: Optional[Callable[[List[Dict]], None]] = None
+        # video export settings: "" codec = by file extension, 0 fps = source fps,
+        # None size = frame size
+        self.export_codec: str = ""
+        self.export_fps: float = 0.0
+        self.export_size: Optional[Tuple[int, int]] = None
+        self._exporter: VideoExporter = None
+        self._session_saver: SessionSaver = None
 
     @property
     def node_height(self) -> int:
@@ -83,6 +171,20 @@ class OutputController:
     def pipeline_running(self) -> bool:
         return self._pipeline_running
 
+    @property
+    def exporting(self) -> bool:
+        return self._exporter is not None or self._session_saver is not None
+
+    @property
+    def iteration_rate(self) -> float:
+        """Achieved pipeline iterations per second"""
+        return self._iteration_meter.rate
+
+    @property
+    def display_rate(self) -> float:
+        """Achieved frames displayed per second during playback"""
+        return self._display_meter.rate
+
     def _set_output_header(self, text: str, color: Tuple = None) -> None:
         """Set Output header text and optional color
 
@@ -104,7 +206,12 @@ class OutputController:
         Args:
             pipeline_model (ModelPipeline): the pipeline model
         """
+        if self._pipeline_model:
+            self._pipeline_model.change_callback = None
         self._pipeline_model = pipeline_model
+        self._clear_output_cache()  # different pipeline
+        pipeline_model.change_callback = self._preload_trigger
+        self._preload_trigger()
 
     def backward_one_frame(self) -> bool:
         """Move back one frame"""
@@ -147,15 +254,140 @@ class OutputController:
                 self._set_output_header(
                     f"Replaying {self._pipeline_model.filename}", color=GREEN
                 )
+                self._display_meter.reset()
+                self._display_meter.update(self._num_frames_shown)
                 self._do_playback()  # play last unmodified pipeline
         else:
-            if self._pipeline_running:
+            if self._start_after_preload:
+                self._start_after_preload = False  # run not started yet
+                self._toggle_btn_play_stop(state="play")
+            elif self._pipeline_running:
                 self._stop_running_pipeline()
             elif self._output_playback:
                 self._stop_playback()
 
+    def export_video(self, path: str) -> bool:
+        """Export output frames to video file in the background. If pipeline is
+        running, its frames are streamed to the video file as they are produced.
+
+        Args:
+            path (str): video file path, codec is chosen by file extension unless
+                        export_codec is set
+
+        Returns:
+            bool: False if there is nothing to export or an export is in progress
+        """
+        if self.exporting or self.frames is None:
+            return False
+        if not self.frames and not self._pipeline_running:
+            return False
+        self._exporter = VideoExporter(
+            self.frames,
+            path,
+            fps=self.export_fps or self.source_fps,
+            codec=self.export_codec,
+            size=self.export_size,
+        )
+        logger.debug(f"export {path}: codec={self._exporter.codec}")
+        self._exporter.start()
+        if not self._pipeline_running:
+            self._exporter.finish(len(self.frames))
+        elif self._pipeline_worker:
+            self._pipeline_worker.exporter = self._exporter
+        self._export_poll = Clock.schedule_interval(
+            self._poll_export, RATE_REPORT_INTERVAL
+        )
+        return True
+
+    def save_session(self, path: str) -> bool:
+        """Save frames of finished run, with its pipeline and source metadata, into
+        session archive in the background
+
+        Args:
+            path (str): session archive path
+
+        Returns:
+            bool: False if there is nothing to save or pipeline is still running
+        """
+        if self.exporting or self._pipeline_running or not self.frames:
+            return False
+        metadata = {
+            "pipeline_path": self._pipeline_model.filepath,
+            "source_fps": self.source_fps,
+            "source_frame_count": self.num_frames,
+        }
+        self._session_saver = SessionSaver(
+            path,
+            self.frames,
+            self._pipeline_model.get_string_representation(),
+            metadata,
+        )
+        self._session_saver.start()
+        self._session_save_poll = Clock.schedule_interval(
+            self._poll_session_save, RATE_REPORT_INTERVAL
+        )
+        return True
+
+    def export_node_stats(self, path: str) -> bool:
+        """Save node latency stats of current/last run to CSV or JSON file
+
+        Args:
+            path (str): stats file path, format is chosen by file extension
+
+        Returns:
+            bool: False if there are no stats
+        """
+        self._update_node_stats()
+        if not self.node_stats:
+            return False
+        write_node_stats(self.node_stats, path)
+        return True
+
+    def open_session(self, path: str) -> None:
+        """Replace current output with frames of saved session archive, ready for
+        playback. Frames are memory-mapped, so this is quick for any session size.
+        Caller should have set pipeline model to session's pipeline.
+
+        Args:
+            path (str): session archive path
+        """
+        if self._output_playback:
+            self._stop_playback()
+        self._cancel_export()  # it is reading current frames
+        frames, index = open_session(path)
+        self._release_frames()
+        self.frames = frames
+        self._zoom_cache.clear()
+        self.source_fps = index.get("source_fps") or DEFAULT_SOURCE_FPS
+        self.num_frames = index.get("source_frame_count", 0)
+        self.frame_idx = 0
+        self.output_layout.install_slider()
+        self._enable_slider()
+        self._enable_zoom()
+        self._show_frame()
+        self._pipeline_model.clear_dirty_bit()  # replay session, don't rerun it
+        self._set_output_header(f"Session {Path(path).name}", color=WHITE)
+
+    def shutdown(self) -> None:
+        """Stop any running pipeline worker thread/process and release saved frames,
+        called on app exit"""
+        self._cancel_export()
+        self._clear_output_cache()  # delete spill file
+        self._cancel_preload()
+        self.node_pool.clear()
+        if isinstance(self._pipeline_worker, PipelineProcess):
+            self._pipeline_worker.terminate()
+        elif self._pipeline_worker:
+            self._pipeline_worker.stop()
+            self._pipeline_worker.join(TERMINATE_TIMEOUT)
+        if self.frames is not None:
+            self.frames.close()  # delete spill file
+
     def rerun_pipeline(self) -> None:
         """Cause PeekingDuck to rerun entire pipeline by setting its dirty bit"""
+        self._clear_output_cache()  # i.e. no incremental rerun
+        self._cancel_preload()
+        self.node_pool.clear()  # rebuild every node, e.g. edited custom nodes
         self._pipeline_model.set_dirty_bit()
         self.play_stop()
 
@@ -174,6 +406,18 @@ class OutputController:
             self.zoom_idx -= 1
             self._update_zoom_text()
 
+    def speed_up(self) -> None:
+        """Play output faster"""
+        if self.speed_idx + 1 < len(PLAYBACK_SPEEDS):
+            self.speed_idx += 1
+            self._update_speed_text()
+
+    def speed_down(self) -> None:
+        """Play output slower"""
+        if self.speed_idx > 0:
+            self.speed_idx -= 1
+            self._update_speed_text()
+
     ################
     # Internal methods: used within OutputController
     ################
@@ -194,23 +438,49 @@ class OutputController:
         return False
 
     def _do_playback(self, *args) -> None:
-        """Playback the output, called repeatedly by clock scheduler until stop"""
+        """Start output playback from current frame. Frames are shown by
+        _playback_tick until stop."""
         self._output_playback = True
-        if self._forward_one_frame():
-            self.forward_one_frame_held = Clock.schedule_once(
-                self._do_playback, PLAYBACK_INTERVAL
-            )
-        else:
+        self._restart_playback_clock()
+        self._playback_event = Clock.schedule_interval(
+            self._playback_tick, PLAYBACK_INTERVAL
+        )
+
+    def _restart_playback_clock(self) -> None:
+        """Anchor playback clock to current frame and time, e.g. on speed change"""
+        self._playback_start_idx = self.frame_idx
+        self._playback_start_time = time.perf_counter()
+
+    def _playback_tick(self, *args) -> None:
+        """Show the frame due at current wall clock time according to source FPS
+        and playback speed, called repeatedly by clock scheduler until stop.
+        Frames are dropped if display cannot keep up.
+        """
+        elapsed = time.perf_counter() - self._playback_start_time
+        fps = self.source_fps * PLAYBACK_SPEEDS[self.speed_idx]
+        due_idx = self._playback_start_idx + int(elapsed * fps)
+        if due_idx >= len(self.frames):
             self._stop_playback()
             # print(f"btn_loop.depressed={self.btn_loop.depressed}")
             if self.btn_loop.depressed:  # auto loop video
                 self.goto_first_frame()
                 self.play_stop()
+            return
+        if due_idx != self.frame_idx:
+            self.frame_idx = due_idx
+            self._show_frame()
+            self.frames.prefetch(due_idx + 1, PLAYBACK_PREFETCH)
+        if self._display_meter.update(self._num_frames_shown):
+            self._set_output_header(
+                f"Replaying {self._pipeline_model.filename} "
+                f"({self.display_rate:.1f} fps)"
+            )
 
     def _stop_playback(self) -> None:
         """Stop output playback"""
-        if hasattr(self, "forward_one_frame_held"):
-            self.forward_one_frame_held.cancel()
+        if self._playback_event:
+            self._playback_event.cancel()
+            self._playback_event = None
         self._output_playback = False
         self._toggle_btn_play_stop(state="play")
 
@@ -231,8 +501,38 @@ class OutputController:
         """Databinding for zoom -> image"""
         glyph = ZOOM_TEXT[self.zoom_idx]
         self.zoom.text = f"Zoom: {glyph}"
+        self._update_image_size()
         self._show_frame()
 
+    def _update_speed_text(self) -> None:
+        """Databinding for playback speed -> label"""
+        self.playback_speed.text = f"Speed: {SPEED_TEXT[self.speed_idx]}"
+        if self._output_playback:
+            self._restart_playback_clock()  # continue from current frame
+
+    def _playback_speed_touched(self, instance, touch) -> bool:
+        """Change playback speed on touch: scroll or right click steps speed up or
+        down, tap cycles through all speeds.
+
+        Args:
+            instance (Widget): playback speed label
+            touch (MotionEvent): the touch event
+
+        Returns:
+            bool: True if touch is consumed
+        """
+        if not instance.collide_point(*touch.pos):
+            return False
+        button = getattr(touch, "button", "left")
+        if button == "scrollup":
+            self.speed_up()
+        elif button in ("scrolldown", "right"):
+            self.speed_down()
+        else:
+            self.speed_idx = (self.speed_idx + 1) % len(PLAYBACK_SPEEDS)
+            self._update_speed_text()
+        return True
+
     ####################
     # Output display widget management: hide/show progress/slider/zoom
     ####################
@@ -271,8 +571,18 @@ class OutputController:
             value (int): slider value
         """
         # logger.debug(f"value={value}")
-        self.frame_idx = value - 1
-        self._show_frame()
+        self._scrub_idx = int(value) - 1
+        if self._scrub_idx != self.frame_idx:  # else set by _show_frame itself
+            self._scrub_trigger()  # coalesces all value changes until next frame
+
+    def _scrub_to_frame(self, *args) -> None:
+        """Show frame at latest slider position, called by clock trigger before
+        next frame is drawn"""
+        if self._scrub_idx != self.frame_idx and self._scrub_idx < len(self.frames):
+            self.frame_idx = self._scrub_idx
+            self._show_frame()
+            if self._output_playback:
+                self._restart_playback_clock()  # continue playing from here
 
     def _disable_zoom(self) -> None:
         """Make zoom widget invisible"""
@@ -288,11 +598,13 @@ class OutputController:
     def _run_pipeline_done(self, *args) -> None:
         """Called when pipeline execution is completed.
         To perform clean-up/housekeeping tasks to ensure system consistency"""
-        for node in self.pipeline.nodes:
-            if node.name.endswith("input.visual"):
-                node.release_resources()  # clean up nodes with threads
+        if self.pipeline:  # child process cleans up its own pipeline
+            release_source_nodes(self.pipeline)
         self._toggle_btn_play_stop(state="play")
         self._pipeline_running = False
+        self._update_node_stats()
+        if self._exporter:
+            self._exporter.finish(len(self.frames))  # no more frames coming
         self.output_layout.install_slider()
         self._enable_slider()
         self._pipeline_model.clear_dirty_bit()  # only if all ends well
@@ -301,14 +613,22 @@ class OutputController:
         """Start pipeline execution by
         a) loading pipeline
         b) preparing Output widgets for playback
-        c) starting clock scheduler for subsequent pipeline iterations
+        c) starting clock scheduler or worker thread for pipeline iterations
         d) capturing any PeekingDuck errors that arise from starting the pipeline
 
         Args:
             custom_nodes_parent_subdir (str, optional): custom nodes folder.
                                                         Defaults to "src".
         """
+        assert self.exec_mode in EXEC_MODES
+        if self.exec_mode == EXEC_MODE_PROCESS and not PROCESS_MODE_SUPPORTED:
+            logger.warning("process mode needs Python 3.8+, using thread mode")
+            self.exec_mode = EXEC_MODE_THREAD
+        if self._preloader and self.exec_mode != EXEC_MODE_PROCESS:
+            self._start_after_preload = True  # started by _poll_preloader
+            return
         exc_msg: str = ""
+        worker: Optional[PipelineWorker] = None
         # _out = StringIO()
         _err = StringIO()
         # with redirect_stderr(_err), redirect_stdout(_out):
@@ -316,15 +636,52 @@ class OutputController:
             try:
                 pipeline_str = self._pipeline_model.get_string_representation()
                 working_dir = self._pipeline_model.fileparent
-                self._load_pipeline(
-                    pipeline_str, working_dir, custom_nodes_parent_subdir
+                if self.exec_mode == EXEC_MODE_PROCESS:
+                    self.pipeline = None  # loaded by child process instead
+                    self.execution_plan = None
+                    self._clear_output_cache()
+                else:
+                    self._load_pipeline(
+                        pipeline_str, working_dir, custom_nodes_parent_subdir
+                    )
+                    self._setup_output_cache()
+                self._cancel_export()  # it is reading last run's frames
+                self._release_frames()  # last run's
+                self._zoom_cache.clear()
+                self.frames = make_frame_store(
+                    self.frame_store_mode, self.frame_ram_budget
                 )
-                self.frames = []
+                cache = self._output_cache
+                recording = cache and not self.execution_plan.resume_idx
+                if recording and self.frame_store_mode == FRAME_STORE_RAW:
+                    cache.frames = self.frames  # take cached `img`s from it
                 self.frame_idx = -1
+                self.source_fps = DEFAULT_SOURCE_FPS
+                self.num_iterations = 0
+                self.progress = None
+                self._iteration_meter.reset()
+                self.node_stats = []
                 self._disable_slider()
                 self.output_layout.install_progress_bar()
                 self._enable_zoom()
-                Clock.schedule_once(self._run_one_pipeline_iteration, PLAYBACK_INTERVAL)
+                if self.exec_mode == EXEC_MODE_THREAD:
+                    # started below, outside the process-wide stderr redirect
+                    worker = PipelineWorker(self.execution_plan, self.frames)
+                elif self.exec_mode == EXEC_MODE_PROCESS:
+                    self._start_pipeline_worker(
+                        PipelineProcess(
+                            pipeline_str,
+                            working_dir,
+                            custom_nodes_parent_subdir,
+                            self.frames,
+                            prefetch=self.prefetch,
+                        )
+                    )
+                else:
+                    self._pipeline_running = True
+                    self._pipeline_iterations_event = Clock.schedule_interval(
+                        self._run_pipeline_iterations, PLAYBACK_INTERVAL
+                    )
             except BaseException as e:
                 self._toggle_btn_play_stop(state="play")
                 logger.exception("PeekingDuck Error!")
@@ -337,81 +694,245 @@ class OutputController:
         # logger.debug(f"out_msg: {len(out_msg)}")
         # logger.debug(out_msg)
         err_msg = parse_streams(_err)
-        if err_msg:
-            logger.debug(f"err_msg: {len(err_msg)}")
-            logger.debug(err_msg)
-        if exc_msg:
-            logger.debug(f"exc_msg: {len(exc_msg)}")
-            logger.debug(exc_msg)
-            the_msg = err_msg if err_msg else exc_msg
-            msgbox = MsgBox("PeekingDuck Runtime Error", the_msg, "Ok")
-            msgbox.show()
+        self._report_pipeline_errors(err_msg, exc_msg)
+        if worker:
+            self._start_pipeline_worker(worker)
 
-    def _run_one_pipeline_iteration(self, *args) -> None:
-        """Execute one iteration of the pipeline"""
+    def _run_pipeline_iterations(self, *args) -> None:
+        """Execute as many pipeline iterations as fit in the per-tick time budget
+        and show only the last frame, called repeatedly by clock scheduler until
+        pipeline terminates"""
         exc_msg: str = ""
         _err = StringIO()
         with redirect_stderr(_err):
             try:
-                self._pipeline_running = True
-                for node in self.pipeline.nodes:
-                    if self.pipeline.data.get("pipeline_end", False):
-                        self.pipeline.terminate = True
-                        if "pipeline_end" not in node.inputs:
-                            continue
-                    if "all" in node.inputs:
-                        inputs = copy.deepcopy(self.pipeline.data)
-                    else:
-                        inputs = {
-                            key: self.pipeline.data[key]
-                            for key in node.inputs
-                            if key in self.pipeline.data
-                        }
-                    if hasattr(node, "optional_inputs"):
-                        for key in node.optional_inputs:
-                            # The nodes will not receive inputs with the optional
-                            # key if it's not found upstream
-                            if key in self.pipeline.data:
-                                inputs[key] = self.pipeline.data[key]
-                    if node.name.endswith("output.screen"):
-                        # intercept screen output to Kivy
-                        img = self.pipeline.data["img"]
-                        # (0,0) == opencv top-left == kivy bottom-left
-                        frame = cv2.flip(img, 0)  # flip around x-axis
-                        self.frames.append(frame)  # save frame for playback
-                        self.frame_idx += 1
-                        self._show_frame()
-                    else:
-                        outputs = node.run(inputs)
-                        self.pipeline.data.update(outputs)
-                    # check for FPS on first iteration
-                    if self.frame_idx == 0 and node.name.endswith("input.visual"):
-                        num_frames = node.total_frame_count
-                        if num_frames > 0:
-                            self.num_frames = num_frames
-                            self._enable_progress()
-                        else:
-                            self.num_frames = 0
-                            self.progress = None
-
-                if self.progress:
-                    self.progress.value += 1
-
-                if not self.pipeline.terminate:
-                    Clock.schedule_once(
-                        self._run_one_pipeline_iteration, PLAYBACK_INTERVAL
-                    )
-                else:
+                deadline = time.perf_counter() + self.iteration_budget
+                last_frame_idx = self.frame_idx
+                while not self.pipeline.terminate:
+                    self._run_one_pipeline_iteration()
+                    if time.perf_counter() >= deadline:
+                        break
+                if self.frame_idx != last_frame_idx:
+                    self._show_frame()  # only the last frame of this tick
+                    if self.progress:
+                        self.progress.value = self.frame_idx + 1
+                self._report_iteration_rate(self.num_iterations)
+
+                if self.pipeline.terminate:
+                    self._pipeline_iterations_event.cancel()
                     Clock.schedule_once(self._run_pipeline_done, PLAYBACK_INTERVAL)
             except BaseException as e:
                 logger.exception("PeekingDuck Error!")
                 # exc_msg = str(e)
                 exc_msg = traceback.format_exc()
+                self._pipeline_iterations_event.cancel()
                 self._run_pipeline_done()
                 self._disable_slider()
                 self._pipeline_model.set_dirty_bit()  # but all is not well
 
         err_msg = parse_streams(_err)
+        self._report_pipeline_errors(err_msg, exc_msg)
+
+    def _run_one_pipeline_iteration(self) -> None:
+        """Execute one iteration of the pipeline"""
+        self.execution_plan.run_iteration(self._capture_screen_output)
+        self.num_iterations += 1
+        # check for FPS on first iteration
+        if self.frame_idx == 0 and self.progress is None:
+            self._check_source(
+                self.execution_plan.get_source_frame_count(),
+                self.execution_plan.get_source_fps(),
+            )
+
+    def _capture_screen_output(self, img: np.ndarray) -> None:
+        """Intercept output.screen image and save it for playback
+
+        Args:
+            img (np.ndarray): output.screen image
+        """
+        self.frames.append(img)  # save frame for playback, in opencv orientation
+        self.frame_idx += 1
+        if self._exporter:
+            self._exporter.submit(self.frame_idx, img)
+
+    def _report_iteration_rate(self, num_iterations: int) -> None:
+        """Update achieved iterations per second in output header, at most once
+        every RATE_REPORT_INTERVAL secs
+
+        Args:
+            num_iterations (int): total iterations run so far
+        """
+        if self._iteration_meter.update(num_iterations):
+            status = f"{self.iteration_rate:.1f} it/s"
+            if self._exporter:
+                status += (
+                    f", export backlog {self._exporter.backlog}"
+                    f" ({self._exporter.num_overflows} overflows)"
+                )
+            self._set_output_header(
+                f"Running {self._pipeline_model.filename} ({status})"
+            )
+            self._update_node_stats()
+
+    def _update_node_stats(
+        self, worker: Union[PipelineWorker, PipelineProcess] = None
+    ) -> None:
+        """Fetch node latency stats from pipeline worker or execution plan, and pass
+        them to node_stats_callback for display
+
+        Args:
+            worker (Union[PipelineWorker, PipelineProcess], optional): worker that
+                                just ended. Defaults to None (current worker/plan).
+        """
+        source = worker or self._pipeline_worker or self.execution_plan
+        if source is None:
+            return
+        stats = source.get_node_stats()
+        if not stats:
+            return  # child process has not reported yet
+        self.node_stats = stats
+        if self.node_stats_callback:
+            self.node_stats_callback(stats)
+
+    def _check_source(self, num_frames: int, fps: float) -> None:
+        """Enable progress bar if total number of frames of input source is known,
+        and set playback frame rate to that of input source
+
+        Args:
+            num_frames (int): total frame count of input source, 0 if unknown
+            fps (float): frame rate of input source, 0 if unknown
+        """
+        self.source_fps = fps if fps > 0 else DEFAULT_SOURCE_FPS
+        if self._exporter and not self.export_fps and not self._exporter.num_written:
+            self._exporter.fps = self.source_fps  # export began before fps known
+        if num_frames > 0:
+            self.num_frames = num_frames
+            self.frames.reserve(num_frames)
+            self._enable_progress()
+        else:
+            self.num_frames = 0
+            self.progress = None
+
+    def _start_pipeline_worker(
+        self, worker: Union[PipelineWorker, PipelineProcess]
+    ) -> None:
+        """Start background worker thread/process to run pipeline, and clock
+        scheduler to display its output frames
+
+        Args:
+            worker (Union[PipelineWorker, PipelineProcess]): the worker to start
+        """
+        self._pipeline_running = True
+        self._pipeline_worker = worker
+        self._pipeline_worker.start()
+        self._pipeline_worker_poll = Clock.schedule_interval(
+            self._poll_pipeline_worker, PLAYBACK_INTERVAL
+        )
+
+    def _poll_pipeline_worker(self, *args) -> None:
+        """Show newest frame from pipeline worker thread/process and check if it has
+        ended, called repeatedly by clock scheduler until worker ends"""
+        worker = self._pipeline_worker
+        worker_alive = worker.is_alive()  # check before draining queue: no lost frames
+        newest = worker.get_newest_frame()
+        if newest is not None:
+            self.frame_idx = newest[0]
+            self._show_frame()
+            if self.progress is None:
+                self._check_source(worker.source_frame_count, worker.source_fps)
+            if self.progress:
+                self.progress.value = self.frame_idx + 1
+        self._report_iteration_rate(len(self.frames))
+        if worker_alive:
+            return
+
+        self._pipeline_worker_poll.cancel()
+        worker.join()
+        self._pipeline_worker = None
+        self._update_node_stats(worker)  # final stats
+        if self.frames and self.frame_idx != len(self.frames) - 1:
+            self.frame_idx = len(self.frames) - 1
+            self._show_frame()
+        if worker.exc_msg:
+            self._run_pipeline_done()
+            self._disable_slider()
+            self._pipeline_model.set_dirty_bit()  # but all is not well
+        else:
+            self._run_pipeline_done()
+        self._report_pipeline_errors(worker.err_msg, worker.exc_msg)
+
+    def _poll_export(self, *args) -> None:
+        """Show video export progress and back-pressure, and report result when
+        done, called repeatedly by clock scheduler until export ends"""
+        exporter = self._exporter
+        if exporter.is_alive():
+            if not self._pipeline_running and not self._output_playback:
+                self._set_output_header(
+                    f"Exporting {Path(exporter.path).name} "
+                    f"({exporter.num_written}/{exporter.num_frames} frames)"
+                )
+            return
+        self._export_poll.cancel()
+        exporter.join()
+        self._exporter = None
+        if exporter.error:
+            msgbox = MsgBox("Video Export Error", exporter.error, "Ok")
+        else:
+            msgbox = MsgBox(
+                "Alert",
+                f"{exporter.num_written} frames exported to {exporter.path}",
+                "Ok",
+            )
+        msgbox.show()
+        if not self._pipeline_running and not self._output_playback:
+            self._set_output_header(self._pipeline_model.filename)
+
+    def _cancel_export(self) -> None:
+        """Stop video export or session save in progress, if any, and wait for it
+        to end"""
+        if self._exporter:
+            logger.warning(f"cancel export to {self._exporter.path}")
+            self._export_poll.cancel()
+            self._exporter.cancel()
+            self._exporter.join()
+            self._exporter = None
+        if self._session_saver:
+            logger.warning(f"cancel session save to {self._session_saver.path}")
+            self._session_save_poll.cancel()
+            self._session_saver.cancel()
+            self._session_saver.join()
+            self._session_saver = None
+
+    def _poll_session_save(self, *args) -> None:
+        """Show session save progress, and report result when done, called
+        repeatedly by clock scheduler until save ends"""
+        saver = self._session_saver
+        if saver.is_alive():
+            if not self._output_playback:
+                self._set_output_header(
+                    f"Saving {Path(saver.path).name} "
+                    f"({saver.num_written}/{saver.num_frames} frames)"
+                )
+            return
+        self._session_save_poll.cancel()
+        saver.join()
+        self._session_saver = None
+        if saver.error:
+            msgbox = MsgBox("Session Save Error", saver.error, "Ok")
+        else:
+            msgbox = MsgBox("Alert", f"Session saved to {saver.path}", "Ok")
+        msgbox.show()
+        if not self._output_playback:
+            self._set_output_header(self._pipeline_model.filename)
+
+    def _report_pipeline_errors(self, err_msg: str, exc_msg: str) -> None:
+        """Log captured PeekingDuck stderr/exception messages, and show error dialog
+        if there is an exception
+
+        Args:
+            err_msg (str): captured stderr messages
+            exc_msg (str): exception traceback
+        """
         if err_msg:
             logger.debug(f"err_msg: {len(err_msg)}")
             logger.debug(err_msg)
@@ -424,13 +945,18 @@ class OutputController:
 
     def _stop_running_pipeline(self) -> None:
         """Signals pipeline execution to be stopped"""
-        self.pipeline.terminate = True
+        if self._pipeline_worker:
+            self._pipeline_worker.stop()
+        else:
+            self.pipeline.terminate = True
 
     def _show_frame(self) -> None:
         """Renders image frame pointed to by the index self.frame_idx"""
         if self.frames:
-            frame = self.frames[self.frame_idx]
-            frame = self._apply_zoom(frame)  # note: can speed up zoom?
+            if self.gpu_zoom:
+                frame = self.frames[self.frame_idx]
+            else:
+                frame = self._get_zoomed_frame(self.frame_idx)
             self._blitz_texture(frame)
             # mimic an observer pattern-like behavior...
             # not as cool as binding slider.value directly to self.frame_idx :(
@@ -438,8 +964,28 @@ class OutputController:
             self.slider.value = frame_count
             self.frame_counter.text = str(frame_count)
 
+    def _get_zoomed_frame(self, frame_idx: int) -> np.ndarray:
+        """Get CPU zoomed frame, from cache if it has been zoomed recently
+
+        Args:
+            frame_idx (int): index of frame to zoom
+
+        Returns:
+            np.ndarray: the zoomed image
+        """
+        key = (frame_idx, self.zoom_idx)
+        frame = self._zoom_cache.get(key)
+        if frame is not None:
+            self._zoom_cache.move_to_end(key)
+            return frame
+        frame = self._apply_zoom(self.frames[frame_idx])
+        self._zoom_cache[key] = frame
+        if len(self._zoom_cache) > ZOOM_CACHE_SIZE:
+            self._zoom_cache.popitem(last=False)
+        return frame
+
     def _apply_zoom(self, frame: np.ndarray) -> np.ndarray:
-        """Zoom output image in real-time
+        """Zoom output image on CPU
 
         Args:
             frame (np.ndarray): image frame data to be zoomed
@@ -447,91 +993,168 @@ class OutputController:
         Returns:
             np.ndarray: the zoomed image
         """
-        # logger.debug(f"zoom_idx={self.zoom_idx}")
-        if self.zoom_idx != 2:
-            # zoom image
-            zoom = ZOOMS[self.zoom_idx]
-            # logger.debug(f"img.shape = {img.shape}, zoom = {zoom}")
-            new_size = (
-                int(frame.shape[0] * zoom),
-                int(frame.shape[1] * zoom),
-                frame.shape[2],
-            )
-            # logger.debug(f"zoom image to {new_size}")
-            # note: opencv is faster than scikit-image!
-            frame = cv2.resize(frame, (new_size[1], new_size[0]))
-        return frame
+        return zoom_frame(frame, ZOOMS[self.zoom_idx])
 
     def _blitz_texture(self, frame: np.ndarray) -> None:
-        """The good ol' graphics framebuffer bit blitz
+        """The good ol' graphics framebuffer bit blitz.
+        Reuse current texture unless frame size has changed, and blit straight
+        from frame memory (no intermediate bytes copy).
 
         Args:
             frame (np.ndarray): image frame data to be blitz'd
         """
-        framebuffer = bytes(frame)
-        texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt="bgr")
-        texture.blit_buffer(framebuffer, colorfmt="bgr", bufferfmt="ubyte")
-        self.output_image.texture = texture
-
-        # # apply built-in zoom (experimental)
-        # # dotw: doesn't work well 'coz image texture is rendered first on-screen, then
-        # #       moved to its correct position, i.e. results in bad flicker!
-        # zoom = ZOOMS[self.zoom_idx]
-        # new_size = (int(frame.shape[1] * zoom), int(frame.shape[0] * zoom))
-        # parent = self.output_image.parent
-        # parent_size = parent.size
-        # image_size = (
-        #     min(new_size[0], parent_size[0]),
-        #     min(new_size[1], parent_size[1]),
-        # )
-        # self.output_image.size = image_size
-        # # logger.debug(f"image size: {self.output_image.size} in {type(parent)} {parent_size}")
+        size = (frame.shape[1], frame.shape[0])
+        if self._texture is None or self._texture.size != size:
+            logger.debug(f"new texture size={size}")
+            self._texture = Texture.create(size=size, colorfmt="bgr")
+            # (0,0) == opencv top-left == kivy bottom-left: flip texture coords
+            # instead of flipping every frame
+            self._texture.flip_vertical()
+            self.output_image.texture = self._texture
+            self._update_image_size()
+        # 1-D view of frame memory, no copy
+        self._texture.blit_buffer(blit_view(frame), colorfmt="bgr", bufferfmt="ubyte")
+        self.output_image.canvas.ask_update()
+        self._num_frames_shown += 1
+
+    def _update_image_size(self, *args) -> None:
+        """Size image widget to texture size * zoom, shrunk to fit within image box
+        (keeping aspect ratio). GPU scales texture to widget size when rendering,
+        so zooming costs nothing per frame.
+        """
+        if self._texture is None:
+            return
+        zoom = ZOOMS[self.zoom_idx] if self.gpu_zoom else 1.0
+        tex_width, tex_height = self._texture.size
+        width, height = tex_width * zoom, tex_height * zoom
+        box_width, box_height = self.image_box.size
+        fit = min(1.0, box_width / width, box_height / height)
+        self.output_image.size = (width * fit, height * fit)
+
+    def _preload_nodes(self, *args) -> None:
+        """Start building reusable nodes of current pipeline into node pool in
+        background, called by preload trigger after pipeline is opened or edited
+        """
+        if (
+            not self.preload
+            or self.exec_mode == EXEC_MODE_PROCESS  # child builds its own nodes
+            or self._pipeline_model is None
+            or not self._pipeline_model.dirty  # e.g. session replay
+            or self._pipeline_running
+        ):
+            return
+        if self._preloader:
+            self._preload_pending = True  # preload again once current one ends
+            return
+        pipeline_str = self._pipeline_model.get_string_representation()
+        try:
+            if not has_reusable_nodes(pipeline_str):
+                logger.debug("no preload: all nodes are custom or stateful")
+                return
+            node_loader = make_node_loader(
+                pipeline_str,
+                self._pipeline_model.fileparent,
+                "src",
+                self.node_pool,
+            )
+        except BaseException:
+            # invalid pipeline: its run reports the error
+            logger.debug(f"cannot preload: {traceback.format_exc()}")
+            return
+        self._preloader = NodePreloader(node_loader)
+        self._preloader.start()
+        self._preloader_poll = Clock.schedule_interval(
+            self._poll_preloader, PRELOAD_POLL_INTERVAL
+        )
+
+    def _poll_preloader(self, *args) -> None:
+        """Show node preload progress in output header and act on its end, called
+        repeatedly by clock scheduler until preloader ends"""
+        preloader = self._preloader
+        idle = not (self._pipeline_running or self._output_playback)
+        if preloader.is_alive():
+            if idle:
+                num_done, node_title = preloader.progress
+                self._set_output_header(
+                    f"Loading {node_title} "
+                    f"({num_done}/{self._pipeline_model.num_nodes})"
+                )
+            return
+
+        self._preloader_poll.cancel()
+        self._preloader = None
+        if self._start_after_preload:
+            self._start_after_preload = False
+            self._set_output_header(
+                f"Running {self._pipeline_model.filename}", color=RED
+            )
+            self._run_pipeline_start()
+        elif self._preload_pending:
+            self._preload_pending = False
+            self._preload_nodes()
+        elif idle:
+            self._set_output_header(self._pipeline_model.filename, color=WHITE)
+
+    def _cancel_preload(self) -> None:
+        """Discard node preload in progress, if any"""
+        self._preload_pending = False
+        if self._preloader:
+            self._preloader.cancel()
 
     def _load_pipeline(
         self, pipeline_str: str, working_dir: str, custom_nodes_parent_subdir: str
     ) -> None:
-        """Convert YAML pipeline into internal Pipeline object by saving it into a temp
-        working pipeline file and loading that using PeekingDuck's DeclarativeLoader class.
+        """Convert YAML pipeline into internal Pipeline object using PeekingDuck's
+        DeclarativeLoader class.
 
         Args:
             pipeline_str (str): YAML representation of pipeline
             working_dir (str): pipeline working directory
             custom_nodes_parent_subdir (str): folder containing custom nodes
         """
-        if working_dir != ".":
-            os.chdir(working_dir)
-        else:
-            working_dir = str(Path.home())
-
-        logger.debug(f"pipeline_data={pipeline_str}")
-        logger.debug(f"working_dir={working_dir}, cwd={os.getcwd()}")
-
-        # create temp working file
-        now_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        tmp_filename = f"pkds_pipeline_{now_str}.yml"
-        pipeline_path = os.path.join(working_dir, tmp_filename)
-        logger.debug(f"pipeline_path={pipeline_path}")
-        with open(pipeline_path, "w") as tempfile:
-            tempfile.writelines(pipeline_str)
-        # read yaml and show debug info
-        logger.debug("yaml")
-        with open(pipeline_path, "r") as tempfile:
-            the_yaml = yaml.safe_load(tempfile)
-        logger.debug(the_yaml)
-        logger.debug("-----")
-        ss = yaml.dump(the_yaml, default_flow_style=None)
-        logger.debug(ss)
-        logger.debug("-----")
-        # load temp working file into pipeline object
-        self.node_loader = DeclarativeLoader(
-            Path(pipeline_path), "None", custom_nodes_parent_subdir
+        self.node_loader, self.pipeline = load_pipeline(
+            pipeline_str, working_dir, custom_nodes_parent_subdir, self.node_pool
         )
-        self.pipeline: Pipeline = self.node_loader.get_pipeline()
         logger.debug(f"self.pipeline: {self.pipeline}")
-        # clean up by removing temp file
-        if os.path.isfile(pipeline_path):
-            logger.debug(f"delete {pipeline_path}")
-            os.remove(pipeline_path)
+        self.execution_plan = ExecutionPlan(self.pipeline, prefetch=self.prefetch)
+
+    def _setup_output_cache(self) -> None:
+        """Make execution plan replay outputs of nodes unchanged since last run from
+        output cache, or else record a new output cache for the next run"""
+        if not self.incremental:
+            self._clear_output_cache()
+            return
+        signatures = self._pipeline_model.node_signatures()
+        cache = self._output_cache
+        if cache:
+            cache.wait()  # for writer thread to store last frames
+        if cache and cache.usable:
+            num_unchanged = cache.num_unchanged(signatures)
+            resume_idx = self.execution_plan.replay_outputs(cache, num_unchanged)
+            if resume_idx:
+                logger.info(f"rerun from node {resume_idx + 1}, cached before that")
+                return
+        self._clear_output_cache()
+        num_cached = self.execution_plan.cacheable_steps()
+        if num_cached:
+            self._output_cache = OutputCache(signatures[:num_cached])
+            self.execution_plan.record_outputs(self._output_cache)
+
+    def _clear_output_cache(self) -> None:
+        """Release output cache, next run will run every node"""
+        cache = self._output_cache
+        if cache:
+            cache.close()
+            if cache.frames is not None and cache.frames is not self.frames:
+                cache.frames.close()  # kept by _release_frames() for replay
+            self._output_cache = None
+
+    def _release_frames(self) -> None:
+        """Release current frames, unless output cache takes cached `img`s from
+        them (then _clear_output_cache() releases them)"""
+        cache = self._output_cache
+        if self.frames is not None and not (cache and cache.frames is self.frames):
+            self.frames.close()
 
     def _update_nodes(self) -> None:
         """Update UI properties of playback screen"""
@@ -2,11 +2,12 @@
 # PeekingDuck Studio Controller for Pipeline Nodes
 #
 
-from typing import List, Union
+from typing import Any, Dict, List, Union
 from peekingduck_studio.gui_utils import NODE_COLOR_SELECTED, make_logger
 from peekingduck_studio.gui_widgets import Node, NODE_HEIGHT
 from peekingduck_studio.model_node import ModelNode
 from peekingduck_studio.model_pipeline import ModelPipeline
+from peekingduck_studio.node_stats import format_node_stats, stats_fps
 
 logger = make_logger(__name__)
 
@@ -121,6 +122,23 @@ class PipelineController:
         """
         self.pipeline_header.header_text = text
 
+    def show_node_stats(self, stats: List[Dict[str, Any]]) -> None:
+        """Show latency stats next to each GUI node and pipeline FPS in header
+
+        Args:
+            stats (List[Dict[str, Any]]): stats from NodeLatencies.stats(), in
+                                          pipeline order, last one for pipeline
+        """
+        gui_nodes = self.nodes_layout.children[::-1]  # Kivy lists last added first
+        for gui_node, stat in zip(gui_nodes, stats[:-1]):
+            # positional match, skip if pipeline was edited since run started
+            if stat["node"].endswith(gui_node.node_text) and stat["count"]:
+                gui_node.node_stats = format_node_stats(stat)
+            else:
+                gui_node.node_stats = ""
+        n = len(gui_nodes)
+        self.set_pipeline_header(f"Pipeline: {n} nodes, {stats_fps(stats):.1f} FPS")
+
     def set_pipeline_model(self, pipeline_model: ModelPipeline) -> None:
         """Set pipeline model working var to given ModelPipeline
 
@@ -169,7 +187,7 @@ class PipelineController:
             gui_node = Node(
                 node.uid, node.node_title, node_num, height=self.node_height
             )
-            logger.debug(f"node_num: {node_num} node_title: {node.node_title}")
+            logger.debug("node_num: %s node_title: %s", node_num, node.node_title)
             self.nodes_layout.add_widget(gui_node)
 
             if return_uid == node.uid:
@@ -0,0 +1,427 @@
+#
+# PeekingDuck Studio Out-of-Process Pipeline Runner
+#
+# Technote: the child process loads and runs the pipeline, and writes every
+# output.screen frame into a fixed-size ring buffer of preallocated frames in
+# shared memory. Only small messages travel via queues:
+#   parent -> child (control): CTRL_STOP
+#   child -> parent (results): MSG_RING, MSG_FRAME, MSG_SOURCE, MSG_STATS,
+#                              MSG_DONE, MSG_ERROR
+# Flow control uses a semaphore counting free ring slots: the child acquires one
+# before writing a frame, the parent releases it after copying the frame out.
+#
+# multiprocessing.shared_memory needs Python 3.8+: on 3.7 PROCESS_MODE_SUPPORTED
+# is False and OutputController falls back to thread mode.
+#
+
+from typing import Any, Dict, List, Optional, Tuple
+from contextlib import redirect_stderr
+from io import StringIO
+import multiprocessing as mp
+import queue
+import time
+import traceback
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7
+    shared_memory = None
+from peekingduck_studio.core_utils import (
+    get_log_level,
+    make_logger,
+    set_log_level,
+    shutdown_logging,
+)
+from peekingduck_studio.frame_store import FrameStore
+from peekingduck_studio.video_export import VideoExporter
+from peekingduck_studio.pipeline_runner import (
+    PREFETCH_FRAMES,
+    ExecutionPlan,
+    load_pipeline,
+    parse_streams,
+    release_source_nodes,
+)
+
+RING_SLOTS = 8  # number of preallocated frames in shared memory ring buffer
+SLOT_WAIT_TIMEOUT = 0.1  # secs, child waits this long for a free slot per attempt
+TERMINATE_TIMEOUT = 2.0  # secs, grace period before child is forcibly terminated
+STATS_INTERVAL = 1.0  # secs, child sends node latency stats this often
+# control messages
+CTRL_STOP = "stop"
+# result messages
+MSG_RING = "ring"
+MSG_FRAME = "frame"
+MSG_SOURCE = "source"
+MSG_STATS = "stats"
+MSG_DONE = "done"
+MSG_ERROR = "error"
+PROCESS_MODE_SUPPORTED = shared_memory is not None
+
+logger = make_logger(__name__)
+
+
+def make_error_record(exc: BaseException, stderr: str) -> Dict[str, str]:
+    """Make a structured (and picklable) error record from child-side exception
+
+    Args:
+        exc (BaseException): the exception raised
+        stderr (str): captured stderr messages
+
+    Returns:
+        Dict[str, str]: the error record
+    """
+    return {
+        "type": type(exc).__name__,
+        "message": str(exc),
+        "traceback": traceback.format_exc(),
+        "stderr": stderr,
+    }
+
+
+class FrameRing:
+    """Fixed-size ring buffer of preallocated frames backed by shared memory"""
+
+    def __init__(
+        self,
+        shape: Tuple[int, ...],
+        dtype: str,
+        num_slots: int,
+        name: Optional[str] = None,
+    ) -> None:
+        """Create new shared memory ring buffer, or attach to existing one if named
+
+        Args:
+            shape (Tuple[int, ...]): shape of one frame
+            dtype (str): frame data type
+            num_slots (int): number of frames in ring buffer
+            name (Optional[str], optional): shared memory block to attach to.
+                                            Defaults to None (create new block).
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.num_slots = num_slots
+        nbytes = num_slots * int(np.prod(shape)) * self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=name is None, size=nbytes
+        )
+        self.slots = np.ndarray(
+            (num_slots, *self.shape), dtype=self.dtype, buffer=self._shm.buf
+        )
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        """Ring description sent to parent so it can attach to the same memory"""
+        return {
+            "name": self.name,
+            "shape": self.shape,
+            "dtype": self.dtype.str,
+            "num_slots": self.num_slots,
+        }
+
+    def close(self, unlink: bool = False) -> None:
+        """Detach from shared memory, optionally destroying it
+
+        Args:
+            unlink (bool, optional): destroy shared memory. Defaults to False.
+        """
+        self.slots = None  # drop buffer reference before closing
+        self._shm.close()
+        if unlink:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass  # already destroyed by other side
+
+
+class _ChildPipelineRunner:
+    """Child process side: run pipeline and publish frames into ring buffer"""
+
+    def __init__(
+        self, ctrl_queue, msg_queue, free_slots, num_slots: int, prefetch: int
+    ) -> None:
+        self.ctrl_queue = ctrl_queue
+        self.msg_queue = msg_queue
+        self.free_slots = free_slots
+        self.num_slots = num_slots
+        self.prefetch = prefetch
+        self.ring: FrameRing = None
+        self.pipeline = None
+        self.frame_idx: int = -1
+        self.slot_idx: int = -1
+
+    def run(
+        self, pipeline_str: str, working_dir: str, custom_nodes_parent_subdir: str
+    ) -> None:
+        _err = StringIO()
+        error_record = None
+        with redirect_stderr(_err):
+            try:
+                _, self.pipeline = load_pipeline(
+                    pipeline_str, working_dir, custom_nodes_parent_subdir
+                )
+                plan = ExecutionPlan(self.pipeline, prefetch=self.prefetch)
+                first_iteration = True
+                stats_time = time.monotonic()
+                while not self.pipeline.terminate:
+                    plan.run_iteration(self._screen_output)
+                    if first_iteration:
+                        first_iteration = False
+                        num_frames = plan.get_source_frame_count()
+                        fps = plan.get_source_fps()
+                        self.msg_queue.put((MSG_SOURCE, num_frames, fps))
+                    if time.monotonic() - stats_time >= STATS_INTERVAL:
+                        stats_time = time.monotonic()
+                        self.msg_queue.put((MSG_STATS, plan.get_node_stats()))
+                    self._check_control()
+                self.msg_queue.put((MSG_STATS, plan.get_node_stats()))
+                release_source_nodes(self.pipeline)
+            except BaseException as e:
+                error_record = make_error_record(e, parse_streams(_err))
+        if error_record:
+            self.msg_queue.put((MSG_ERROR, error_record))
+        else:
+            self.msg_queue.put((MSG_DONE, parse_streams(_err)))
+        if self.ring:
+            self._wait_all_slots_free()
+            self.ring.close(unlink=True)
+
+    def _check_control(self) -> None:
+        """Process pending control messages from parent"""
+        while True:
+            try:
+                ctrl = self.ctrl_queue.get_nowait()
+            except queue.Empty:
+                return
+            if ctrl == CTRL_STOP:
+                self.pipeline.terminate = True
+
+    def _screen_output(self, img: np.ndarray) -> None:
+        """Write screen output frame into next free ring buffer slot
+
+        Args:
+            img (np.ndarray): output.screen image
+        """
+        if self.ring is None or self.ring.shape != img.shape:
+            self._make_ring(img)
+        while not self.free_slots.acquire(timeout=SLOT_WAIT_TIMEOUT):
+            self._check_control()  # parent is busy, don't miss a stop request
+            if self.pipeline.terminate:
+                return  # drop frame, we are stopping anyway
+        self.frame_idx += 1
+        self.slot_idx = (self.slot_idx + 1) % self.num_slots
+        self.ring.slots[self.slot_idx] = img  # opencv orientation, texture flips it
+        self.msg_queue.put((MSG_FRAME, self.slot_idx, self.frame_idx))
+
+    def _make_ring(self, frame: np.ndarray) -> None:
+        """(Re)allocate ring buffer to fit given frame and tell parent about it
+
+        Args:
+            frame (np.ndarray): frame that needs to fit in ring buffer
+        """
+        if self.ring:
+            # frame size changed: parent must be done with all slots of old ring
+            self._wait_all_slots_free()
+            self.ring.close(unlink=True)
+        self.ring = FrameRing(frame.shape, frame.dtype.str, self.num_slots)
+        self.slot_idx = -1
+        self.msg_queue.put((MSG_RING, self.ring.spec))
+
+    def _wait_all_slots_free(self) -> None:
+        """Wait until parent has copied out every frame in ring buffer"""
+        for _ in range(self.num_slots):
+            self.free_slots.acquire()
+        for _ in range(self.num_slots):
+            self.free_slots.release()
+
+
+def _pipeline_process_main(
+    pipeline_str: str,
+    working_dir: str,
+    custom_nodes_parent_subdir: str,
+    ctrl_queue,
+    msg_queue,
+    free_slots,
+    num_slots: int,
+    prefetch: int,
+    log_level: int,
+) -> None:
+    """Child process entry point"""
+    set_log_level(log_level)  # parent's current level
+    runner = _ChildPipelineRunner(
+        ctrl_queue, msg_queue, free_slots, num_slots, prefetch
+    )
+    try:
+        runner.run(pipeline_str, working_dir, custom_nodes_parent_subdir)
+    finally:
+        shutdown_logging()
+
+
+class PipelineProcess:
+    """Parent process side: start/stop child pipeline process and collect its
+    frames. Mirrors the PipelineWorker interface used by OutputController.
+    """
+
+    def __init__(
+        self,
+        pipeline_str: str,
+        working_dir: str,
+        custom_nodes_parent_subdir: str,
+        frames: FrameStore,
+        num_slots: int = RING_SLOTS,
+        prefetch: int = PREFETCH_FRAMES,
+    ) -> None:
+        # spawn: never fork a process which has initialised Kivy/OpenGL
+        ctx = mp.get_context("spawn")
+        self.frames = frames
+        self.exporter: Optional[VideoExporter] = None  # set by UI to stream export
+        self.source_frame_count: int = 0
+        self.source_fps: float = 0.0
+        self.node_stats: List[Dict[str, Any]] = []  # latest stats from child
+        self.err_msg: str = ""
+        self.exc_msg: str = ""
+        self.error_record: Dict[str, str] = None
+        self._ring: FrameRing = None
+        self._finished: bool = False
+        self._ctrl_queue = ctx.Queue()
+        self._msg_queue = ctx.Queue()
+        self._free_slots = ctx.Semaphore(num_slots)
+        self._process = ctx.Process(
+            target=_pipeline_process_main,
+            args=(
+                pipeline_str,
+                working_dir,
+                custom_nodes_parent_subdir,
+                self._ctrl_queue,
+                self._msg_queue,
+                self._free_slots,
+                num_slots,
+                prefetch,
+                get_log_level(),
+            ),
+            name="pkds_pipeline_process",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self._process.start()
+
+    def stop(self) -> None:
+        """Ask child to stop pipeline after current iteration"""
+        self._ctrl_queue.put(CTRL_STOP)
+
+    def terminate(self, timeout: float = TERMINATE_TIMEOUT) -> None:
+        """Stop child gracefully, forcibly terminate it if it does not exit in time
+
+        Args:
+            timeout (float, optional): grace period in secs.
+                                       Defaults to TERMINATE_TIMEOUT.
+        """
+        if self._process.is_alive():
+            self.stop()
+            self._process.join(timeout)
+        if self._process.is_alive():
+            logger.warning("pipeline process not responding, terminating it")
+            self._process.terminate()
+            self._process.join()
+        self._cleanup(unlink=True)
+
+    def is_alive(self) -> bool:
+        """Return True until child has reported its final result"""
+        if not self._finished and not self._process.is_alive():
+            self._drain_messages()  # pick up any final messages
+            if not self._finished:
+                exitcode = self._process.exitcode
+                self._set_error(
+                    {
+                        "type": "ProcessError",
+                        "message": f"pipeline process exited with code {exitcode}",
+                        "traceback": "",
+                        "stderr": "",
+                    }
+                )
+        return not self._finished
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._process.join(timeout)
+        self._cleanup(unlink=False)
+
+    def get_newest_frame(self) -> Optional[Tuple[int, np.ndarray]]:
+        """Collect all frames published by child and return only the newest frame,
+        called by UI thread
+
+        Returns:
+            Optional[Tuple[int, np.ndarray]]: (frame index, frame) or None if empty
+        """
+        return self._drain_messages()
+
+    def get_node_stats(self) -> List[Dict[str, Any]]:
+        """Return latest node latency stats reported by child, called by UI thread"""
+        return self.node_stats
+
+    def _drain_messages(self) -> Optional[Tuple[int, np.ndarray]]:
+        """Process pending child messages
+
+        Returns:
+            Optional[Tuple[int, np.ndarray]]: newest (frame index, frame), if any
+        """
+        newest = None
+        while True:
+            try:
+                msg = self._msg_queue.get_nowait()
+            except queue.Empty:
+                return newest
+            kind = msg[0]
+            if kind == MSG_FRAME:
+                _, slot_idx, frame_idx = msg
+                frame = self._ring.slots[slot_idx].copy()  # keep for playback
+                self._free_slots.release()
+                self.frames.append(frame)
+                newest = (frame_idx, frame)
+                if self.exporter:
+                    self.exporter.submit(len(self.frames) - 1, frame)
+            elif kind == MSG_RING:
+                if self._ring:
+                    self._ring.close()
+                spec = msg[1]
+                self._ring = FrameRing(
+                    spec["shape"], spec["dtype"], spec["num_slots"], spec["name"]
+                )
+            elif kind == MSG_SOURCE:
+                _, self.source_frame_count, self.source_fps = msg
+            elif kind == MSG_STATS:
+                self.node_stats = msg[1]
+            elif kind == MSG_DONE:
+                self.err_msg = msg[1]
+                self._finished = True
+            elif kind == MSG_ERROR:
+                self._set_error(msg[1])
+
+    def _set_error(self, error_record: Dict[str, str]) -> None:
+        """Map child error record onto err_msg/exc_msg for the MsgBox error path
+
+        Args:
+            error_record (Dict[str, str]): the error record
+        """
+        logger.error(f"{error_record['type']}: {error_record['message']}")
+        self.error_record = error_record
+        self.err_msg = error_record["stderr"]
+        self.exc_msg = (
+            error_record["traceback"]
+            or f"{error_record['type']}: {error_record['message']}"
+        )
+        self._finished = True
+
+    def _cleanup(self, unlink: bool) -> None:
+        """Detach from ring buffer shared memory
+
+        Args:
+            unlink (bool): destroy shared memory (child may have died before doing so)
+        """
+        if self._ring:
+            self._ring.close(unlink=unlink)
+            self._ring = None
@@ -0,0 +1,678 @@
+#
+# PeekingDuck Studio Pipeline Runner
+#
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from io import StringIO
+import copy
+import logging
+import os
+import queue
+import threading
+import time
+import traceback
+import numpy as np
+import yaml
+from peekingduck.declarative_loader import DeclarativeLoader
+from peekingduck.pipeline.pipeline import Pipeline
+from peekingduck_studio.core_utils import LOGGER_ROOT, get_node_type, make_logger
+from peekingduck_studio.frame_store import FrameStore
+from peekingduck_studio.node_loader import InMemoryDeclarativeLoader
+from peekingduck_studio.node_pool import NodePool, PooledDeclarativeLoader
+from peekingduck_studio.node_stats import NOT_RUN, NodeLatencies
+from peekingduck_studio.output_cache import FrameRef, OutputCache, snapshot_outputs
+from peekingduck_studio.video_export import VideoExporter
+
+FRAME_QUEUE_SIZE = 4  # frames waiting to be displayed by UI
+PREFETCH_FRAMES = 4  # input.visual outputs decoded ahead, 0 = no prefetch
+PREFETCH_POLL_TIMEOUT = 0.1  # secs, prefetch thread checks for stop this often
+# debug mode for nodes with `all` input: give them full deep copies of pipeline data
+# and log any data they mutate (slow, same cost as PeekingDuck's own loop)
+ALL_INPUTS_DEBUG = False
+# PeekingDuck nodes with `all` input audited not to write to their inputs, they get
+# read-only views instead of deep copies (e.g. draw.legend draws on `img`: not here)
+READONLY_ALL_INPUT_NODES = {"dabble.statistics", "output.csv_writer"}
+IMMUTABLE_TYPES = (bool, int, float, complex, str, bytes, type(None))
+# node roles in execution plan
+ROLE_SOURCE = "source"  # input.visual
+ROLE_SINK = "sink"  # output.screen, intercepted by Studio
+ROLE_REGULAR = "regular"
+
+logger = make_logger(__name__)
+
+
+def parse_streams(strio: StringIO) -> str:
+    """Helper method to parse I/O streams.
+    Used to capture errors/exceptions from PeekingDuck.
+
+    Args:
+        strio (StringIO): the I/O stream to parse
+
+    Returns:
+        str: parsed stream
+    """
+    msg = strio.getvalue()
+    msg = os.linesep.join([s for s in msg.splitlines() if s])
+    return msg
+
+
+class ThreadLogCapture(logging.Handler):
+    """Log handler that captures warnings and errors logged on one thread (other
+    than Studio's own) into a buffer. Use it instead of redirect_stderr off the
+    UI thread, as redirect_stderr swaps the process-wide sys.stderr."""
+
+    def __init__(self, thread_ident: int, level: int = logging.WARNING) -> None:
+        """
+        Args:
+            thread_ident (int): ident of thread to capture log records of
+            level (int, optional): lowest level captured. Defaults to WARNING.
+        """
+        super().__init__(level)
+        self.thread_ident = thread_ident
+        self.buffer = StringIO()
+        self.setFormatter(logging.Formatter("%(name)s %(levelname)s: %(message)s"))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Accept only records of captured thread, Studio's go to its log anyway"""
+        return record.thread == self.thread_ident and not record.name.startswith(
+            LOGGER_ROOT
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.buffer.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+def make_node_loader(
+    pipeline_str: str,
+    working_dir: str,
+    custom_nodes_parent_subdir: str,
+    node_pool: Optional[NodePool] = None,
+) -> DeclarativeLoader:
+    """Make PeekingDuck's DeclarativeLoader for YAML pipeline, loaded in memory
+
+    Args:
+        pipeline_str (str): YAML representation of pipeline
+        working_dir (str): pipeline working directory
+        custom_nodes_parent_subdir (str): folder containing custom nodes
+        node_pool (Optional[NodePool], optional): reuse unchanged nodes of last
+                                                  load. Defaults to None.
+
+    Returns:
+        DeclarativeLoader: the node loader, a PooledDeclarativeLoader if node_pool
+                           is given
+    """
+    if working_dir != ".":
+        os.chdir(working_dir)  # custom nodes are found relative to it
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"pipeline_data={pipeline_str}")
+        logger.debug(f"working_dir={working_dir}, cwd={os.getcwd()}")
+        the_yaml = yaml.safe_load(pipeline_str)
+        logger.debug(the_yaml)
+        logger.debug("-----")
+        logger.debug(yaml.dump(the_yaml, default_flow_style=None))
+        logger.debug("-----")
+    if node_pool is None:
+        return InMemoryDeclarativeLoader(
+            pipeline_str, "None", custom_nodes_parent_subdir
+        )
+    return PooledDeclarativeLoader(
+        pipeline_str, "None", custom_nodes_parent_subdir, node_pool
+    )
+
+
+def load_pipeline(
+    pipeline_str: str,
+    working_dir: str,
+    custom_nodes_parent_subdir: str,
+    node_pool: Optional[NodePool] = None,
+) -> Tuple[DeclarativeLoader, Pipeline]:
+    """Convert YAML pipeline into internal Pipeline object using PeekingDuck's
+    DeclarativeLoader class.
+
+    Args:
+        pipeline_str (str): YAML representation of pipeline
+        working_dir (str): pipeline working directory
+        custom_nodes_parent_subdir (str): folder containing custom nodes
+        node_pool (Optional[NodePool], optional): reuse unchanged nodes of last
+                                                  load. Defaults to None.
+
+    Returns:
+        Tuple[DeclarativeLoader, Pipeline]: the node loader and its pipeline
+    """
+    node_loader = make_node_loader(
+        pipeline_str, working_dir, custom_nodes_parent_subdir, node_pool
+    )
+    pipeline: Pipeline = node_loader.get_pipeline()
+    logger.debug(f"pipeline: {pipeline}")
+    return node_loader, pipeline
+
+
+def release_source_nodes(pipeline: Pipeline) -> None:
+    """Release resources held by pipeline's input.visual nodes (they have threads)
+
+    Args:
+        pipeline (Pipeline): the pipeline to clean up
+    """
+    for node in pipeline.nodes:
+        if node.name.endswith("input.visual"):
+            node.release_resources()  # clean up nodes with threads
+
+
+def readonly_view(value: Any) -> Any:
+    """Return read-only view of numpy arrays (no copy), deep copy of mutable
+    containers (usually small, e.g. obj_attrs), and immutable values as is.
+
+    Args:
+        value (Any): pipeline data value
+
+    Returns:
+        Any: value that can be handed to a node without risk of it being mutated
+    """
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, IMMUTABLE_TYPES):
+        return value
+    return copy.deepcopy(value)
+
+
+def find_mutated_keys(data: Dict[str, Any], inputs: Dict[str, Any]) -> List[str]:
+    """Compare node inputs after node has run against the pipeline data they were
+    copied from, and return keys of data modified by the node.
+
+    Args:
+        data (Dict[str, Any]): pipeline data
+        inputs (Dict[str, Any]): deep copy of pipeline data given to node
+
+    Returns:
+        List[str]: keys of mutated data
+    """
+    mutated = []
+    for key, val in data.items():
+        if key not in inputs:
+            mutated.append(key)
+        elif isinstance(val, np.ndarray):
+            if not np.array_equal(val, inputs[key]):
+                mutated.append(key)
+        else:
+            try:
+                if bool(inputs[key] != val):
+                    mutated.append(key)
+            except ValueError:  # containers of arrays, e.g. list of arrays
+                pass
+    return mutated
+
+
+class AllInputsCopier:
+    """Copy-on-write replacement for deep copying pipeline data for nodes with
+    `all` input. Nodes known not to write to their inputs (READONLY_ALL_INPUT_NODES)
+    get read-only views of numpy arrays (e.g. full resolution `img`) instead of
+    copies. All other nodes, e.g. custom nodes, get deep copies as in PeekingDuck's
+    own loop: a node writing to a read-only view would abort the run, and it
+    cannot be rerun on a copy, as it may keep state (e.g. trackers, counters).
+    """
+
+    def __init__(
+        self,
+        debug: bool = ALL_INPUTS_DEBUG,
+        readonly_nodes: Set[str] = READONLY_ALL_INPUT_NODES,
+    ) -> None:
+        """
+        Args:
+            debug (bool, optional): deep copy for all nodes and log mutated data.
+                                    Defaults to ALL_INPUTS_DEBUG.
+            readonly_nodes (Set[str], optional): titles of nodes given read-only
+                views. Defaults to READONLY_ALL_INPUT_NODES.
+        """
+        self.debug = debug
+        self.readonly_nodes = readonly_nodes
+
+    def run_node(self, node, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run node with `all` input on copy-on-write view of pipeline data, or on
+        deep copy unless node is known not to write to it
+
+        Args:
+            node (AbstractNode): the PeekingDuck node to run
+            data (Dict[str, Any]): pipeline data
+
+        Returns:
+            Dict[str, Any]: node outputs
+        """
+        if self.debug:
+            inputs = copy.deepcopy(data)
+            outputs = node.run(inputs)
+            mutated = find_mutated_keys(data, inputs)
+            if mutated:
+                logger.warning(f"{node.name} mutates its 'all' inputs: {mutated}")
+            return outputs
+        if node.name in self.readonly_nodes:
+            return node.run({key: readonly_view(val) for key, val in data.items()})
+        return node.run(copy.deepcopy(data))
+
+
+class PrefetchingSource:
+    """Wrap input.visual node so that a background thread runs (i.e. decodes) the
+    next frames while the rest of the pipeline works on the current one. Other
+    node attributes are those of the wrapped node, and release_resources() stops
+    the thread before releasing the node.
+    """
+
+    def __init__(self, node, depth: int = PREFETCH_FRAMES) -> None:
+        """
+        Args:
+            node (AbstractNode): the input.visual node to wrap
+            depth (int, optional): max outputs decoded ahead.
+                                   Defaults to PREFETCH_FRAMES.
+        """
+        self.node = node
+        self.depth = depth
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_outputs: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes not found on wrapper, e.g. name, inputs
+        if name == "node":
+            raise AttributeError(name)  # not initialised yet, e.g. being copied
+        return getattr(self.node, name)
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return next prefetched outputs of wrapped node, starts prefetching on
+        first call
+
+        Args:
+            inputs (Dict[str, Any]): node inputs (none for input.visual)
+
+        Returns:
+            Dict[str, Any]: node outputs
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._prefetch,
+                args=(inputs,),
+                name="pkds_input_prefetch",
+                daemon=True,
+            )
+            self._thread.start()
+        if not self._thread.is_alive() and self._queue.empty():
+            return self._last_outputs  # source ended, nothing more to prefetch
+        outputs, exc = self._queue.get()
+        if exc is not None:
+            raise exc  # from prefetch thread, with its traceback
+        self._last_outputs = outputs
+        return outputs
+
+    def release_resources(self) -> None:
+        """Stop prefetch thread, then release wrapped node's resources"""
+        self._stop.set()
+        if self._thread is not None:
+            while self._thread.is_alive():
+                try:  # unblock thread if it waits for a free queue slot
+                    self._queue.get(timeout=PREFETCH_POLL_TIMEOUT)
+                except queue.Empty:
+                    pass
+            self._thread.join()
+        self.node.release_resources()
+
+    def _prefetch(self, inputs: Dict[str, Any]) -> None:
+        """Prefetch thread: run node until source ends or stop is requested"""
+        while not self._stop.is_set():
+            try:
+                item = (self.node.run(inputs), None)
+            except BaseException as e:
+                item = ({}, e)
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=PREFETCH_POLL_TIMEOUT)
+                    break
+                except queue.Full:
+                    pass
+            outputs, exc = item
+            if exc is not None or outputs.get("pipeline_end", False):
+                return
+
+
+class PlanStep:
+    """Per-node entry of an ExecutionPlan, everything resolved at compile time"""
+
+    __slots__ = (
+        "node",
+        "name",
+        "role",
+        "run",
+        "input_keys",
+        "takes_all",
+        "wants_end",
+        "draws_on_img",
+    )
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self.name: str = node.name
+        if self.name.endswith("output.screen"):
+            self.role = ROLE_SINK
+        elif self.name.endswith("input.visual"):
+            self.role = ROLE_SOURCE
+        else:
+            self.role = ROLE_REGULAR
+        self.run: Callable[[Dict[str, Any]], Dict[str, Any]] = node.run
+        # The nodes will not receive inputs with the optional
+        # key if it's not found upstream
+        optional_inputs = getattr(node, "optional_inputs", [])
+        input_keys = list(node.inputs)
+        input_keys.extend(key for key in optional_inputs if key not in input_keys)
+        self.input_keys: Tuple[str, ...] = tuple(input_keys)
+        self.takes_all: bool = "all" in node.inputs
+        self.wants_end: bool = "pipeline_end" in node.inputs
+        # e.g. draw nodes: modify `img` in place instead of outputting a new one
+        self.draws_on_img: bool = (
+            "img" in node.inputs
+            and "img" not in node.outputs
+            and get_node_type(self.name) != "model"
+        )
+
+
+class ExecutionPlan:
+    """Pipeline compiled once into a list of PlanSteps, so that the per-frame loop
+    does no name matching, attribute probing or input key resolution.
+    """
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        all_inputs_copier: Optional[AllInputsCopier] = None,
+        prefetch: int = PREFETCH_FRAMES,
+    ) -> None:
+        """
+        Args:
+            pipeline (Pipeline): the pipeline to run
+            all_inputs_copier (Optional[AllInputsCopier], optional): copier for nodes
+                with `all` input. Defaults to None (new AllInputsCopier).
+            prefetch (int, optional): input.visual outputs to prefetch, for sources
+                with known frame count (files) only, as prefetching a live source
+                would show stale frames. Defaults to PREFETCH_FRAMES.
+        """
+        self.pipeline = pipeline
+        self.all_inputs_copier = all_inputs_copier or AllInputsCopier()
+        if prefetch > 0:
+            self._wrap_file_sources(prefetch)
+        self.steps: List[PlanStep] = [PlanStep(node) for node in pipeline.nodes]
+        sources = [step.node for step in self.steps if step.role == ROLE_SOURCE]
+        self.source_node = sources[0] if sources else None
+        self.latencies = NodeLatencies([step.name for step in self.steps])
+        # incremental re-execution: record outputs of leading steps into cache, or
+        # replay them from cache and only run steps from resume_idx on
+        self.cache: Optional[OutputCache] = None
+        self.resume_idx: int = 0
+        self._replay_idx: int = 0  # next cached frame
+        self._img_from_frames: bool = False  # see record_outputs()
+
+    def cacheable_steps(self) -> int:
+        """Number of leading steps whose outputs can be cached and replayed: up to
+        the first step that draws on `img` in place, or the first output.screen
+
+        Returns:
+            int: number of cacheable steps
+        """
+        for idx, step in enumerate(self.steps):
+            if step.role == ROLE_SINK or step.draws_on_img:
+                return idx
+        return len(self.steps)
+
+    def record_outputs(self, cache: OutputCache) -> None:
+        """Record outputs of cache.num_nodes leading steps of every iteration.
+        If cached steps end at the only output.screen and nothing draws on `img`
+        after it, the cached `img` is the screen output: if cache.frames is set,
+        it is not copied but referred to in that frame store.
+
+        Args:
+            cache (OutputCache): empty cache to record into
+        """
+        self.cache = cache
+        self.resume_idx = 0
+        sinks = [idx for idx, step in enumerate(self.steps) if step.role == ROLE_SINK]
+        self._img_from_frames = (
+            len(sinks) == 1
+            and cache.num_nodes == sinks[0]
+            and not any(step.draws_on_img for step in self.steps[sinks[0] + 1 :])
+        )
+
+    def replay_outputs(self, cache: OutputCache, num_unchanged: int) -> int:
+        """Take outputs of leading steps from cache of earlier run instead of
+        running them
+
+        Args:
+            cache (OutputCache): complete cache of an earlier run
+            num_unchanged (int): leading steps unchanged since that run
+
+        Returns:
+            int: number of steps replayed from cache, 0 if cache is not used
+        """
+        resume_idx = min(num_unchanged, cache.num_nodes, self.cacheable_steps())
+        if resume_idx > 0:
+            self.cache = cache
+            self.resume_idx = resume_idx
+            self._replay_idx = 0
+        return resume_idx
+
+    def _wrap_file_sources(self, prefetch: int) -> None:
+        """Replace input.visual nodes with file sources by PrefetchingSources
+
+        Args:
+            prefetch (int): outputs to prefetch
+        """
+        nodes = self.pipeline.nodes
+        for idx, node in enumerate(nodes):
+            if (
+                node.name.endswith("input.visual")
+                and not isinstance(node, PrefetchingSource)
+                and getattr(node, "total_frame_count", 0) > 0
+            ):
+                logger.debug(f"prefetch {prefetch} frames of {node.name}")
+                nodes[idx] = PrefetchingSource(node, prefetch)
+
+    def get_source_frame_count(self) -> int:
+        """Return total number of frames of pipeline's input.visual source, if known
+
+        Returns:
+            int: total frame count, 0 if unknown (e.g. webcam) or no input.visual
+        """
+        if self.source_node is None:
+            return 0
+        return max(0, self.source_node.total_frame_count)
+
+    def get_source_fps(self) -> float:
+        """Return frame rate of pipeline's input.visual source, if known.
+        Only valid after first iteration, as it is read from pipeline data.
+
+        Returns:
+            float: frames per second, 0 if unknown or no input.visual
+        """
+        try:
+            return max(0.0, float(self.pipeline.data.get("saved_video_fps", 0)))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def get_node_stats(self) -> List[Dict[str, Any]]:
+        """Return latency stats of each node, see NodeLatencies.stats()"""
+        return self.latencies.stats()
+
+    def run_iteration(self, screen_output: Callable[[np.ndarray], None]) -> None:
+        """Execute one iteration of the pipeline, i.e. run every node once.
+        The output.screen node is not run, its image is passed to screen_output.
+        Every node run is timed into self.latencies. If there is an output cache,
+        outputs of leading nodes are either recorded or replayed from it.
+
+        Args:
+            screen_output (Callable[[np.ndarray], None]): screen output interceptor
+        """
+        pipeline = self.pipeline
+        data = pipeline.data
+        clock = time.perf_counter
+        iteration_start = clock()
+        steps = self.steps
+        snapshots: Optional[List[Dict[str, Any]]] = None  # outputs, if recording
+        img_frames: Optional[FrameStore] = None  # holds screen output `img`
+        if self.cache is None:
+            durations = []  # secs per step, then whole iteration
+        elif self.resume_idx:
+            durations = self._replay_cached_outputs()
+            steps = steps[self.resume_idx :]
+        else:
+            durations = []
+            snapshots = []
+            num_cached = self.cache.num_nodes
+            if self._img_from_frames:
+                img_frames = self.cache.frames
+            uncopied_imgs: List[Tuple[int, np.ndarray]] = []  # (snapshot, img)
+            screen_img: Optional[np.ndarray] = None
+        ended = data.get("pipeline_end", False)
+        for step in steps:
+            if ended:
+                pipeline.terminate = True
+                if not step.wants_end:
+                    durations.append(NOT_RUN)
+                    if snapshots is not None and len(snapshots) < num_cached:
+                        snapshots.append({})
+                    continue
+            start = clock()
+            if step.role == ROLE_SINK:
+                screen_output(data["img"])
+                if img_frames is not None:
+                    screen_img = data["img"]
+                    screen_idx = len(img_frames) - 1
+            else:
+                if step.takes_all:
+                    outputs = self.all_inputs_copier.run_node(step.node, data)
+                else:
+                    inputs = {k: data[k] for k in step.input_keys if k in data}
+                    outputs = step.run(inputs)
+                data.update(outputs)
+                if not ended:
+                    ended = data.get("pipeline_end", False)
+            durations.append(clock() - start)
+            if snapshots is not None and len(snapshots) < num_cached:
+                # copy before `img` is drawn on, unless frame store will hold it
+                if img_frames is not None and "img" in outputs:
+                    uncopied_imgs.append((len(snapshots), outputs["img"]))
+                    snapshots.append(snapshot_outputs(outputs, skip="img"))
+                else:
+                    snapshots.append(snapshot_outputs(outputs))
+        if snapshots is not None:
+            for idx, img in uncopied_imgs:
+                # not drawn on: no drawing step up to and after output.screen
+                snapshots[idx]["img"] = (
+                    FrameRef(screen_idx) if img is screen_img else img.copy()
+                )
+            self.cache.record(snapshots)
+            if ended:
+                self.cache.finish()
+        durations.append(clock() - iteration_start)
+        self.latencies.record(durations)
+
+    def _replay_cached_outputs(self) -> List[float]:
+        """Put cached outputs of leading steps for next frame into pipeline data
+
+        Returns:
+            List[float]: durations of replayed steps (NOT_RUN)
+        """
+        data = self.pipeline.data
+        if self._replay_idx < len(self.cache):
+            for outputs in self.cache.load(self._replay_idx, self.resume_idx):
+                data.update(outputs)
+        else:
+            data["pipeline_end"] = True  # cache always ends with it, just in case
+        self._replay_idx += 1
+        return [NOT_RUN] * self.resume_idx
+
+
+class PipelineWorker(threading.Thread):
+    """Background thread to drive the pipeline loop until it terminates.
+    Every screen output frame is saved into the given frames list, and its index
+    is handed to the UI via a bounded queue. If the UI falls behind, the oldest
+    queued index is dropped so the pipeline never waits for the UI.
+    """
+
+    def __init__(
+        self,
+        plan: ExecutionPlan,
+        frames: FrameStore,
+        queue_size: int = FRAME_QUEUE_SIZE,
+    ) -> None:
+        super().__init__(name="pkds_pipeline_worker", daemon=True)
+        self.plan = plan
+        self.pipeline = plan.pipeline
+        self.frames = frames
+        self.frame_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.exporter: Optional[VideoExporter] = None  # set by UI to stream export
+        self.source_frame_count: int = 0
+        self.source_fps: float = 0.0
+        self.err_msg: str = ""
+        self.exc_msg: str = ""
+
+    def run(self) -> None:
+        """Thread main loop: run pipeline iterations until pipeline terminates"""
+        capture = ThreadLogCapture(threading.get_ident())
+        root_logger = logging.getLogger()
+        root_logger.addHandler(capture)
+        try:
+            if not self.pipeline.terminate:
+                self.plan.run_iteration(self._screen_output)
+                self.source_frame_count = self.plan.get_source_frame_count()
+                self.source_fps = self.plan.get_source_fps()
+            while not self.pipeline.terminate:
+                self.plan.run_iteration(self._screen_output)
+        except BaseException:
+            logger.exception("PeekingDuck Error!")
+            self.exc_msg = traceback.format_exc()
+        finally:
+            root_logger.removeHandler(capture)
+        self.err_msg = parse_streams(capture.buffer)
+
+    def stop(self) -> None:
+        """Signal pipeline to stop after current iteration"""
+        self.pipeline.terminate = True
+
+    def get_node_stats(self) -> List[Dict[str, Any]]:
+        """Return latency stats of each node, called by UI thread"""
+        return self.plan.get_node_stats()
+
+    def get_newest_frame(self) -> Optional[Tuple[int, np.ndarray]]:
+        """Drain frame queue and return only the newest frame, called by UI thread
+
+        Returns:
+            Optional[Tuple[int, np.ndarray]]: (frame index, frame) or None if empty
+        """
+        newest = None
+        while True:
+            try:
+                newest = self.frame_queue.get_nowait()
+            except queue.Empty:
+                return newest
+
+    def _screen_output(self, img: np.ndarray) -> None:
+        """Save screen output frame and queue it for display
+
+        Args:
+            img (np.ndarray): output.screen image
+        """
+        self.frames.append(img)  # save frame for playback, in opencv orientation
+        item = (len(self.frames) - 1, img)
+        exporter = self.exporter
+        if exporter:
+            exporter.submit(*item)
+        while True:
+            try:
+                self.frame_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.frame_queue.get_nowait()  # drop oldest, UI is behind
+                except queue.Empty:
+                    pass
@@ -0,0 +1,288 @@
+#
+# PeekingDuck Studio Run Sessions
+#
+# Technote: a session archive (*.pkds) saves a finished run so that it can be
+# replayed later without re-running the pipeline. It is a single file:
+#
+#   SESSION_MAGIC | section | section | ... | index (JSON) | trailer
+#
+# Sections are raw arrays, each aligned to SECTION_ALIGN bytes so they can be
+# memory-mapped in place:
+#   timestamps  float64 (n,)           frame capture times, secs since first frame
+#   frames      uint8 (n, h, w, c)     raw frames, or if frames are compressed:
+#   encoded     uint8 (total bytes,)   JPEG/PNG encoded frames back to back
+#   offsets     int64 (n + 1,)         byte offset of each encoded frame
+# The index holds the pipeline YAML, source metadata and the section layout.
+# The trailer (index offset, index length, SESSION_MAGIC) is written last, so a
+# partially written file is never mistaken for a session. Opening a session only
+# reads the index and maps the sections: frames are paged in or decoded on demand.
+#
+
+from typing import Any, Dict, Tuple, Union
+from datetime import datetime
+import json
+import os
+import struct
+import threading
+import traceback
+import cv2
+import numpy as np
+from peekingduck_studio.core_utils import make_logger
+from peekingduck_studio.frame_store import (
+    FRAME_STORE_PNG,
+    FRAME_STORE_RAW,
+    PNG_COMPRESSION,
+    CompressedFrameStore,
+    FrameStore,
+)
+
+SESSION_SUFFIX = ".pkds"
+SESSION_VERSION = 1
+SESSION_MAGIC = b"PKDSSESS"
+SECTION_ALIGN = 64  # bytes
+TRAILER_FORMAT = "<QQ8s"  # index offset, index length, magic
+TRAILER_SIZE = struct.calcsize(TRAILER_FORMAT)
+
+logger = make_logger(__name__)
+
+
+def _frames_are_uniform(frames: FrameStore) -> bool:
+    """Check if all raw frames have the same shape and type (i.e. fit one array)"""
+    first = frames[0]
+    for idx in range(1, len(frames)):
+        frame = frames[idx]
+        if frame.shape != first.shape or frame.dtype != first.dtype:
+            return False
+    return True
+
+
+class SessionSaver(threading.Thread):
+    """Background thread to save frames of a finished run into a session archive"""
+
+    def __init__(
+        self,
+        path: str,
+        frames: Union[FrameStore, CompressedFrameStore],
+        pipeline_str: str,
+        metadata: Dict[str, Any],
+    ) -> None:
+        """
+        Args:
+            path (str): session archive path
+            frames (Union[FrameStore, CompressedFrameStore]): frames to save
+            pipeline_str (str): YAML representation of pipeline which made frames
+            metadata (Dict[str, Any]): source metadata, e.g. pipeline path, fps
+        """
+        super().__init__(name="pkds_session_saver", daemon=True)
+        self.path = str(path)
+        self.frames = frames
+        self.pipeline_str = pipeline_str
+        self.metadata = metadata
+        self.num_frames: int = len(frames)
+        self.num_written: int = 0
+        self.error: str = ""
+        self._cancelled = threading.Event()
+        self._sections: Dict[str, Dict[str, Any]] = {}
+
+    def cancel(self) -> None:
+        """Stop saving as soon as possible, no session archive is made"""
+        self._cancelled.set()
+
+    def run(self) -> None:
+        """Thread main: write session into temp file, rename it when complete"""
+        part_path = f"{self.path}.part"
+        try:
+            with open(part_path, "wb") as file:
+                file.write(SESSION_MAGIC)
+                frame_format = self._write_frames(file)
+                if self._cancelled.is_set():
+                    raise InterruptedError("session save cancelled")
+                self._write_section(file, "timestamps", self.frames.timestamps)
+                index = {
+                    "version": SESSION_VERSION,
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "pipeline": self.pipeline_str,
+                    "num_frames": self.num_frames,
+                    "frame_format": frame_format,
+                    "sections": self._sections,
+                    **self.metadata,
+                }
+                index_bytes = json.dumps(index).encode("utf-8")
+                index_offset = file.tell()
+                file.write(index_bytes)
+                file.write(
+                    struct.pack(
+                        TRAILER_FORMAT, index_offset, len(index_bytes), SESSION_MAGIC
+                    )
+                )
+            os.replace(part_path, self.path)
+            logger.debug(f"saved {self.num_written} frames to {self.path}")
+        except BaseException as e:
+            if not isinstance(e, InterruptedError):
+                logger.exception("Session save error!")
+                self.error = traceback.format_exc()
+            if os.path.isfile(part_path):
+                os.remove(part_path)
+
+    def _write_frames(self, file) -> str:
+        """Write frames section(s), raw if possible, else encoded
+
+        Args:
+            file (BinaryIO): session archive being written
+
+        Returns:
+            str: frame format, FRAME_STORE_RAW or compressed frame store mode
+        """
+        frames = self.frames
+        if isinstance(frames, CompressedFrameStore):
+            self._write_encoded(file, frames.get_encoded)
+            return frames.mode
+        if _frames_are_uniform(frames):
+            first = frames[0]
+            self._begin_section(
+                file, "frames", first.dtype, (self.num_frames, *first.shape)
+            )
+            for idx in range(self.num_frames):
+                if self._cancelled.is_set():
+                    break
+                file.write(np.ascontiguousarray(frames[idx]).data)
+                self.num_written += 1
+            return FRAME_STORE_RAW
+
+        # frame size changed mid-run: keep every frame as is, losslessly encoded
+        def encode_png(idx: int) -> np.ndarray:
+            params = [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]
+            ok, buffer = cv2.imencode(".png", frames[idx], params)
+            if not ok:
+                raise ValueError(f"cannot encode frame {idx}")
+            return buffer
+
+        self._write_encoded(file, encode_png)
+        return FRAME_STORE_PNG
+
+    def _write_encoded(self, file, get_encoded) -> None:
+        """Write encoded frames and their offsets
+
+        Args:
+            file (BinaryIO): session archive being written
+            get_encoded (Callable[[int], np.ndarray]): returns encoded frame by index
+        """
+        offsets = np.zeros(self.num_frames + 1, dtype=np.int64)
+        start = self._begin_section(file, "encoded", np.uint8, None)
+        for idx in range(self.num_frames):
+            if self._cancelled.is_set():
+                return
+            file.write(get_encoded(idx).data)
+            offsets[idx + 1] = file.tell() - start
+            self.num_written += 1
+        self._sections["encoded"]["shape"] = [int(offsets[-1])]
+        self._write_section(file, "offsets", offsets)
+
+    def _write_section(self, file, name: str, array: np.ndarray) -> None:
+        """Write whole array as a section
+
+        Args:
+            file (BinaryIO): session archive being written
+            name (str): section name
+            array (np.ndarray): section data
+        """
+        array = np.ascontiguousarray(array)
+        self._begin_section(file, name, array.dtype, array.shape)
+        file.write(array.data)
+
+    def _begin_section(self, file, name: str, dtype, shape) -> int:
+        """Pad file to section alignment and record section layout in index
+
+        Args:
+            file (BinaryIO): session archive being written
+            name (str): section name
+            dtype (np.dtype): section data type
+            shape (Tuple[int, ...]): section array shape, None if not known yet
+
+        Returns:
+            int: section offset
+        """
+        offset = file.tell()
+        padding = -offset % SECTION_ALIGN
+        file.write(b"\0" * padding)
+        offset += padding
+        self._sections[name] = {
+            "offset": offset,
+            "dtype": np.dtype(dtype).str,
+            "shape": list(shape) if shape is not None else None,
+        }
+        return offset
+
+
+def _map_section(path: str, section: Dict[str, Any]) -> np.ndarray:
+    """Memory-map session section as copy-on-write array: the file is never
+    written, but Kivy's Texture.blit_buffer needs writable buffers"""
+    return np.memmap(
+        path,
+        dtype=np.dtype(section["dtype"]),
+        mode="c",
+        offset=section["offset"],
+        shape=tuple(section["shape"]),
+    )
+
+
+def read_session_index(path: str) -> Dict[str, Any]:
+    """Read index of session archive
+
+    Args:
+        path (str): session archive path
+
+    Raises:
+        ValueError: not a (complete) session archive, or unsupported version
+
+    Returns:
+        Dict[str, Any]: session index
+    """
+    with open(path, "rb") as file:
+        magic = file.read(len(SESSION_MAGIC))
+        file.seek(0, os.SEEK_END)
+        if magic != SESSION_MAGIC or file.tell() < len(magic) + TRAILER_SIZE:
+            raise ValueError(f"{path} is not a session file")
+        file.seek(-TRAILER_SIZE, os.SEEK_END)
+        index_offset, index_len, magic = struct.unpack(
+            TRAILER_FORMAT, file.read(TRAILER_SIZE)
+        )
+        if magic != SESSION_MAGIC:
+            raise ValueError(f"{path} is an incomplete session file")
+        file.seek(index_offset)
+        index = json.loads(file.read(index_len).decode("utf-8"))
+    if index["version"] > SESSION_VERSION:
+        raise ValueError(f"{path}: unsupported session version {index['version']}")
+    return index
+
+
+def open_session(
+    path: str,
+) -> Tuple[Union[FrameStore, CompressedFrameStore], Dict[str, Any]]:
+    """Open session archive for playback, frames are mapped, not read
+
+    Args:
+        path (str): session archive path
+
+    Returns:
+        Tuple[Union[FrameStore, CompressedFrameStore], Dict[str, Any]]:
+            read-only frame store and session index
+    """
+    index = read_session_index(path)
+    sections = index["sections"]
+    timestamps = _map_section(path, sections["timestamps"])
+    if index["frame_format"] == FRAME_STORE_RAW:
+        frames_array = _map_section(path, sections["frames"])
+        frames = FrameStore.from_array(frames_array, timestamps)
+    else:
+        encoded = _map_section(path, sections["encoded"])
+        offsets = _map_section(path, sections["offsets"])
+        buffers = [
+            encoded[offsets[idx] : offsets[idx + 1]]
+            for idx in range(index["num_frames"])
+        ]
+        frames = CompressedFrameStore.from_encoded(
+            index["frame_format"], buffers, timestamps
+        )
+    logger.debug(f"opened {path}: {len(frames)} {index['frame_format']} frames")
+    return frames, index
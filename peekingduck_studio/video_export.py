@@ -0,0 +1,219 @@
+#
+# PeekingDuck Studio Video Export
+#
+# Technote: frames are streamed to a background writer thread via a bounded
+# queue. Producers (pipeline loop) never block: if the queue is full, the frame
+# is not queued but counted as an overflow, and the writer reads it back from the
+# frame store when it gets there. So every frame is exported, in order, and
+# overflows/backlog show how far the encoder is behind the pipeline.
+# Exporting an existing recording is the same thing with nothing queued.
+#
+
+from typing import Optional, Tuple, Union
+from pathlib import Path
+import queue
+import threading
+import traceback
+import cv2
+import numpy as np
+from peekingduck_studio.core_utils import make_logger
+from peekingduck_studio.frame_store import CompressedFrameStore, FrameStore
+
+EXPORT_QUEUE_SIZE = 32  # frames waiting to be encoded
+EXPORT_POLL_TIMEOUT = 0.1  # secs, writer waits this long for a queued frame
+DEFAULT_EXPORT_FPS = 30.0
+# video codec (fourcc) by file extension
+EXPORT_CODECS = {".mp4": "mp4v", ".avi": "MJPG", ".mkv": "XVID"}
+EXPORT_FILE_FILTERS = [f"*{ext}" for ext in EXPORT_CODECS]
+EXPORT_CODEC_AUTO = "auto"  # export option: codec by file extension
+# export dialog codec choices
+EXPORT_CODEC_CHOICES = [EXPORT_CODEC_AUTO] + sorted(set(EXPORT_CODECS.values()))
+
+logger = make_logger(__name__)
+
+
+def codec_for_path(path: str) -> str:
+    """Choose video codec from file extension
+
+    Args:
+        path (str): video file path
+
+    Returns:
+        str: fourcc codec, defaults to mp4v
+    """
+    return EXPORT_CODECS.get(Path(path).suffix.lower(), EXPORT_CODECS[".mp4"])
+
+
+def parse_export_options(
+    codec: str, fps: str, size: str
+) -> Tuple[str, float, Optional[Tuple[int, int]]]:
+    """Parse video export options as entered in export dialog
+
+    Args:
+        codec (str): fourcc codec, or EXPORT_CODEC_AUTO for by file extension
+        fps (str): frame rate, blank for source frame rate
+        size (str): video size as WIDTHxHEIGHT, blank for frame size
+
+    Raises:
+        ValueError: invalid frame rate or size
+
+    Returns:
+        Tuple[str, float, Optional[Tuple[int, int]]]: export codec ("" if auto),
+            fps (0 if source fps) and size (None if frame size)
+    """
+    codec = "" if codec == EXPORT_CODEC_AUTO else codec.strip()
+    fps = fps.strip()
+    try:
+        export_fps = float(fps) if fps else 0.0
+    except ValueError:
+        export_fps = float("nan")
+    if fps and not 0 < export_fps < float("inf"):
+        raise ValueError(f"Invalid frame rate '{fps}', expect a positive number.")
+    size = size.strip().lower()
+    export_size = None
+    if size:
+        tokens = size.split("x")
+        if len(tokens) != 2 or not all(token.strip().isdigit() for token in tokens):
+            raise ValueError(f"Invalid size '{size}', expect WIDTHxHEIGHT.")
+        export_size = (int(tokens[0]), int(tokens[1]))
+        if min(export_size) <= 0:
+            raise ValueError(f"Invalid size '{size}', expect WIDTHxHEIGHT.")
+    return codec, export_fps, export_size
+
+
+class VideoExporter(threading.Thread):
+    """Background thread to encode frames into a video file using cv2.VideoWriter.
+    Frames are submitted while the pipeline runs and/or read from the frame store,
+    and are written in frame index order until finish() or cancel().
+    """
+
+    def __init__(
+        self,
+        frames: Union[FrameStore, CompressedFrameStore],
+        path: str,
+        fps: float = DEFAULT_EXPORT_FPS,
+        codec: str = "",
+        size: Optional[Tuple[int, int]] = None,
+        queue_size: int = EXPORT_QUEUE_SIZE,
+    ) -> None:
+        """
+        Args:
+            frames (Union[FrameStore, CompressedFrameStore]): frames to export
+            path (str): video file path
+            fps (float, optional): video frame rate. Defaults to DEFAULT_EXPORT_FPS.
+            codec (str, optional): fourcc codec. Defaults to "" (by file extension).
+            size (Optional[Tuple[int, int]], optional): video (width, height).
+                                                  Defaults to None (frame size).
+            queue_size (int, optional): max frames queued for encoding.
+                                        Defaults to EXPORT_QUEUE_SIZE.
+        """
+        super().__init__(name="pkds_video_exporter", daemon=True)
+        self.frames = frames
+        self.path = str(path)
+        self.fps = fps if fps > 0 else DEFAULT_EXPORT_FPS
+        self.codec = codec or codec_for_path(self.path)
+        self.size = size
+        self.frame_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.num_written: int = 0
+        self.num_overflows: int = 0  # frames which found queue full
+        self.error: str = ""
+        self._num_available: int = len(frames)  # frames in store so far
+        self._end_idx: Optional[int] = None  # set by finish()
+        self._cancelled = threading.Event()
+        self._writer: cv2.VideoWriter = None
+
+    @property
+    def backlog(self) -> int:
+        """Number of frames available but not yet encoded"""
+        return max(0, self._num_available - self.num_written)
+
+    @property
+    def queue_fill(self) -> float:
+        """Fraction of encoding queue in use, 1.0 means producers overflow"""
+        return self.frame_queue.qsize() / self.frame_queue.maxsize
+
+    @property
+    def num_frames(self) -> int:
+        """Total number of frames to export, so far"""
+        return self._num_available if self._end_idx is None else self._end_idx
+
+    def submit(self, idx: int, frame: np.ndarray) -> bool:
+        """Queue newly stored frame for encoding, never blocks
+
+        Args:
+            idx (int): frame index in frame store
+            frame (np.ndarray): the frame
+
+        Returns:
+            bool: False if queue is full, frame will be read from store later
+        """
+        self._num_available = max(self._num_available, idx + 1)
+        try:
+            self.frame_queue.put_nowait((idx, frame))
+            return True
+        except queue.Full:
+            self.num_overflows += 1
+            return False
+
+    def finish(self, num_frames: int) -> None:
+        """Export ends after given number of frames (i.e. no more frames coming)
+
+        Args:
+            num_frames (int): total number of frames to export
+        """
+        self._num_available = max(self._num_available, num_frames)
+        self._end_idx = num_frames
+
+    def cancel(self) -> None:
+        """Stop export as soon as possible, video file will be incomplete"""
+        self._cancelled.set()
+
+    def run(self) -> None:
+        """Thread main loop: write frames in order until finished or cancelled"""
+        try:
+            while not self._cancelled.is_set():
+                end_idx = self._end_idx
+                if end_idx is not None and self.num_written >= end_idx:
+                    break
+                try:
+                    idx, frame = self.frame_queue.get(timeout=EXPORT_POLL_TIMEOUT)
+                except queue.Empty:
+                    # nothing queued: catch up on overflowed/recorded frames
+                    while (
+                        self.num_written < self._num_available
+                        and self.frame_queue.empty()
+                        and not self._cancelled.is_set()
+                    ):
+                        self._write(self.frames[self.num_written])
+                    continue
+                if idx < self.num_written:
+                    continue  # already read back from frame store
+                while self.num_written < idx and not self._cancelled.is_set():
+                    self._write(self.frames[self.num_written])
+                if self.num_written == idx:
+                    self._write(frame)
+        except BaseException:
+            logger.exception("Video export error!")
+            self.error = traceback.format_exc()
+        finally:
+            if self._writer is not None:
+                self._writer.release()
+        logger.debug(f"exported {self.num_written} frames to {self.path}")
+
+    def _write(self, frame: np.ndarray) -> None:
+        """Encode one frame, opening video file on first frame
+
+        Args:
+            frame (np.ndarray): frame in OpenCV (BGR, top-left origin) format
+        """
+        if self._writer is None:
+            if self.size is None:
+                self.size = (frame.shape[1], frame.shape[0])
+            fourcc = cv2.VideoWriter_fourcc(*self.codec)
+            self._writer = cv2.VideoWriter(self.path, fourcc, self.fps, self.size)
+            if not self._writer.isOpened():
+                raise IOError(f"cannot open {self.path} with codec {self.codec}")
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        self._writer.write(frame)
+        self.num_written += 1
@@ -0,0 +1,13 @@
+#
+# Tests: shared fixtures
+#
+
+import pytest
+from peekingduck_studio.core_utils import shutdown_logging
+
+
+@pytest.fixture(scope="session", autouse=True)
+def flush_logging():
+    """Write out queued log records while pytest still captures output"""
+    yield
+    shutdown_logging()
@@ -0,0 +1,115 @@
+#
+# Tests: copy-on-write pipeline data for nodes with `all` input
+#
+
+from typing import Any, Dict
+import numpy as np
+import pytest
+from benchmarks.stub_nodes import StubNode, make_stub_pipeline
+from peekingduck_studio.pipeline_runner import (
+    AllInputsCopier,
+    ExecutionPlan,
+    find_mutated_keys,
+    readonly_view,
+)
+
+NUM_FRAMES = 8
+WRITE_FROM_FRAME = 3  # custom node starts drawing on its inputs here
+
+
+class StubAllWriter(StubNode):
+    """Custom node with `all` input that draws on `img` from a later frame on,
+    like a custom node calling cv2.rectangle() on its inputs"""
+
+    def __init__(self, name: str = "custom_nodes.dabble.all_writer") -> None:
+        super().__init__(name, ["all"], ["num_keys"])
+        self.num_runs = 0
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.num_runs += 1
+        if self.num_runs >= WRITE_FROM_FRAME:
+            inputs["img"][:8, :8] = 0
+            inputs["bboxes"][0, 0] = -1.0
+        return {"num_keys": len(inputs)}
+
+
+class StubAllReader(StubNode):
+    """Node with `all` input that only reads its inputs"""
+
+    def __init__(self, name: str = "dabble.statistics") -> None:
+        super().__init__(name, ["all"], ["img_sum"])
+        self.inputs_writable = []
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.inputs_writable.append(inputs["img"].flags.writeable)
+        return {"img_sum": int(inputs["img"].sum())}
+
+
+def run_to_end(plan: ExecutionPlan) -> int:
+    """Run plan until pipeline terminates, return number of screen outputs"""
+    frames = []
+    while not plan.pipeline.terminate:
+        plan.run_iteration(frames.append)
+    return len(frames)
+
+
+def test_node_writing_inputs_later_does_not_abort_run():
+    pipeline = make_stub_pipeline(NUM_FRAMES, resolution=(32, 24), num_draws=0)
+    writer = StubAllWriter()
+    pipeline.nodes.insert(-1, writer)
+    source_frames = [frame.copy() for frame in pipeline.nodes[0]._frames]
+    plan = ExecutionPlan(pipeline, prefetch=0)
+
+    assert run_to_end(plan) == NUM_FRAMES
+    assert writer.num_runs == NUM_FRAMES
+    # writes went to copies, not to pipeline data or the frames it refers to
+    for frame, source_frame in zip(pipeline.nodes[0]._frames, source_frames):
+        assert np.array_equal(frame, source_frame)
+    assert pipeline.data["bboxes"][0, 0] == pytest.approx(0.1)
+
+
+def test_readonly_node_gets_views():
+    pipeline = make_stub_pipeline(NUM_FRAMES, resolution=(32, 24), num_draws=0)
+    reader = StubAllReader()
+    pipeline.nodes.insert(-1, reader)
+    plan = ExecutionPlan(pipeline, prefetch=0)
+
+    assert run_to_end(plan) == NUM_FRAMES
+    assert reader.inputs_writable == [False] * NUM_FRAMES
+    assert pipeline.data["img"].flags.writeable  # views do not affect data
+
+
+def test_readonly_node_list_is_configurable():
+    data = {"img": np.zeros((4, 4, 3), dtype=np.uint8), "count": 1}
+    reader = StubAllReader("custom_nodes.dabble.reader")
+    AllInputsCopier().run_node(reader, data)
+    AllInputsCopier(readonly_nodes={reader.name}).run_node(reader, data)
+    assert reader.inputs_writable == [True, False]
+
+
+def test_debug_mode_runs_on_deep_copy():
+    data = {"img": np.ones((16, 16, 3), dtype=np.uint8), "bboxes": np.ones((1, 4))}
+    writer = StubAllWriter()
+    writer.num_runs = WRITE_FROM_FRAME  # writes on this run
+    AllInputsCopier(debug=True).run_node(writer, data)
+    assert data["img"].min() == 1
+    assert data["bboxes"][0, 0] == 1.0
+
+
+def test_readonly_view():
+    img = np.zeros((4, 4), dtype=np.uint8)
+    view = readonly_view(img)
+    assert np.shares_memory(view, img)
+    with pytest.raises(ValueError):
+        view[0, 0] = 1
+    obj_attrs = {"ids": [1, 2]}
+    assert readonly_view(obj_attrs) == obj_attrs
+    assert readonly_view(obj_attrs) is not obj_attrs
+    assert readonly_view("text") == "text"
+
+
+def test_find_mutated_keys():
+    data = {"img": np.zeros((2, 2)), "count": 1, "labels": ["a"]}
+    inputs = {"img": np.ones((2, 2)), "count": 1, "labels": ["b"]}
+    assert find_mutated_keys(data, inputs) == ["img", "labels"]
+    assert find_mutated_keys(data, dict(data)) == []
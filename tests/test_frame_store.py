@@ -0,0 +1,141 @@
+#
+# Tests: memory-bounded and compressed frame stores
+#
+
+from pathlib import Path
+import numpy as np
+import pytest
+from peekingduck_studio.frame_store import (
+    FRAME_STORE_JPEG,
+    FRAME_STORE_PNG,
+    FRAME_STORE_RAW,
+    SPILL_MIN_CAPACITY,
+    CompressedFrameStore,
+    FrameStore,
+    make_frame_store,
+)
+
+FRAME_SHAPE = (24, 32, 3)
+FRAME_BYTES = int(np.prod(FRAME_SHAPE))
+
+
+def make_frames(num_frames: int, shape=FRAME_SHAPE):
+    rng = np.random.default_rng(seed=7)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(num_frames)]
+
+
+def test_frames_within_budget_stay_in_ram():
+    store = FrameStore(ram_budget=10 * FRAME_BYTES)
+    frames = make_frames(5)
+    for frame in frames:
+        store.append(frame)
+    assert len(store) == 5
+    assert store.num_spilled == 0
+    assert store.spill_path is None
+    assert store[2] is frames[2]
+    assert store[-1] is frames[-1]
+    store.close()
+
+
+def test_spill_round_trip():
+    store = FrameStore(ram_budget=3 * FRAME_BYTES)
+    frames = make_frames(SPILL_MIN_CAPACITY + 20)  # grows the spill file
+    for frame in frames:
+        store.append(frame)
+    assert len(store) == len(frames)
+    assert store.num_spilled == len(frames) - 3
+    assert store.ram_bytes <= store.ram_budget
+    assert Path(store.spill_path).is_file()
+    for idx, frame in enumerate(frames):
+        assert np.array_equal(store[idx], frame)
+    spill_path = store.spill_path
+    store.close()
+    assert len(store) == 0
+    assert not Path(spill_path).exists()
+
+
+def test_spill_frame_size_change():
+    store = FrameStore(ram_budget=FRAME_BYTES)
+    frames = make_frames(3) + make_frames(2, shape=(48, 64, 3)) + make_frames(2)
+    for frame in frames:
+        store.append(frame)
+    assert store.num_spilled == len(frames) - 1
+    for idx, frame in enumerate(frames):
+        assert np.array_equal(store[idx], frame)
+    store.close()
+
+
+def test_index_out_of_range():
+    store = FrameStore()
+    store.append(make_frames(1)[0])
+    with pytest.raises(IndexError):
+        store[1]
+    with pytest.raises(IndexError):
+        store[-2]
+    store.close()
+
+
+def test_from_array():
+    frames = np.stack(make_frames(4))
+    store = FrameStore.from_array(frames, timestamps=np.arange(4) + 10.0)
+    assert len(store) == 4
+    assert np.array_equal(store[3], frames[3])
+    assert list(store.timestamps) == [0.0, 1.0, 2.0, 3.0]
+
+
+def wait_encoded(store: CompressedFrameStore) -> None:
+    """Wait for background encoder to compress every appended frame"""
+    store._encoder.submit(lambda: None).result()  # single encoder thread, FIFO
+    assert not store._pending
+
+
+def test_compressed_png_round_trip_is_lossless():
+    store = CompressedFrameStore(FRAME_STORE_PNG, cache_size=4)
+    frames = make_frames(10)
+    for frame in frames:
+        store.append(frame)
+    wait_encoded(store)
+    for idx, frame in enumerate(frames):
+        assert np.array_equal(store[idx], frame)
+    assert len(store._cache) == 4  # LRU decode cache is bounded
+    assert np.array_equal(store[-1], frames[-1])
+    store.close()
+
+
+def test_compressed_jpeg_round_trip_is_close():
+    store = CompressedFrameStore(FRAME_STORE_JPEG)
+    # smooth frames, as noise does not survive JPEG
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    frame[:, :, 0] = np.linspace(0, 255, FRAME_SHAPE[1], dtype=np.uint8)
+    frame[:, :, 1] = 128
+    store.append(frame)
+    wait_encoded(store)
+    decoded = store[0]
+    assert decoded.shape == frame.shape
+    assert np.abs(decoded.astype(int) - frame.astype(int)).mean() < 4
+    store.close()
+
+
+def test_compressed_prefetch_and_from_encoded():
+    store = CompressedFrameStore(FRAME_STORE_PNG, cache_size=8)
+    frames = make_frames(6)
+    for frame in frames:
+        store.append(frame)
+    wait_encoded(store)
+    store.prefetch(0, 4)
+    store._decoder.submit(lambda: None).result()
+    assert set(store._cache) == {0, 1, 2, 3}
+    buffers = [store.get_encoded(idx) for idx in range(len(store))]
+    copy = CompressedFrameStore.from_encoded(FRAME_STORE_PNG, buffers)
+    assert len(copy) == len(frames)
+    assert np.array_equal(copy[5], frames[5])
+    store.close()
+    copy.close()
+
+
+def test_make_frame_store():
+    assert isinstance(make_frame_store(FRAME_STORE_RAW), FrameStore)
+    store = make_frame_store(FRAME_STORE_JPEG)
+    assert isinstance(store, CompressedFrameStore)
+    assert store.mode == FRAME_STORE_JPEG
+    store.close()
@@ -0,0 +1,91 @@
+#
+# Tests: node pool reuse classification
+#
+
+import pytest
+from peekingduck_studio.node_pool import (
+    NodePool,
+    custom_nodes_folders,
+    has_reusable_nodes,
+    is_reusable_node,
+    node_key,
+    pipeline_node_titles,
+)
+
+PIPELINE = """nodes:
+- input.visual:
+    source: video.mp4
+- model.yolo
+- custom_nodes.dabble.my_node
+- output.screen
+"""
+
+
+def test_pipeline_node_titles():
+    assert pipeline_node_titles(PIPELINE) == [
+        "input.visual",
+        "model.yolo",
+        "custom_nodes.dabble.my_node",
+        "output.screen",
+    ]
+
+
+def test_custom_nodes_folders():
+    titles = pipeline_node_titles(PIPELINE)
+    assert custom_nodes_folders(titles) == {"custom_nodes"}
+    assert custom_nodes_folders(["input.visual", "model.yolo"]) == set()
+
+
+# built-in node module paths of PeekingDuck 1.2 and 1.3
+@pytest.mark.parametrize(
+    "path_to_node", ["peekingduck.pipeline.nodes.", "peekingduck.nodes."]
+)
+def test_builtin_nodes_reusable(path_to_node):
+    folders = {"custom_nodes"}
+    assert is_reusable_node(path_to_node, "model.yolo", folders)
+    assert is_reusable_node(path_to_node, "draw.bbox", folders)
+    assert not is_reusable_node(path_to_node, "input.visual", folders)
+    assert not is_reusable_node(path_to_node, "dabble.tracking", folders)
+
+
+@pytest.mark.parametrize("path_to_node", ["custom_nodes.", "src.custom_nodes."])
+def test_custom_nodes_not_reusable(path_to_node):
+    assert not is_reusable_node(path_to_node, "dabble.my_node", {"custom_nodes"})
+    # custom node named like a built-in stateless one
+    assert not is_reusable_node(path_to_node, "model.yolo", {"custom_nodes"})
+
+
+def test_has_reusable_nodes():
+    assert has_reusable_nodes(PIPELINE)
+    nothing_reusable = """nodes:
+- input.visual
+- custom_nodes.model.my_model
+- dabble.fps
+- output.media_writer
+"""
+    assert not has_reusable_nodes(nothing_reusable)
+
+
+def test_node_key_config_order():
+    key = node_key("model.yolo", {"score_threshold": 0.5, "iou_threshold": 0.6})
+    same = node_key("model.yolo", {"iou_threshold": 0.6, "score_threshold": 0.5})
+    assert key == same
+    assert key != node_key("model.yolo", {"score_threshold": 0.4})
+    assert node_key("model.yolo", None) == node_key("model.yolo", {})
+
+
+def test_node_pool_take_restock():
+    pool = NodePool()
+    yolo, yolo2, posenet = object(), object(), object()
+    pool.restock({"yolo": [yolo, yolo2], "posenet": [posenet]}, keep_unused=False)
+    assert len(pool) == 3
+    assert pool.take("yolo") is yolo2
+    assert pool.take("missing") is None
+    # failed load keeps nodes it did not take
+    pool.restock({"yolo": [yolo2]}, keep_unused=True)
+    assert len(pool) == 3
+    # successful load keeps only its own nodes
+    pool.restock({"yolo": [yolo2]}, keep_unused=False)
+    assert len(pool) == 1
+    pool.clear()
+    assert pool.take("yolo") is None
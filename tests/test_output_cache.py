@@ -0,0 +1,184 @@
+#
+# Tests: output cache for incremental re-execution
+#
+
+from typing import Any, Dict, List
+from pathlib import Path
+import pickle
+import queue
+import threading
+import numpy as np
+from benchmarks.stub_nodes import StubModel, make_stub_pipeline
+from peekingduck_studio.frame_store import FrameStore
+from peekingduck_studio.output_cache import FrameRef, OutputCache
+from peekingduck_studio.pipeline_runner import ExecutionPlan
+
+NUM_FRAMES = 12
+RESOLUTION = (32, 24)
+
+
+class CountingModel(StubModel):
+    """Stub model counting its runs, with a new output array per run"""
+
+    def __init__(self) -> None:
+        super().__init__("model.counting")
+        self.num_runs = 0
+
+    def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.num_runs += 1
+        return {"bboxes": np.full((1, 4), self.num_runs, dtype=np.float32)}
+
+
+def run_to_end(plan: ExecutionPlan, screen_output=None) -> List[np.ndarray]:
+    """Run plan until pipeline terminates, return copies of screen outputs"""
+    frames = []
+
+    def output(img: np.ndarray) -> None:
+        frames.append(img.copy())
+        if screen_output:
+            screen_output(img)
+
+    while not plan.pipeline.terminate:
+        plan.run_iteration(output)
+    return frames
+
+
+def make_pipeline(num_draws: int = 1):
+    """input.visual -> model.counting -> draw.stub* -> output.screen"""
+    pipeline = make_stub_pipeline(
+        NUM_FRAMES, resolution=RESOLUTION, num_models=0, num_draws=num_draws
+    )
+    model = CountingModel()
+    pipeline.nodes.insert(1, model)
+    return pipeline, model
+
+
+def snapshots_of(frame_idx: int) -> List[Dict[str, Any]]:
+    return [{"img": np.full((4, 4, 3), frame_idx, dtype=np.uint8)}, {"n": frame_idx}]
+
+
+def test_record_and_load():
+    cache = OutputCache(["input.visual", "model.x"])
+    for idx in range(5):
+        cache.record(snapshots_of(idx))
+    cache.finish()
+    cache.wait()
+    assert cache.usable
+    assert len(cache) == 5
+    outputs = cache.load(3, 2)
+    assert outputs[1] == {"n": 3}
+    assert outputs[0]["img"][0, 0, 0] == 3
+    outputs[0]["img"][:] = 0  # loads are fresh copies
+    assert cache.load(3, 1)[0]["img"][0, 0, 0] == 3
+    assert cache.num_unchanged(["input.visual", "model.x"]) == 2
+    assert cache.num_unchanged(["input.visual", "model.y", "draw.z"]) == 1
+    cache.close()
+
+
+def test_spill_to_disk():
+    cache = OutputCache(["input.visual", "model.x"], ram_budget=1000)
+    for idx in range(10):
+        cache.record(snapshots_of(idx))
+    cache.finish()
+    cache.wait()
+    assert cache.usable
+    assert cache.disk_bytes > 0
+    spill_path = cache._spill_path
+    assert Path(spill_path).is_file()
+    for idx in range(10):
+        assert cache.load(idx, 2)[1] == {"n": idx}
+    cache.close()
+    assert not Path(spill_path).exists()
+
+
+def test_overflow_out_of_budget():
+    cache = OutputCache(["input.visual"], ram_budget=100, disk_budget=100)
+    for idx in range(10):
+        cache.record(snapshots_of(idx)[:1])
+    cache.finish()
+    cache.wait()
+    assert cache.overflowed
+    assert not cache.usable
+    assert len(cache) == 0  # released
+
+
+def test_overflow_writer_behind():
+    cache = OutputCache(["input.visual"])
+    cache._queue = queue.Queue(maxsize=1)
+    release = threading.Event()
+    store = cache._store
+
+    def slow_store(blobs: List[bytes]) -> None:
+        release.wait()
+        store(blobs)
+
+    cache._store = slow_store  # writer thread blocks storing first frame
+    for idx in range(4):
+        cache.record(snapshots_of(idx)[:1])  # never blocks
+    assert cache.overflowed
+    release.set()
+    cache.finish()  # does not block once overflowed
+    cache.wait()
+    assert not cache.usable
+
+
+def test_record_and_replay_outputs():
+    pipeline, model = make_pipeline()
+    plan = ExecutionPlan(pipeline, prefetch=0)
+    assert plan.cacheable_steps() == 2  # up to first draw node
+    cache = OutputCache(["input.visual", "model.counting"])
+    plan.record_outputs(cache)
+    recorded = run_to_end(plan)
+    cache.wait()
+    assert cache.usable
+    assert model.num_runs == NUM_FRAMES
+
+    pipeline, model = make_pipeline()
+    plan = ExecutionPlan(pipeline, prefetch=0)
+    assert plan.replay_outputs(cache, num_unchanged=2) == 2
+    replayed = run_to_end(plan)
+    assert model.num_runs == 0  # outputs came from cache
+    assert len(replayed) == len(recorded)
+    for frame, recorded_frame in zip(replayed, recorded):
+        assert np.array_equal(frame, recorded_frame)
+    assert pipeline.data["bboxes"][0, 0] == NUM_FRAMES
+    cache.close()
+
+
+def test_replay_stops_at_changed_node():
+    pipeline, _ = make_pipeline()
+    cache = OutputCache(["input.visual", "model.counting"])
+    plan = ExecutionPlan(pipeline, prefetch=0)
+    plan.record_outputs(cache)
+    run_to_end(plan)
+    cache.wait()
+
+    pipeline, model = make_pipeline()
+    plan = ExecutionPlan(pipeline, prefetch=0)
+    assert plan.replay_outputs(cache, num_unchanged=1) == 1
+    run_to_end(plan)
+    assert model.num_runs == NUM_FRAMES
+    cache.close()
+
+
+def test_img_referred_to_in_frame_store():
+    # nothing draws on `img`: cached `img` is the screen output in frame store
+    pipeline, _ = make_pipeline(num_draws=0)
+    frames = FrameStore()
+    cache = OutputCache(["input.visual", "model.counting"])
+    cache.frames = frames
+    plan = ExecutionPlan(pipeline, prefetch=0)
+    plan.record_outputs(cache)
+    run_to_end(plan, screen_output=frames.append)
+    cache.wait()
+    assert cache.usable
+    assert isinstance(cache.load(5, 1)[0]["img"], np.ndarray)
+    assert isinstance(pickled_img(cache, 5), FrameRef)
+    assert np.array_equal(cache.load(5, 1)[0]["img"], frames[5])
+    cache.close()
+    frames.close()
+
+
+def pickled_img(cache: OutputCache, frame_idx: int) -> Any:
+    """Cached `img` of source node as stored, without resolving FrameRef"""
+    return pickle.loads(cache._frames[frame_idx][0])["img"]
@@ -0,0 +1,137 @@
+#
+# Tests: session archive save/load round-trip
+#
+
+from pathlib import Path
+import numpy as np
+import pytest
+from benchmarks.stub_nodes import make_stub_pipeline
+from peekingduck_studio.frame_store import (
+    FRAME_STORE_PNG,
+    FRAME_STORE_RAW,
+    CompressedFrameStore,
+    FrameStore,
+    blit_view,
+)
+from peekingduck_studio.session import (
+    SESSION_SUFFIX,
+    SessionSaver,
+    open_session,
+    read_session_index,
+)
+
+NUM_FRAMES = 6
+PIPELINE_STR = "nodes:\n- input.visual\n- model.stub0\n- output.screen\n"
+METADATA = {"pipeline_path": "stub.yml", "source_fps": 25.0, "source_frame_count": 6}
+
+
+def stub_frames(num_frames: int = NUM_FRAMES, resolution=(32, 24)):
+    """Screen output frames of a stub pipeline run"""
+    source = make_stub_pipeline(num_frames, resolution=resolution).nodes[0]
+    return [source.run({})["img"].copy() for _ in range(num_frames)]
+
+
+def save_session(path: Path, frames) -> None:
+    saver = SessionSaver(str(path), frames, PIPELINE_STR, METADATA)
+    saver.run()  # in this thread
+    assert saver.error == ""
+    assert saver.num_written == len(frames)
+
+
+@pytest.fixture
+def session_path(tmp_path: Path) -> Path:
+    return tmp_path / f"run{SESSION_SUFFIX}"
+
+
+def test_raw_round_trip(session_path: Path):
+    frames = stub_frames()
+    store = FrameStore(ram_budget=2 * frames[0].nbytes)  # some frames spilled
+    for frame in frames:
+        store.append(frame)
+    save_session(session_path, store)
+    assert not Path(f"{session_path}.part").exists()
+
+    session_frames, index = open_session(str(session_path))
+    assert index["frame_format"] == FRAME_STORE_RAW
+    assert index["pipeline"] == PIPELINE_STR
+    assert index["source_fps"] == METADATA["source_fps"]
+    assert len(session_frames) == NUM_FRAMES
+    for idx, frame in enumerate(frames):
+        assert np.array_equal(session_frames[idx], frame)
+        # replay blits frames without copying, so they must be writable
+        assert blit_view(session_frames[idx]).flags.writeable
+    assert len(session_frames.timestamps) == NUM_FRAMES
+    store.close()
+
+
+def test_compressed_round_trip(session_path: Path):
+    frames = stub_frames()
+    store = CompressedFrameStore(FRAME_STORE_PNG)
+    for frame in frames:
+        store.append(frame)
+    save_session(session_path, store)
+
+    session_frames, index = open_session(str(session_path))
+    assert index["frame_format"] == FRAME_STORE_PNG
+    assert isinstance(session_frames, CompressedFrameStore)
+    for idx, frame in enumerate(frames):
+        assert np.array_equal(session_frames[idx], frame)
+    store.close()
+    session_frames.close()
+
+
+def test_frame_size_change_round_trip(session_path: Path):
+    frames = stub_frames(3) + stub_frames(3, resolution=(64, 48))
+    store = FrameStore()
+    for frame in frames:
+        store.append(frame)
+    save_session(session_path, store)
+
+    session_frames, index = open_session(str(session_path))
+    assert index["frame_format"] == FRAME_STORE_PNG  # lossless, any frame size
+    for idx, frame in enumerate(frames):
+        assert np.array_equal(session_frames[idx], frame)
+    store.close()
+    session_frames.close()
+
+
+def test_saved_file_is_not_modified_by_replay(session_path: Path):
+    frames = stub_frames()
+    store = FrameStore()
+    for frame in frames:
+        store.append(frame)
+    save_session(session_path, store)
+    saved = session_path.read_bytes()
+    session_frames, _ = open_session(str(session_path))
+    session_frames[0][:] = 0  # copy-on-write mapping
+    del session_frames
+    assert session_path.read_bytes() == saved
+    store.close()
+
+
+def test_cancelled_save_leaves_no_file(session_path: Path):
+    store = FrameStore()
+    for frame in stub_frames():
+        store.append(frame)
+    saver = SessionSaver(str(session_path), store, PIPELINE_STR, METADATA)
+    saver.cancel()
+    saver.run()
+    assert saver.error == ""
+    assert not session_path.exists()
+    assert not Path(f"{session_path}.part").exists()
+    store.close()
+
+
+def test_not_a_session(session_path: Path):
+    session_path.write_bytes(b"nodes: []\n")
+    with pytest.raises(ValueError):
+        read_session_index(str(session_path))
+    store = FrameStore()
+    for frame in stub_frames():
+        store.append(frame)
+    save_session(session_path, store)
+    truncated = session_path.read_bytes()[:-8]
+    session_path.write_bytes(truncated)
+    with pytest.raises(ValueError):
+        read_session_index(str(session_path))
+    store.close()
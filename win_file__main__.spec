@@ -1,7 +1,16 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 from kivy_deps import sdl2, glew
 
 block_cipher = None
+# prebuilt node config cache, bundled if built first with:
+#   python -m peekingduck_studio.config_cache
+config_cache = 'peekingduck_studio/pkds_config_cache.pkl'
+config_cache_datas = (
+    [(config_cache, 'peekingduck_studio')]
+    if os.path.isfile(os.path.join(SPECPATH, config_cache))
+    else []
+)
 
 
 a = Analysis(
@@ -11,7 +20,7 @@ a = Analysis(
     datas=[
         ('peekingduck_studio/peekingduckstudio.kv', 'peekingduck_studio'),
         ('../PeekingDuck/peekingduck','peekingduck')
-    ],
+    ] + config_cache_datas,
     hiddenimports=['tensorflow','torch','torchvision', 'win32timezone'],
     hookspath=[],
     hooksconfig={},